@@ -1,3 +1,10 @@
+import fuzzy
+import query
+import selection
+import textindex
+import perfecthash
+import float32
+import shake
 import codata
 import formats
 import outputs
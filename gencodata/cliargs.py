@@ -20,6 +20,289 @@ import codata
 #import outputs
 
 parser = None
+commands = {}           # sub-command name --> parser
+
+_precisions_ = ['double','single','mixed']
+#______________________________________________________
+
+def _diffParser ():
+    ''' gencodata diff OLD NEW '''
+
+    p = argparse.ArgumentParser(prog='gencodata diff',
+            description='Compare two CODATA editions, export files or overlays. \
+                Operands are an edition year (2014), an export file (site.csv), \
+                either followed by +overlay files (2014+site.json).')
+
+    p.add_argument('old',help='edition, export file or overlay spec')
+    p.add_argument('new',help='edition, export file or overlay spec')
+
+    p.add_argument('-m','--manifest',
+                    nargs=1,
+                    help='file listing generated headers, one per line; \
+                        print those declaring a changed constant',
+                    type=str,
+                    default='')
+
+    p.add_argument('-o','--output',
+                    nargs=1,
+                    help='write the affected header list to a file',
+                    type=str,
+                    default='')
+
+    p.add_argument('-j','--json',
+                    nargs=1,
+                    help='write the differences to a JSON file',
+                    type=str,
+                    default='')
+
+    return p
+
+#______________________________________________________
+
+def _count (text=''):
+    ''' argparse type of --top: a whole number, 1 or more '''
+    try:
+        count = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError('invalid int value: \'%s\'' % text)
+
+    if count < 1:
+        raise argparse.ArgumentTypeError('must be 1 or more, not %d' % count)
+
+    return count
+
+#______________________________________________________
+
+def _orderArguments (p):
+    ''' --sort, --reverse and --top flags '''
+
+    p.add_argument('--sort',
+                    nargs=1,
+                    help='order output by %s (default name)' % \
+                        ', '.join(codata.query._sort_keys_),
+                    choices=codata.query._sort_keys_,
+                    type=str,
+                    default='')
+
+    p.add_argument('-r','--reverse',action='store_true',
+                    help='reverse the output order',
+                    default=False)
+
+    p.add_argument('--top',
+                    nargs=1,
+                    help='keep only the first TOP constants in output order',
+                    type=_count,
+                    default=None)
+
+#______________________________________________________
+
+def _datasetArguments (p):
+    ''' -e, -d and --overlay flags '''
+
+    p.add_argument('-e','--edition',
+                    nargs=1,
+                    help='CODATA edition year',
+                    type=str,
+                    default='')
+
+    p.add_argument('-d','--data',
+                    nargs=1,
+                    help='use constants from an export file instead of CODATA',
+                    type=str,
+                    default='')
+
+    p.add_argument('--overlay',
+                    action='append',
+                    help='layer site-local constants from a file; may be repeated',
+                    type=str,
+                    default=[])
+
+#______________________________________________________
+
+def _outputArguments (p):
+    ''' dataset and output flags shared by selecting sub-commands '''
+
+    _datasetArguments(p)
+
+    p.add_argument('-l','--list',action='store_true',
+                    help='list constant names only',
+                    default=False)
+
+    p.add_argument('-s','--syntax',
+                    nargs=1,
+                    help='output syntax, as for gencodata -s',
+                    type=str,
+                    default=['python'])
+
+    p.add_argument('-o','--output',
+                    nargs=1,
+                    help='write results to an output file',
+                    type=str,
+                    default='')
+
+    p.add_argument('-c','--csv',
+                    nargs=1,
+                    help='write results to a CSV file',
+                    type=str,
+                    default='')
+
+    p.add_argument('-j','--json',
+                    nargs=1,
+                    help='write results to a JSON file',
+                    type=str,
+                    default='')
+
+    p.add_argument('--jsonl',
+                    nargs=1,
+                    help='write results to a JSON-lines file',
+                    type=str,
+                    default='')
+
+    p.add_argument('-m','--module',
+                    nargs=1,
+                    help='write an importable, byte-compiled python module',
+                    type=str,
+                    default='')
+
+    p.add_argument('--python',
+                    nargs=1,
+                    help='byte-compile the module for this python interpreter',
+                    type=str,
+                    default='')
+
+    p.add_argument('--split',
+                    nargs=1,
+                    help='write one header per category and an umbrella \
+                        header into a directory',
+                    type=str,
+                    default='')
+
+    p.add_argument('-u','--uncertainty',action='store_true',
+                    help='also declare each uncertainty, as for gencodata -u',
+                    default=False)
+
+    p.add_argument('--table',action='store_true',
+                    help='also define name tables, as for gencodata --table',
+                    default=False)
+
+    p.add_argument('--ids',action='store_true',
+                    help='also declare constant IDs and values by ID, as for gencodata --ids',
+                    default=False)
+
+    p.add_argument('--precision',
+                    nargs=1,
+                    help='float32 values, as for gencodata --precision',
+                    choices=_precisions_,
+                    type=str,
+                    default='')
+
+    p.add_argument('--float32',action='store_true',
+                    help='list the constants float32 output loses instead',
+                    default=False)
+
+    p.add_argument('--conversions',action='store_true',
+                    help='also define unit conversion functions, as for gencodata --conversions',
+                    default=False)
+
+    p.add_argument('-t','--timing',action='store_true',
+                    help='report time taken to write each output file',
+                    default=False)
+
+    _orderArguments(p)
+
+    # no positional categories or input list
+    p.set_defaults(category=[],input='',select='')
+
+#______________________________________________________
+
+def _queryParser ():
+    ''' gencodata query --where CLAUSES '''
+
+    p = argparse.ArgumentParser(prog='gencodata query',
+            description='Print constants satisfying every where clause, e.g. \
+                "unit == J and reluncert > 1e-8".  Fields: exact, value, \
+                uncertainty, reluncert (== != < <= > >=), category, unit, \
+                symbol, name (== != or ~ regular expression).')
+
+    p.add_argument('-w','--where',
+                    action='append',
+                    help='clauses joined by "and"; may be repeated',
+                    type=str,
+                    required=True)
+
+    _outputArguments(p)
+
+    return p
+
+#______________________________________________________
+
+def _searchParser ():
+    ''' gencodata search WORD [WORD ...] '''
+
+    p = argparse.ArgumentParser(prog='gencodata search',
+            description='List constants whose names, symbols or units contain \
+                every word, best match first.  Words may be abbreviated: \
+                "magn" finds "magnetic".')
+
+    p.add_argument('words',nargs='+',help='words to search for')
+
+    p.add_argument('-a','--any',action='store_true',
+                    help='match any of the words instead of all',
+                    default=False)
+
+    p.add_argument('--top',
+                    nargs=1,
+                    help='list at most TOP constants (default 20)',
+                    type=_count,
+                    default=[20])
+
+    _datasetArguments(p)
+
+    return p
+
+#______________________________________________________
+
+def _shakeParser ():
+    ''' gencodata shake SRC_DIR '''
+
+    p = argparse.ArgumentParser(prog='gencodata shake',
+            description='Declare only the constants used by the C, Fortran and \
+                Python sources under a directory, found by the symbols the \
+                syntax declares.  Files gencodata wrote are skipped.')
+
+    p.add_argument('srcdir',help='directory of sources to scan')
+
+    p.add_argument('--unused',action='store_true',
+                    help='list the constants the sources do not use instead',
+                    default=False)
+
+    _outputArguments(p)
+
+    return p
+
+#______________________________________________________
+
+_command_parsers_ = {'diff':_diffParser, 'query':_queryParser,
+                     'search':_searchParser, 'shake':_shakeParser}
+
+def commandParse (args=[]):
+    '''
+    Parse a sub-command line, e.g. ['diff','2010','2014'].
+    The result's command attribute names the sub-command.
+    '''
+
+    name = args[0]
+    if name not in commands:
+        commands[name] = _command_parsers_[name]()
+
+    try:
+        results = commands[name].parse_args(args[1:])
+        results.command = name
+    except:
+        results = None
+
+    return results
+
 #______________________________________________________
 
 def argvParse (args=None):
@@ -39,12 +322,42 @@ def argvParse (args=None):
     -s,--syntax - generate results in C, Fortran, or Python syntax.
 
     -i,--input  - print constants from list in file
+    -f,--fuzzy  - resolve misspelled names in the input list
+    -x,--select - print constants chosen by a selection expression
     -o,--output - write results to an output file
 
     -c,--csv    - write results to a CSV file
     -j,--json   - write results to a JSON file
-
-    TO DO:  -m,--module  - write constants as importable python module
+    --jsonl     - write results to a JSON-lines file
+    --split     - write per-category headers and an umbrella header
+    -m,--module - write an importable, byte-compiled python module
+    --python    - byte-compile the module for this python interpreter
+
+    -d,--data   - read constants from an export file instead of CODATA
+    -e,--edition - select the CODATA edition
+    --overlay   - layer site-local constants from a file (repeatable)
+
+    -u,--uncertainty - declare uncertainties too, where the syntax can
+    --table     - define tables of constant names too, where the syntax can
+    --ids       - declare stable constant IDs and an array of values
+                  indexed by them (C, Fortran and Python syntax)
+    --precision - single or mixed float32 values (C, C++ and Fortran)
+    --float32   - list the constants float32 output loses
+    --conversions - define unit conversion functions of the equivalents
+                  (C, C++, Fortran module and Python syntax)
+    -t,--timing - report per-file write times
+
+    --sort      - order output by name, symbol, category, value,
+                  magnitude, uncertainty or reluncert
+    -r,--reverse - reverse the output order
+    --top       - keep only the first constants in output order
+
+    Sub-commands have their own arguments:
+
+    diff OLD NEW - compare editions, exports or overlays
+    query -w WHERE - print constants satisfying predicates
+    search WORD... - list constants by name, symbol or unit words
+    shake SRC_DIR  - print only the constants sources under SRC_DIR use
     '''
     global parser
     if parser is None:
@@ -71,6 +384,24 @@ def argvParse (args=None):
                             type=str,
                             default='')    # default=argparse.SUPPRESS)
 
+        parser.add_argument('-f','--fuzzy',
+                            nargs='?',
+                            help='resolve misspelled names in the input list to \
+                            the closest constant scoring at least FUZZY, 0 to 1.0 \
+                            (default 0.8)',
+                            type=float,
+                            const=0.8,
+                            default=None)
+
+        parser.add_argument('-x','--select',
+                            nargs=1,
+                            help='select constants by an expression over categories, \
+                            names, symbols, @files, glob: and re: patterns with \
+                            | (union), - (difference), & (intersection) and ( ), \
+                            e.g. "atomic units - glob:*electron*"',
+                            type=str,
+                            default='')
+
         parser.add_argument('-o','--output',
                             nargs=1,
                             help='write results to an output file',
@@ -89,12 +420,100 @@ def argvParse (args=None):
                             type=str,
                             default='')    # default=argparse.SUPPRESS)
 
+        parser.add_argument('--jsonl',
+                            nargs=1,
+                            help='write results to a JSON-lines file',
+                            type=str,
+                            default='')
+
+        parser.add_argument('-m','--module',
+                            nargs=1,
+                            help='write an importable, byte-compiled python module',
+                            type=str,
+                            default='')
+
+        parser.add_argument('--python',
+                            nargs=1,
+                            help='byte-compile the module for this python \
+                            interpreter, e.g. python3, default the one running \
+                            gencodata; a .pyc is read only by its own version',
+                            type=str,
+                            default='')
+
+        parser.add_argument('--split',
+                            nargs=1,
+                            help='write one include-guarded header per category, \
+                            plus an umbrella header including them, into a \
+                            directory; unchanged files are not rewritten',
+                            type=str,
+                            default='')
+
+        parser.add_argument('-d','--data',
+                            nargs=1,
+                            help='use constants from a CSV, JSON or JSON-lines export file instead of CODATA',
+                            type=str,
+                            default='')
+
+        parser.add_argument('-e','--edition',
+                            nargs=1,
+                            help='CODATA edition year: %s (default %d)' % \
+                                (', '.join([str(e) for e in codata.Editions()]),
+                                 codata._default_edition_),
+                            type=str,
+                            default='')
+
+        parser.add_argument('--overlay',
+                            action='append',
+                            help='layer site-local constants from a file; may be repeated',
+                            type=str,
+                            default=[])
+
         parser.add_argument('-s','--syntax',
                             nargs=1,
-                            help='Use C,C99, F,Fortran,F77, Fortran90,F90, or Python (default) output, case-insensitive',
+                            help='Use C,C99, Cextern (a C header and source pair), Clookup (C arrays and a lookup function), C++, F,Fortran,F77, Fortran90,F90, Fmod (a Fortran module), module (an importable Python module), or Python (default) output, case-insensitive',
                             type=str,
                             default=['python'])    # default=argparse.SUPPRESS)
 
+        parser.add_argument('-u','--uncertainty',action='store_true',
+                            help='also declare each uncertainty (C++ and Cextern syntax)',
+                            default=False)
+
+        parser.add_argument('--table',action='store_true',
+                            help='also define tables of constant names, symbols \
+                            and values (Cextern syntax)',
+                            default=False)
+
+        parser.add_argument('--ids',action='store_true',
+                            help='also declare stable constant IDs and an array \
+                            of values indexed by them (C, Fortran and Python syntax)',
+                            default=False)
+
+        parser.add_argument('--precision',
+                            nargs=1,
+                            help='single: declare float32 values; mixed: declare a \
+                            float32 twin, SYMBOL_f32, of each double (C, C++ and \
+                            Fortran syntax); default double',
+                            choices=_precisions_,
+                            type=str,
+                            default='')
+
+        parser.add_argument('--conversions',action='store_true',
+                            help='also define a unit conversion function for each \
+                            equivalent, e.g. codata_hartree_to_ev(x) (C, C++, Fortran \
+                            module and Python syntax)',
+                            default=False)
+
+        parser.add_argument('--float32',action='store_true',
+                            help='list the constants known better than float32 \
+                            resolution, or outside its range, instead of declaring them',
+                            default=False)
+
+        parser.add_argument('-t','--timing',action='store_true',
+                            help='report time taken to write each output file',
+                            default=False)
+
+        _orderArguments(parser)
+
         #print('*** initial parser state')
         #print(parser)
 
@@ -107,8 +526,12 @@ def argvParse (args=None):
         print('%s generates CODATA physical constants\nheader files in C, Fortan, or Python(default) syntax.\n' %
             (sys.argv[0]))
         parser.print_usage()
+        print('\nsub-commands: %s' % ', '.join(sorted(_command_parsers_.keys())))
         return None
 
+    if args[0] in _command_parsers_:
+        return commandParse(args)
+
     try:
         #print('args is %s' % args)
         results = parser.parse_args(args)
@@ -195,6 +618,183 @@ def _test_cliargs ():
             print('!--json json arg failed')
             cli_errors += 1
 
+    def test_jsonl ():
+        global cli_errors
+        parsed = argvParse(['--jsonl','dummy'])
+        if parsed.jsonl[0] != 'dummy':
+            print('!--jsonl jsonl arg failed')
+            cli_errors += 1
+
+    def test_module ():
+        global cli_errors
+        parsed = argvParse(['--module','dummy.py','--python','python3'])
+        if parsed.module[0] != 'dummy.py' or parsed.python[0] != 'python3':
+            print('!--module module arg failed')
+            cli_errors += 1
+
+    def test_split ():
+        global cli_errors
+        parsed = argvParse(['all','-s','C99','--split','include'])
+        if parsed.split[0] != 'include':
+            print('!--split split arg failed')
+            cli_errors += 1
+
+    def test_data ():
+        global cli_errors
+        parsed = argvParse(['-d','dummy'])
+        if parsed.data[0] != 'dummy':
+            print('!-d data arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['--data','dummy'])
+        if parsed.data[0] != 'dummy':
+            print('!--data data arg failed')
+            cli_errors += 1
+
+    def test_edition ():
+        global cli_errors
+        parsed = argvParse(['-e','2018'])
+        if parsed.edition[0] != '2018':
+            print('!-e edition arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['--edition','2010'])
+        if parsed.edition[0] != '2010':
+            print('!--edition edition arg failed')
+            cli_errors += 1
+
+    def test_overlay ():
+        global cli_errors
+        parsed = argvParse(['--overlay','one','--overlay','two'])
+        if parsed.overlay != ['one','two']:
+            print('!--overlay overlay arg failed')
+            cli_errors += 1
+
+    def test_fuzzy ():
+        global cli_errors
+        parsed = argvParse(['-i','dummy','-f'])
+        if parsed.fuzzy != 0.8:
+            print('!-f fuzzy arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['-i','dummy','--fuzzy','0.6'])
+        if parsed.fuzzy != 0.6:
+            print('!--fuzzy fuzzy arg failed')
+            cli_errors += 1
+
+    def test_select ():
+        global cli_errors
+        parsed = argvParse(['-x','universal | @five.txt'])
+        if parsed.select[0] != 'universal | @five.txt':
+            print('!-x select arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['--select','atomic units - glob:*electron*'])
+        if parsed.select[0] != 'atomic units - glob:*electron*':
+            print('!--select select arg failed')
+            cli_errors += 1
+
+    def test_uncertainty ():
+        global cli_errors
+        parsed = argvParse(['-s','C++','-u','universal'])
+        if parsed.uncertainty == False:
+            print('!-u uncertainty arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['-s','Cextern','--table','universal'])
+        if parsed.table == False or parsed.uncertainty == True:
+            print('!--table table arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['-s','F90','--ids','universal'])
+        if parsed.ids == False or parsed.table == True:
+            print('!--ids ids arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['-s','C99','--precision','mixed','--float32','universal'])
+        if parsed.precision[0] != 'mixed' or parsed.float32 == False or \
+            parsed.conversions == True or \
+            argvParse(['query','-w','exact','--conversions']).conversions == False:
+            print('!--precision, --float32 or --conversions arg failed')
+            cli_errors += 1
+
+    def test_timing ():
+        global cli_errors
+        parsed = argvParse(['-t','atomic'])
+        if parsed.timing == False:
+            print('!-t timing arg failed')
+            cli_errors += 1
+
+        parsed = argvParse(['--timing','atomic'])
+        if parsed.timing == False:
+            print('!--timing timing arg failed')
+            cli_errors += 1
+
+    def test_diff ():
+        global cli_errors
+        parsed = argvParse(['diff','2010','2014+site.json','-m','headers.txt'])
+        if parsed.command != 'diff' or parsed.old != '2010' or \
+            parsed.new != '2014+site.json' or parsed.manifest[0] != 'headers.txt':
+            print('!diff command failed')
+            cli_errors += 1
+
+    def test_query ():
+        global cli_errors
+        parsed = argvParse(['query','-w','unit == J','--where','not exact',
+                            '-s','C99','-l'])
+        if parsed.command != 'query' or \
+            parsed.where != ['unit == J','not exact'] or \
+            parsed.syntax[0] != 'C99' or parsed.list is False or \
+            parsed.category != [] or parsed.input != '':
+            print('!query command failed')
+            cli_errors += 1
+
+    def test_sort ():
+        global cli_errors
+        parsed = argvParse(['all','--sort','reluncert','-r','--top','20'])
+        if parsed.sort[0] != 'reluncert' or parsed.reverse is False or \
+            parsed.top[0] != 20:
+            print('!--sort --reverse --top args failed')
+            cli_errors += 1
+
+        parsed = argvParse(['query','-w','exact','--sort','symbol'])
+        if parsed.sort[0] != 'symbol' or parsed.reverse is True:
+            print('!query --sort arg failed')
+            cli_errors += 1
+
+        # --top 0 and --top -2 would mean all; argparse refuses them
+        class _Quiet:
+            def write (self,text):
+                pass
+        for args in [['all','--top','0'],['all','--top','-2'],['search','e','--top','0']]:
+            stderr,sys.stderr = sys.stderr,_Quiet()
+            try:
+                parsed = argvParse(args)
+            finally:
+                sys.stderr = stderr
+            if parsed is not None:
+                print('!%s accepted' % ' '.join(args))
+                cli_errors += 1
+
+    def test_search ():
+        global cli_errors
+        parsed = argvParse(['search','proton','magnetic','--any','-e','2010'])
+        if parsed.command != 'search' or \
+            parsed.words != ['proton','magnetic'] or \
+            parsed.any is False or parsed.top[0] != 20 or \
+            parsed.edition[0] != '2010':
+            print('!search command failed')
+            cli_errors += 1
+
+    def test_shake ():
+        global cli_errors
+        parsed = argvParse(['shake','src','-s','F90','-o','used.f90','--unused'])
+        if parsed.command != 'shake' or parsed.srcdir != 'src' or \
+            parsed.syntax[0] != 'F90' or parsed.output[0] != 'used.f90' or \
+            parsed.unused is False or parsed.category != []:
+            print('!shake command failed')
+            cli_errors += 1
+
     def test_syntax ():
         global cli_errors
         parsed = argvParse(['-s','dummy'])
@@ -214,6 +814,21 @@ def _test_cliargs ():
     test_output ()
     test_csv ()
     test_json ()
+    test_jsonl ()
+    test_module ()
+    test_split ()
+    test_data ()
+    test_edition ()
+    test_overlay ()
+    test_fuzzy ()
+    test_select ()
+    test_uncertainty ()
+    test_timing ()
+    test_diff ()
+    test_query ()
+    test_sort ()
+    test_search ()
+    test_shake ()
     test_syntax ()
     print("\t%d parse errors" % cli_errors)
 
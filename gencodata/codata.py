@@ -4,6 +4,34 @@
             CODATA 2014 JSON file.
 
  EXPORTS:
+     Dataset(edition=2014, codata_file='', symbol_file='', citation=None)
+        one CODATA edition, loaded on first use; its methods
+        mirror the module functions below
+
+     GetDataset(edition=None)
+        return the cached Dataset of an edition, or the current one
+
+     SetEdition(edition=2014)
+        select the edition used by the module functions
+
+     Edition()
+        return the current edition year
+
+     Editions()
+        return list of edition years whose data can be read
+
+     RegisterEdition(edition=0, codata_file='', citation='')
+        name the NIST SRD121 JSON file of an edition
+
+     OpenDataset(spec=None)
+        return a Dataset for an edition, export file or overlay spec
+
+     Diff(old=None, new=None)
+        return constants added, removed and changed between datasets
+
+     AffectedHeaders(diff={}, headers=[])
+        return generated headers declaring a changed constant
+
      Citation()
         return CODATA citation string
 
@@ -22,24 +50,106 @@
      Properties(constantname='')
         return properties dictionary of a constant
 
+     Canonical(constantname='')
+        return the key of a constant given its name or an
+        alternate or historical name, e.g. 'Avogadro number'
+
      Symbol(constantname='')
         return ASCII symbol string of a constant
 
+     SymbolName(symbol='')
+        return name of the constant defined by a symbol
+
      Categories()
         return list containing names of all constant categories
 
+     Ids()
+        return {key: ID}, the stable integer ID of every constant,
+        read from ids.json and the same in every edition
+
+     Id(constantname='')
+        return the stable integer ID of a constant, -1 if none
+
+     RegisterIds(id_file='')
+        add constants lacking an ID to the ID file
+
      Names()
         return list containing names of all constants
 
      Constants(category='')
         return dictionary of constants within a category
 
+     Select(expression='')
+        return set of constant keys chosen by a selection
+        expression such as 'atomic units - glob:*electron*'
+
+     Query(where='',category=None,unit=None,exact=None,
+           value=None,reluncert=None,name=None)
+        return set of constant keys satisfying predicates such
+        as 'unit == J and reluncert > 1e-8'
+
+     Search(words='',mode='and',top=None)
+        return constant keys whose names, symbols or units
+        contain all (or any) of the words, best match first
+
+     Suggest(name='',count=3)
+        return (score, key) pairs of constants whose names or
+        symbols most resemble a possibly misspelled name
+
+     Resolve(name='',threshold=0.8)
+        return the key of the best near match, or ''
+
+     Order(keys=None,by='name',reverse=False,top=None)
+        return constant keys ordered by name, symbol, category,
+        value, magnitude, uncertainty or reluncert; top keeps
+        the first top of them
+
+     IterKeys(keys=None,by='name',reverse=False,top=None)
+        generator form of Order()
+
+     IterConstants(selection=None,by='name',reverse=False,top=None)
+        yield the records of a selection expression, key set or
+        dictionary one at a time in Order() order, for writers
+        that stream rather than build a dictionary
+
      WriteJSON (cdict={},outfile='')
         write a constants dictionary as a JSON file
 
      WriteCSV (cdict={},outfile='')
         write a constants dictionary as a CSV file
 
+     ExportCSV (source={},outfile='',fields=None)
+     ExportJSON (source={},outfile='',fields=None,indent=None)
+     ExportJSONLines (source={},outfile='',fields=None)
+        stream constants from a dictionary or generator
+        to CSV, JSON or JSON-lines; ".gz" names are compressed
+
+     ImportCSV (infile='')
+     ImportJSON (infile='')
+     ImportJSONLines (infile='')
+     Import (infile='')
+        load an export file back into a constants dictionary
+
+     LoadExport (infile='')
+        replace the CODATA dictionary with an export file
+
+     AddOverlay (fname='')
+        layer site-local constants and overrides over the dictionary;
+        the GENCODATA_OVERLAYS path list is layered at import
+
+     ClearOverlays ()
+        drop all overlays
+
+     Reload (edition=None)
+        read an edition's data, export and overlay files again
+        and swap the new dataset in atomically
+
+     Generation ()
+        return a counter advanced whenever the current data changes
+
+     Overlays ()
+        return list of overlay files
+
 
  creation: 10/19/2017
  author: drh
@@ -49,7 +159,24 @@ VersionString = '0.1'
 
 import os
 import sys
+import re
+import csv
+import copy
+import gzip
 import json
+import fnmatch
+import numbers
+import threading
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+import fuzzy
+import query
+import selection
+import textindex
 
 # -- global defs
 
@@ -61,6 +188,10 @@ import json
 NewCodataFile = True    # qFalse
 _codata2014_file_ = 'srd121_allascii_2014.json'
 _symbol_file = 'symbols.json'
+_id_file_ = 'ids.json'
+
+# data files ship alongside this module
+_datadir_ = os.path.dirname(os.path.abspath(__file__))
 
 
 if NewCodataFile == True:
@@ -2788,9 +2919,95 @@ else:
 
 
 
-# cache for convenience
-_categories_ = []
-_phys_const_keys_ = []
+# -- editions
+
+# NIST SRD121 JSON file for each CODATA edition.  Only files present
+# in the package (or registered with RegisterEdition) can be loaded.
+
+_default_edition_ = 2014
+
+_edition_files_ = {
+    2006: 'srd121_allascii_2006.json',
+    2010: 'srd121_allascii_2010.json',
+    2014: _codata2014_file_,
+    2018: 'srd121_allascii_2018.json',
+    2022: 'srd121_allascii_2022.json',
+}
+
+_citations_ = {
+    2006: 'CODATA recommended values of the fundamental physical constants: 2006\n\
+    Peter J. Mohr, Barry N. Taylor, and David B. Newell\n\
+    REVIEWS OF MODERN PHYSICS, VOLUME 80, APRIL-JUNE 2008\n\
+    DOI: 10.1103/RevModPhys.80.633\n',
+
+    2010: 'CODATA recommended values of the fundamental physical constants: 2010\n\
+    Peter J. Mohr, Barry N. Taylor, and David B. Newell\n\
+    REVIEWS OF MODERN PHYSICS, VOLUME 84, OCTOBER-DECEMBER 2012\n\
+    DOI: 10.1103/RevModPhys.84.1527\n',
+
+    2014: 'CODATA recommended values of the fundamental physical constants: 2014\n\
+    Peter J. Mohr, David B. Newell,and Barry N. Taylor\n\
+    REVIEWS OF MODERN PHYSICS, VOLUME 88, JULY-SEPTEMBER 2016 (73 pages)\n\
+    DOI: 10.1103/RevModPhys.88.035009\n',
+
+    2018: 'CODATA recommended values of the fundamental physical constants: 2018\n\
+    Eite Tiesinga, Peter J. Mohr, David B. Newell, and Barry N. Taylor\n\
+    REVIEWS OF MODERN PHYSICS, VOLUME 93, APRIL-JUNE 2021\n\
+    DOI: 10.1103/RevModPhys.93.025010\n',
+
+    2022: 'CODATA recommended values of the fundamental physical constants: 2022\n\
+    Peter J. Mohr, David B. Newell, Barry N. Taylor, and Eite Tiesinga\n',
+}
+
+# site-local overlay files, read from this environment
+# variable as a path list whenever an edition is loaded
+_overlay_env_ = 'GENCODATA_OVERLAYS'
+
+# Alternate and historical names.  Each group names one constant; every
+# member resolves to the first member present in the dataset, so one
+# group serves editions that renamed the constant.  Overlay files add
+# groups with an "aliases" member, see _readOverlay.
+_alias_groups_ = [
+    ['Avogadro constant', "Avogadro's number", 'Avogadro number'],
+    ['electron volt', 'electronvolt'],
+    ['Rydberg constant', 'Rydberg', 'R infinity'],
+    ['speed of light in vacuum', 'speed of light', 'light speed'],
+    ['electric constant', 'vacuum electric permittivity', 'vacuum permittivity',
+        'permittivity of free space', 'permittivity of vacuum'],
+    ['mag. constant', 'vacuum mag. permeability', 'vacuum permeability',
+        'permeability of free space', 'permeability of vacuum'],
+    ['characteristic impedance of vacuum', 'impedance of free space',
+        'vacuum impedance'],
+    ['Newtonian constant of gravitation', 'gravitational constant',
+        'Newton constant', "Newton's constant"],
+    ['molar gas constant', 'gas constant', 'universal gas constant',
+        'ideal gas constant'],
+    ['Planck constant', "Planck's constant"],
+    ['Planck constant over 2 pi', 'reduced Planck constant', 'h-bar', 'hbar'],
+    ['Boltzmann constant', "Boltzmann's constant"],
+    ['elementary charge', 'electron charge', 'charge of electron'],
+    ['Faraday constant', 'Faraday'],
+    ['atomic mass constant', 'unified atomic mass unit', 'dalton',
+        'atomic mass unit'],
+    ['Hartree energy', 'Hartree'],
+    ['standard acceleration of gravity', 'standard gravity',
+        'standard acceleration due to gravity'],
+    ['Stefan-Boltzmann constant', "Stefan's constant"],
+    ['fine-structure constant', 'fine structure constant'],
+    ]
+
+# NIST abbreviations, so "proton magnetic moment" finds "proton mag. mom."
+_alias_words_ = {'magnetic':'mag', 'moment':'mom', 'gyromagnetic':'gyromag'}
+
+_alias_word_re_ = re.compile(r'[^\W_]+',re.UNICODE)
+
+# Strings and records shared by every loaded edition.  Names,
+# units, symbols and categories rarely change between editions,
+# and a record identical in two editions is held only once.
+_strings_ = {}
+_shared_records_ = {}
+_symbol_tables_ = {}        # symbol file --> (name table, category list)
+_id_tables_ = {}            # ID file --> {stripped name: ID}
 
 
 #_______________________________________________________
@@ -2800,144 +3017,265 @@ def _strip_name (name=''):
     name = name.replace('  ',' ')
     return name
 
+#_______________________________________________________
+
+def _alias_key (name=''):
+    '''
+    Spelling-blind form of a name for the alias index: words of
+    letters and digits in lower case, any dash or punctuation a
+    space, NIST abbreviations for magnetic, moment, gyromagnetic.
+    '''
+
+    if not isinstance(name,type(u'')):
+        name = name.decode('utf-8','replace')
+
+    words = _alias_word_re_.findall(name.lower())
+
+    return ' '.join([_alias_words_.get(w,w) for w in words])
 
 #_______________________________________________________
 
-def _build_CODATA_dict (codata_file, symbol_file):
-    """
-        CODATA JSON elements are like dictionary entries
-        without an external key.
+def _share (s=''):
+    ''' return the one shared copy of a string '''
+    return _strings_.setdefault(s,s)
+
+#_______________________________________________________
+
+class _Record(dict):
+    '''
+    Properties of one constant, read-only.  Records are shared
+    by every reader and every edition holding them, so changes
+    raise TypeError; dict(record) is a private, mutable copy.
+    '''
+
+    def _readonly (self,*args,**kwargs):
+        raise TypeError('constant records are read-only, copy with dict()')
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def copy (self):
+        return dict(self)
+
+    def __reduce__ (self):
+        return (_Record,(dict(self),))
+
+#_______________________________________________________
+
+def _share_record (record={}):
+    '''
+    return the one shared, read-only copy of a record,
+    with its keys and values shared too.
+    '''
+    record = _Record([(_share(k),_share(v)) for k,v in record.items()])
+    return _shared_records_.setdefault(tuple(sorted(record.items())),record)
+
+#_______________________________________________________
+
+def _clean_numeric (numstr=''):
+    ''' "6.626 070 040 e-34" --> "6.626070040e-34", "(exact)" --> "0.0" '''
+    numstr = numstr.replace(' ', '').replace('...', '')
+    return numstr.replace('(exact)', '0.0')
+
+def _numeric_string (value=''):
+    '''
+    A record's numeric field as a cleaned string, for JSON
+    numbers too: 1.12 --> "1.12"; None if not a number
+    '''
+    if isinstance(value,bool):
+        return None
+    if isinstance(value,float):
+        value = repr(value)
+    elif isinstance(value,numbers.Integral):
+        value = str(value)
+
+    try:
+        value = _clean_numeric(value)
+        float(value)
+    except (AttributeError,TypeError,ValueError):
+        return None
+
+    return value
+
+#_______________________________________________________
+
+def _datafile (fname=''):
+    '''
+    Locate a data file: the working directory first,
+    then the package directory, so the module can be
+    imported from anywhere (build tools, other packages).
+    '''
+    if os.path.exists(fname):
+        return fname
+    return os.path.join(_datadir_, fname)
+
+#_______________________________________________________
+
+def _fileExists (fname):
+    """Test file existence"""
+    if os.path.exists(fname):
+        return True
+    else:
+        print(("Error: " + fname + " not found"))
+        return False
+
+#_______________________________________________________
+
+def _symbol_table (symbol_file=''):
+    '''
+     read in symbol & category addenda, once per file,
+     and share them between editions.
+
+     symbol JSON items look like:
 
         {
           "Quantity ": "Planck constant",
-          "Value": "6.626 070 040 e-34",
-          "Uncertainty": "0.000 000 081 e-34",
-          "Unit": "J s"
+          "Category": "universal",
+          "Symbol": "h"
         },
 
-    """
+     Returns a table of stripped name --> symbol item and
+     the category list in file order.
+    '''
 
-    global _phys_const_          # = {}
-    global _categories_          # = []
-    global _phys_const_keys_     # = []
+    if symbol_file in _symbol_tables_:
+        return _symbol_tables_[symbol_file]
 
-    # if dictionary is already instantiated,
-    #   gather categories and keys
+    table = {}
+    categories = []
 
-    if len(_phys_const_) > 1:
-        _phys_const_keys_ = _phys_const_.keys()
-        for k in _phys_const_keys_:
-            if _phys_const_[k]['Category'] not in _categories_:
-                _categories_.append(_phys_const_[k]['Category'])
+    with open(symbol_file,'r') as symfp:
+        symdict = json.load(symfp)
 
-    # ELSE Build the CODATA dictionary from scratch
-    else:
+    symlist = list(symdict.values())[0]
 
-        jdict = {}
-        with open(codata_file,'ra') as codatafp :
-            jdict = json.load(codatafp)
-        codatafp.close()
+    for item in symlist:
+        item = dict([(_share(k),_share(v)) for k,v in item.items()])
+        table[_strip_name(item['Quantity '])] = item
 
-        ''' The CODATA JSON file is a dictionary with one key
-            that references a list of dictionary entries:
-            {'constants' : [{},{},...] }
-        '''
+        # build the category list for later
+        if item['Category'] not in categories:
+            categories.append(item['Category'])
+
+    _symbol_tables_[symbol_file] = (table,categories)
 
-        # extract the list from the JSON dictionary
-        codata_list = []
-        codata_list = jdict[jdict.keys()[0]]
+    return table,categories
 
-        for i in range(len(codata_list)):
-            # get one constant dictionary and extract the constant name
-            member = codata_list[i]
+#_______________________________________________________
+
+def _id_table (id_file=''):
+    '''
+     read the stable constant IDs, once per file, shared by
+     every edition.  The ID file looks like:
 
-            # note 'Quantity ' key has trailing space
-            # retain the Quantity field but
-            # use lower case form as key for case-insensitive searching.
+        { "ids": {
+            "alpha particle mass": 0,
+            "alpha particle mass energy equivalent": 1,
+            ...
+        } }
 
-            # name = member.pop('Quantity ', None)
+     Returns a table of stripped name --> integer ID.
+    '''
 
-            name = _strip_name (member['Quantity '])
+    if id_file in _id_tables_:
+        return _id_tables_[id_file]
 
-            # reformat numeric strings
-            numerics = member['Value'].replace(' ', '').replace('...', '')
-            member['Value'] = numerics
+    table = {}
 
-            numerics = member['Uncertainty'].replace(' ', '').replace('(exact)', '0.0')
-            member['Uncertainty'] = numerics
-            #add placeholder keys
-            member['Category'] = ''
-            member['Symbol'] = ''
+    if _fileExists(id_file):
+        with open(id_file,'r') as idfp:
+            for name,number in json.load(idfp).get('ids',{}).items():
+                table[_share(_strip_name(name))] = int(number)
 
-            _phys_const_[name] = member
+    _id_tables_[id_file] = table
 
-        """
-            Note the trailing space in the 'Quantity ' key.
-            Dictionary object now has a key and usably formatted
-            numeric fields.
+    return table
 
-            "planck constant" : {
-              "Category": "",
-              "Quantity ": "Planck constant",
-              "Symbol": "",
-              "Value": "6.626070040e-34",
-              "Uncertainty": "0.000000081e-34",
-              "Unit": "J s"
-            },
-        """
+#_______________________________________________________
 
+def _build_CODATA_dict (codata_file, symbol_file):
+    """
+        CODATA JSON elements are like dictionary entries
+        without an external key.
 
+        {
+          "Quantity ": "Planck constant",
+          "Value": "6.626 070 040 e-34",
+          "Uncertainty": "0.000 000 081 e-34",
+          "Unit": "J s"
+        },
 
-        '''
-         read in symbol & category addenda.
-         Update constant defs accordingly.
+        Returns the constants dictionary and category list.
+    """
 
-         symbol JSON items look like:
+    phys_const = {}
 
-            {
-              "Quantity ": "Planck constant",
-              "Category": "universal",
-              "Symbol": "h"
-            },
+    jdict = {}
+    with open(codata_file,'r') as codatafp :
+        jdict = json.load(codatafp)
 
-         This updates the existing CODATA entry to:
+    ''' The CODATA JSON file is a dictionary with one key
+        that references a list of dictionary entries:
+        {'constants' : [{},{},...] }
+    '''
 
-          "planck constant": {
-            "Category": "universal",
-            "Symbol": "h",
-            "Uncertainty": "0.000000081e-34",
-            "Quantity ": "Planck constant",
-            "Value": "6.626070040e-34",
-            "Unit": "J s"
-          },
+    # extract the list from the JSON dictionary
+    codata_list = list(jdict.values())[0]
 
-         Build a category list in the process.
-        '''
+    '''
+     Each member is merged with its symbol & category
+     addenda, updating the CODATA entry to:
+
+      "planck constant": {
+        "Category": "universal",
+        "Symbol": "h",
+        "Uncertainty": "0.000000081e-34",
+        "Quantity ": "Planck constant",
+        "Value": "6.626070040e-34",
+        "Unit": "J s"
+      },
+
+     Note the trailing space in the 'Quantity ' key.
+     The lower case form of the name is the key
+     for case-insensitive searching.
+    '''
+
+    symbols,symbol_categories = _symbol_table(symbol_file)
+    categories = []
 
-        with open(symbol_file,'ra') as symfp:
-            symdict = json.load(symfp)
+    # a constant renamed between editions keeps the symbol and
+    # category of its alias group, as it keeps its ID
+    renamed = {}
+    for group in _alias_groups_:
+        names = [_strip_name(n) for n in group]
+        known = [n for n in names if n in symbols]
+        if len(known) > 0:
+            entry = dict([(k,v) for k,v in symbols[known[0]].items() if k != 'Quantity '])
+            for n in names:
+                renamed.setdefault(n,entry)
 
-            symlist = []
-            symlist = symdict[symdict.keys()[0]]
+    for member in codata_list:
 
-            for i in range(len(symlist)):
-                symdict = symlist[i]
+        name = _strip_name (member['Quantity '])
 
-                # remove constant name from dictionary for immediate use
-                name = _strip_name(symdict['Quantity '])
+        # reformat numeric strings
+        member['Value'] = _clean_numeric(member['Value'])
+        member['Uncertainty'] = _clean_numeric(member['Uncertainty'])
 
-                if name in _phys_const_.keys():
-                    _phys_const_[name].update(symdict)
+        #add placeholder keys
+        member['Category'] = ''
+        member['Symbol'] = ''
 
-                    # build the category list for later
-                    if symdict['Category'] not in _categories_:
-                        _categories_.append(symdict['Category'])
+        if name in symbols:
+            member.update(symbols[name])
+        elif name in renamed:
+            member.update(renamed[name])
 
-        symfp.close()
+        phys_const[_share(name)] = member
 
     # addenda
 
-    _phys_const_['joule-calorie relationship'] = {
+    phys_const['joule-calorie relationship'] = {
           'Quantity ': 'Joule-calorie relationship',
           'Value': '4.184',
           'Uncertainty': '0.0',
@@ -2948,7 +3286,7 @@ def _build_CODATA_dict (codata_file, symbol_file):
 
     calPerJoule = ('%1.16e' % (1.0/4.184))
 
-    _phys_const_['calorie-joule relationship'] = {
+    phys_const['calorie-joule relationship'] = {
           'Quantity ': 'calorie-Joule relationship',
           'Value': calPerJoule,
           'Uncertainty': '0.0',
@@ -2957,253 +3295,1916 @@ def _build_CODATA_dict (codata_file, symbol_file):
           'Symbol': 'cal_to_J'
         }
 
-    _phys_const_keys_ = _phys_const_.keys()
+    for name in phys_const:
+        phys_const[name] = _share_record(phys_const[name])
 
-    #return _phys_const_
+    # categories in symbol file order
+    present = set([prop['Category'] for prop in phys_const.values()])
+    categories = [cat for cat in symbol_categories if cat in present]
+
+    return phys_const,categories
 
 #_______________________________________________________
 
-def __init__():
-    """pyLint"""
+class _Layers(Mapping):
+    '''
+    Read-only, ChainMap-style view of the base dictionary
+    under zero or more overlay layers.  The most recently
+    added layer that holds a key wins.  Layers are referenced,
+    never copied.
+    '''
 
-    #________________________________________________
-    def _fileExists (fname):
-        """Test file existence"""
-        if os.path.exists(fname):
-            return True
-        else:
-            print(("Error: " + fname + " not found"))
-            return False
-    #________________________________________________
+    def __init__(self,base={}):
+        self.maps = [base]
+        self._added = []        # keys absent from the base, in order
+
+    def copy(self):
+        other = _Layers(self.maps[-1])
+        other.maps = list(self.maps)
+        other._added = list(self._added)
+        return other
+
+    def addLayer(self,layer={}):
+        for k in layer:
+            if k not in self:
+                self._added.append(k)
+        self.maps.insert(0,layer)
+
+    def __getitem__(self,key):
+        for m in self.maps:
+            if key in m:
+                return m[key]
+        raise KeyError(key)
+
+    def __contains__(self,key):
+        for m in self.maps:
+            if key in m:
+                return True
+        return False
+
+    def __iter__(self):
+        for k in self.maps[-1]:
+            yield k
+        for k in self._added:
+            yield k
+
+    def __len__(self):
+        return len(self.maps[-1]) + len(self._added)
 
-    if len(_phys_const_) < 330:
+#_______________________________________________________
 
-        if not _fileExists(_codata2014_file_):
-            return False
+def _readOverlay (fname=''):
+    '''
+    Read overlay records.  An overlay is either an export file
+    (.csv, .json, .jsonl, optionally .gz) of complete records,
+    or a NIST/symbols-style JSON file holding one list:
+
+        { "constant": [
+            { "Quantity ": "Planck constant", "Symbol": "h_Planck" },
+            { "Quantity ": "silicon band gap", "Value": "1.12",
+              "Unit": "eV", "Category": "materials", "Symbol": "E_g_Si" }
+        ] }
+
+    where a record may carry only the fields it overrides.
+    A JSON overlay may also carry "aliases", see _readAliases.
+    Returns a list of records.
+    '''
 
-        if not _fileExists(_symbol_file):
-            return False
+    name = fname
+    if name.endswith('.gz'):
+        name = name[:-3]
 
-    # convert CODATA JSON input file to python dictionary
+    if name.endswith('.json'):
+        with _openImport(fname) as ifp:
+            jdict = json.load(ifp)
 
-    _build_CODATA_dict(_codata2014_file_,_symbol_file)
+        # alias groups are read by _readAliases
+        jdict.pop('aliases',None)
 
-#_______________________________________________________
-def Citation():
-    '''Unambiguous statement of source'''
-    return _citation_
+        values = list(jdict.values())
+        if len(values) == 1 and isinstance(values[0],list):
+            return values[0]
 
-#_______________________________________________________
+        return list(values)
 
-def Dictionary ():
-    ''' return the ENTIRE pythonic CODATA dictionary '''
-    return _phys_const_
+    return list(Import(fname).values())
 
 #_______________________________________________________
 
-def Value(constantname=''):
+def _readAliases (fname=''):
     '''
-    return value as numerical ASCII and leave
-    binary translation to the application language.
+    Read the alias groups of a JSON overlay, from an "aliases"
+    member mapping alternate names to constant names
+
+        { "aliases": { "Plank's constant": "Planck constant" } }
+
+    or holding a list of groups, canonical name first.
     '''
-    key = _strip_name (constantname)
 
-    if key in _phys_const_.keys():
-        return _phys_const_[key]['Value']
-    else:
-        return '0.0'
+    name = fname
+    if name.endswith('.gz'):
+        name = name[:-3]
 
-#_______________________________________________________
+    if not name.endswith('.json'):
+        return []
 
-def Uncertainty(constantname=''):
-    ''' return absolute uncertainty as numerical ASCII string '''
+    with _openImport(fname) as ifp:
+        aliases = json.load(ifp).get('aliases',[])
 
-    key = _strip_name (constantname)
-    if key in _phys_const_.keys():
-        return _phys_const_[key]['Uncertainty']
+    if isinstance(aliases,Mapping):
+        return [[target,alias] for alias,target in aliases.items()]
 
-    else:
-        return '0.0'
+    return list(aliases)
 
 #_______________________________________________________
 
-def Units(constantname=''):
+class Dataset(object):
     '''
-    Return units of constant.
-    Dimensionless constants are denoted by a null string ''
+    One CODATA edition: the constants dictionary, its
+    overlays and indexes.  The data files are read on
+    first use, not at construction.
+
+    A dataset is a snapshot: its records are read-only and
+    the module functions never change a dataset in place.
+    AddOverlay(), ClearOverlays(), LoadExport() and Reload()
+    at module level change a copy and publish it, so a
+    reader holding a Dataset sees one consistent edition.
+    The methods of the same names change the dataset itself
+    and are meant for one being built, before it is shared.
     '''
 
-    key = _strip_name (constantname)
-    if key in _phys_const_.keys():
-        return _phys_const_[key]['Unit']
-    else:
-        return ''
+    def __init__(self,edition=_default_edition_,
+                 codata_file='',symbol_file='',citation=None):
+
+        self._edition       = edition
+        self._codata_file   = codata_file
+        self._symbol_file   = symbol_file
+        self._citation      = citation
+
+        if self._codata_file == '':
+            self._codata_file = _datafile(_edition_files_.get(edition,''))
+        if self._symbol_file == '':
+            self._symbol_file = _datafile(_symbol_file)
+        if self._citation is None:
+            self._citation = _citations_.get(edition,'')
+
+        self._loaded        = False
+        self._base          = {}
+        self._constants     = _Layers(self._base)
+        self._categories    = []
+        self._keys          = []
+        self._category_index = {}   # category --> list of constant keys
+        self._symbol_index  = {}    # symbol --> constant key
+        self._columns       = None  # query.Columns, built on first query
+        self._tokens        = None  # textindex.TokenIndex, built on first search
+        self._ngrams        = None  # fuzzy.NgramIndex, built on first near miss
+        self._alias_index   = {}    # _alias_key --> constant key
+        self._ids           = None  # constant key --> stable ID, see Ids
+        self._aliases       = []    # alias groups from overlays
+        self._overlay_files = []
+        self._export_file   = ''    # export file replacing CODATA, see LoadExport
+        self._generation    = 0     # module generation when published
+        self._ready         = False
 
-#_______________________________________________________
+    #________________________________________________
 
-def Properties(constantname=''):
-    '''
-    return the single dictionary entry for a constant
+    def _load (self):
+        '''
+        read the edition's data files on first use; other
+        threads wait for the first to finish
+        '''
 
-    constantname = 'planck constant' returns:
+        if self._ready:
+            return self
 
-    { "Quantity ": "Planck constant",
-      "Category": "universal",
-      "Symbol": "h"
-      "Uncertainty": "0.000000081e-34",
-      "Unit": "J s"
-      "Value": "6.626070040e-34",
-    }
+        with _load_lock_:
+            if self._loaded:
+                return self
+            self._loaded = True
 
-    '''
+            # pre-built CODATA 2014 dictionary, see NewCodataFile
+            if self._edition == 2014 and len(_phys_const_) > 1:
+                self._categories = []
+                self._layerBase(dict([(k,_share_record(r)) \
+                                        for k,r in _phys_const_.items()]))
 
-    key = _strip_name (constantname)
-    if key in _phys_const_.keys():
-        return _phys_const_[key]
-    else:
-        return {}
+            elif not _fileExists(self._codata_file) or \
+                 not _fileExists(self._symbol_file):
+                self._layerBase({})
 
-#_______________________________________________________
+            else:
+                # convert CODATA JSON input file to python dictionary
 
-def Symbol (constantname=''):
+                base,self._categories = _build_CODATA_dict(self._codata_file,
+                                                           self._symbol_file)
 
-    key = _strip_name (constantname)
-    if key in _phys_const_.keys():
-        return _phys_const_[key]['Symbol']
-    else:
-        return ''
+                # stack site-local overlays over the CODATA dictionary
 
-#_______________________________________________________
+                self._layerBase(base)
 
-def Categories():
-    ''' return list of all constant categories '''
-    return _categories_
+            self._ready = True
 
-#_______________________________________________________
+        return self
 
-def Names():
-    ''' return list of all constant names '''
-    return _phys_const_keys_
+    #________________________________________________
 
-#_______________________________________________________
+    def _copy (self):
+        '''
+        Return a loaded copy to change and publish.  Records
+        and built indexes are shared; the containers an
+        overlay changes are copied.
+        '''
 
-def Constants(category=''):
-    '''
-    Return a dictionary of constants within a category,
-    e.g., all 'universal' constants or 'physicochemical' ones
-    '''
+        self._load()
 
-    if  category == '' or \
-        category not in _categories_ or \
-        category is None:
+        other = copy.copy(self)
+        other._constants = self._constants.copy()
+        other._categories = list(self._categories)
+        other._keys = list(self._keys)
+        other._category_index = dict([(c,list(keys)) \
+                                        for c,keys in self._category_index.items()])
+        other._symbol_index = dict(self._symbol_index)
+        other._alias_index = dict(self._alias_index)
+        other._aliases = list(self._aliases)
+        other._overlay_files = list(self._overlay_files)
 
-        return {}
+        return other
 
-    _keys = Names()
+    #________________________________________________
 
-    catdict = {}
+    def _reread (self):
+        '''
+        Return a new dataset read again from the edition's data
+        files, export file and overlays, or None if one of them
+        can no longer be read.
+        '''
 
-    for k in _keys:
-        if _phys_const_[k]['Category'] == category:
-            catdict[k] = _phys_const_[k]
+        other = Dataset(self._edition,self._codata_file,
+                        self._symbol_file,self._citation)
+        other._overlay_files = list(self._overlay_files)
+        other._load()
 
-        #prop = _phys_const_[k]
-        #if prop['Category'] == category:
-        #    catdict[k] = prop
+        if self._export_file != '' and other.LoadExport(self._export_file) is False:
+            return None
 
-    return catdict
+        if other._overlay_files != self._overlay_files:
+            return None
 
-#_______________________________________________________
+        return other
 
+    #________________________________________________
 
-def WriteJSON (cdict={},outfile=''):
+    def _index (self):
+        '''
+        One pass over the dictionary to rebuild the key list,
+        the category list (existing order kept) and the
+        category and symbol indexes.
+        '''
 
-    if len(cdict) < 1 or outfile == '':
-        return
+        self._category_index = {}
+        for cat in self._categories:
+            self._category_index[cat] = []
 
-    with open(outfile,'wa') as ofp:
-        json.dump(cdict,ofp, indent=2)
-        ofp.write('\n')
+        self._symbol_index = {}
 
-    ofp.close()
+        for k,prop in self._constants.items():
+            cat = prop['Category']
+            if cat not in self._category_index:
+                self._category_index[cat] = []
+                self._categories.append(cat)
+            self._category_index[cat].append(k)
 
-#_______________________________________________________
+            if prop['Symbol'] != '':
+                self._symbol_index[prop['Symbol']] = k
 
-def WriteCSV (cdict={},outfile=''):
+        # categories left empty, e.g. by a dropped overlay
+        for cat in [c for c in self._categories \
+                        if len(self._category_index[c]) == 0]:
+            self._categories.remove(cat)
+            del self._category_index[cat]
 
-    if len(cdict) < 1 or outfile == '':
-        return
+        self._keys = list(self._constants.keys())
+        self._columns = None
+        self._tokens = None
+        self._ngrams = None
+        self._ids = None
 
-    constants = sorted(cdict.keys())
-    fields = sorted(cdict[constants[0]].keys())
-    fields.reverse()
+        self._alias_index = {}
+        self._indexAliases(self._keys)
 
-    ''' CSV header format:
-       "Quantity ","Value","Unit","Uncertainty","Symbol","Category"
-    '''
-    csv_header = '\"Quantity \",' + \
-                ','.join([('\"%s\"' % f) for f in fields]) + '\n'
+    #________________________________________________
 
-    ''' row format is:
-    "Planck constant","6.626070040e-34","J s","0.000000081e-34","h","universal"
-    '''
+    def _indexAliases (self,keys=[]):
+        '''
+        Add the spelling-blind forms of keys to the alias index,
+        then every alias group whose constant is present.  Real
+        names are never shadowed; overlay groups, latest first,
+        take precedence over the built-in table.
+        '''
 
-    with open(outfile,'wa') as ofp:
-        ofp.write(csv_header)
+        alias_index = self._alias_index
+        constants = self._constants
 
-        for name in constants:
-            const = cdict[name]
-            row = ('\"%s\",' % name) + \
-                    ','.join([('\"%s\"' % const[f]) for f in fields]) + \
-                    '\n'
+        for k in keys:
+            alias_index.setdefault(_alias_key(k),k)
+            alias_index.setdefault(_alias_key(constants[k]['Quantity ']),k)
 
-            ofp.write(row)
-    # done
-    ofp.close()
+        for group in self._aliases[::-1] + _alias_groups_:
+            for name in group:
+                target = _strip_name(name)
+                if target in constants:
+                    break
+            else:
+                continue
 
-#_______________________________________________________
+            for name in group:
+                alias_index.setdefault(_alias_key(name),target)
 
-# Explicitly initialize since module isn't a class yet
+    #________________________________________________
 
+    def _layerBase (self,base={}):
+        '''
+        Make base the bottom layer and re-apply overlay files,
+        those already added and then those named in the
+        GENCODATA_OVERLAYS path list.
+        '''
 
-__init__()
+        overlays = list(self._overlay_files)
+        for fname in os.environ.get(_overlay_env_,'').split(os.pathsep):
+            if fname != '' and fname not in overlays:
+                overlays.append(fname)
 
+        self._base = base
+        self.ClearOverlays()
 
-#_______________________________________________________
+        for fname in overlays:
+            self.AddOverlay(fname)
 
-#
-# Low-rent unit testing follows.
+    #________________________________________________
 
-def _test_codata():
+    def Edition (self):
+        ''' CODATA edition year '''
+        return self._edition
 
-    print('\n#### BEGIN %s test\n' % __file__.upper())
-    print('CITATION:')
-    print(Citation())
+    def Citation (self):
+        '''Unambiguous statement of source'''
+        return self._citation
 
-    # scan property dictionaries for oddness
-    cdict  = Dictionary()
-    keys = cdict.keys()
-    len_names = len(Names())
-    len_dict = len(cdict)
-    len_keys = len(keys)
+    def Dictionary (self):
+        ''' return the ENTIRE pythonic CODATA dictionary '''
+        return self._load()._constants
 
-    print('CODATA dictionary has %d members' % len_dict)
-    print("NOTE: entries: %d  keys: %d" %(len_dict, len_keys))
-    print("NOTE: names() list len %d" %(len_names))
+    def Canonical (self,constantname=''):
+        '''
+        Return the key of a constant given its name or an
+        alternate spelling or historical name, or ''.
+        '''
+        key = _strip_name (constantname)
+        if key in self._load()._constants:
+            return key
+        return self._alias_index.get(_alias_key(constantname),'')
+
+    def Properties (self,constantname=''):
+        ''' return the single dictionary entry for a constant '''
+        key = self.Canonical(constantname)
+        if key != '':
+            return self._constants[key]
+        else:
+            return {}
 
-    dict_err = 0
-    for name in keys:
-        mem = cdict[name]
-        if len(mem) == 0:
-            print('%s property dict is empty' % name)
+    def Value (self,constantname=''):
+        ''' value as numerical ASCII '''
+        return self.Properties(constantname).get('Value','0.0')
 
-        elif len(mem)!=6:
-            print('%s property dict has len %d, should be 5' % (name,len(mem)))
-            dict_err+=1
-        else:
-            fields = ['Quantity ','Value','Category','Uncertainty','Symbol']
-            for fld in fields:
-                try:
+    def Uncertainty (self,constantname=''):
+        ''' absolute uncertainty as numerical ASCII '''
+        return self.Properties(constantname).get('Uncertainty','0.0')
+
+    def Units (self,constantname=''):
+        ''' units, '' for dimensionless constants '''
+        return self.Properties(constantname).get('Unit','')
+
+    def Symbol (self,constantname=''):
+        return self.Properties(constantname).get('Symbol','')
+
+    def SymbolName (self,symbol=''):
+        ''' return the constant name (key) defined by a symbol, or '' '''
+        return self._load()._symbol_index.get(symbol,'')
+
+    def Categories (self):
+        ''' return list of all constant categories '''
+        return list(self._load()._categories)
+
+    def Names (self):
+        ''' return list of all constant names '''
+        return list(self._load()._keys)
+
+    def Generation (self):
+        ''' module generation at which this dataset was published, 0 if never '''
+        return self._generation
+
+    def Ids (self):
+        '''
+        Return {key: ID}, each constant's stable integer ID
+        from the ID file, the same in every edition.  A
+        constant renamed between editions keeps the ID of a
+        name in its alias group.  One the file lacks gets the
+        next free ID in name order until RegisterIds() adds it.
+        '''
+
+        self._load()
+
+        if self._ids is None:
+            registered = _id_table(_datafile(_id_file_))
+            ids = {}
+            missing = []
+
+            for k in sorted(self._keys):
+                if k in registered:
+                    ids[k] = registered[k]
+                else:
+                    missing.append(k)
+
+            used = set(ids.values())
+            groups = [[_strip_name(name) for name in group] \
+                        for group in self._aliases[::-1] + _alias_groups_]
+            free = max(list(registered.values()) + [-1]) + 1
+
+            for k in missing:
+                for group in [g for g in groups if k in g]:
+                    for name in group:
+                        if registered.get(name,-1) not in used | set([-1]):
+                            ids[k] = registered[name]
+                            break
+                    if k in ids:
+                        break
+
+                if k not in ids:
+                    ids[k] = free
+                    free += 1
+                used.add(ids[k])
+
+            self._ids = ids
+
+        return dict(self._ids)
+
+    def Id (self,constantname=''):
+        ''' stable integer ID of a constant, -1 if there is none '''
+        key = self.Canonical(constantname)
+        if key == '':
+            return -1
+        if self._ids is None:
+            self.Ids()
+        return self._ids[key]
+
+    def Constants (self,category=''):
+        '''
+        Return a dictionary of constants within a category,
+        e.g., all 'universal' constants or 'physicochemical' ones
+        '''
+
+        self._load()
+
+        if  category == '' or \
+            category is None or \
+            category not in self._category_index:
+
+            return {}
+
+        catdict = {}
+
+        for k in self._category_index[category]:
+            catdict[k] = self._constants[k]
+
+        return catdict
+
+    #________________________________________________
+
+    def AddOverlay (self,fname=''):
+        '''
+        Layer site-local constants and overrides from a file over
+        the current dictionary.  Overridden records are merged with
+        the record below; the base dictionary is never copied.
+        Category and symbol indexes are updated incrementally.
+        '''
+
+        self._load()
+
+        if not os.path.exists(fname):
+            print('Error: ' + fname + ' not found')
+            return False
+
+        constants = self._constants
+        layer = {}
+
+        aliases = _readAliases(fname)
+
+        for member in _readOverlay(fname):
+            if 'Quantity ' not in member:
+                print('Error: %s has a record without a \'Quantity \' field' % fname)
+                return False
+
+            key = _strip_name(member['Quantity '])
+
+            if key in layer:
+                record = layer[key]
+            elif key in constants:
+                record = dict(constants[key])
+            elif 'Value' in member:
+                record = {'Quantity ':member['Quantity '],'Uncertainty':'0.0',
+                          'Unit':'','Category':'uncat','Symbol':''}
+            else:
+                print('Error: %s: new constant \'%s\' has no Value' % \
+                        (fname,member['Quantity ']))
+                return False
+
+            record.update(member)
+            for field in ['Value','Uncertainty']:
+                value = _numeric_string(record[field])
+                if value is None:
+                    print('Error: %s: \'%s\' %s \'%s\' is not a number' % \
+                            (fname,member['Quantity '],field,record[field]))
+                    return False
+                record[field] = value
+
+            layer[key] = record
+
+        for key in layer:
+            layer[key] = _Record(layer[key])
+
+        # incremental index maintenance
+        category_index = self._category_index
+        symbol_index = self._symbol_index
+
+        for key,record in layer.items():
+
+            if key in constants:
+                old = constants[key]
+                if old['Category'] != record['Category']:
+                    category_index[old['Category']].remove(key)
+                    if len(category_index[old['Category']]) == 0:
+                        del category_index[old['Category']]
+                        self._categories.remove(old['Category'])
+                    category_index.setdefault(record['Category'],[]).append(key)
+
+                if symbol_index.get(old['Symbol']) == key:
+                    del symbol_index[old['Symbol']]
+
+            else:
+                self._keys.append(key)
+                category_index.setdefault(record['Category'],[]).append(key)
+
+            if record['Category'] not in self._categories:
+                self._categories.append(record['Category'])
+
+            if record['Symbol'] != '':
+                symbol_index[record['Symbol']] = key
+
+        constants.addLayer(layer)
+        self._overlay_files.append(fname)
+        self._columns = None
+        self._tokens = None
+        self._ngrams = None
+        self._ids = None
+
+        # new groups outrank older ones: rebuild, else just add the new keys
+        if len(aliases) > 0:
+            self._aliases.extend(aliases)
+            self._alias_index = {}
+            self._indexAliases(self._keys)
+        else:
+            self._indexAliases(list(layer.keys()))
+
+        return True
+
+    #________________________________________________
+
+    def ClearOverlays (self):
+        ''' drop all overlays, restoring the base dictionary '''
+
+        self._load()
+
+        self._constants = _Layers(self._base)
+        self._overlay_files = []
+        self._aliases = []
+        self._index()
+
+    #________________________________________________
+
+    def Overlays (self):
+        ''' return list of overlay files, lowest layer first '''
+        return list(self._load()._overlay_files)
+
+    #________________________________________________
+
+    def LoadExport (self,infile=''):
+        '''
+        Replace the CODATA dictionary with the contents of an
+        export file, e.g. a curated edit of a previous export.
+        Records already carry symbols and categories, so the
+        NIST parse and symbol merge are skipped.  Overlays are
+        re-applied on top.
+        '''
+
+        self._load()
+
+        if not os.path.exists(infile):
+            print('Error: ' + infile + ' not found')
+            return False
+
+        cdict = Import(infile)
+        if len(cdict) < 1:
+            return False
+
+        self._categories = []
+        self._export_file = infile
+        self._layerBase(dict([(k,_share_record(r)) for k,r in cdict.items()]))
+
+        return True
+
+    #________________________________________________
+
+    def _selectOperand (self,kind='auto',value=''):
+        ''' key set of one selection operand, from the indexes '''
+
+        constants = self._constants
+
+        if kind == 'auto':
+            if value == 'all':
+                return set(self._keys)
+            for kind in ['cat','name','sym']:
+                keys = self._selectOperand(kind,value)
+                if len(keys) > 0:
+                    return keys
+            raise selection.SelectionError('\'%s\' is not a category, constant or symbol' % value)
+
+        if kind == 'cat':
+            return set(self._category_index.get(value,[]))
+
+        if kind == 'name':
+            key = self.Canonical(value)
+            return set([key]) if key != '' else set()
+
+        if kind == 'sym':
+            key = self._symbol_index.get(value,'')
+            return set([key]) if key != '' else set()
+
+        if kind == 'glob':
+            pattern = re.compile(fnmatch.translate(_strip_name(value)))
+            return set([k for k in self._keys if pattern.match(k)])
+
+        if kind == 're':
+            try:
+                pattern = re.compile(value,re.IGNORECASE)
+            except re.error as e:
+                raise selection.SelectionError('bad pattern re:%s, %s' % (value,e))
+            return set([k for k in self._keys if pattern.search(k) or \
+                            pattern.search(constants[k]['Quantity '])])
+
+        # kind == 'file', an input list of names or symbols
+        if not os.path.exists(value):
+            raise selection.SelectionError(value + ' not found')
+
+        keys = set()
+        with open(value,'r') as ifp:
+            for line in ifp:
+                name = line.strip()
+                if name == '' or name[0] == '#':
+                    continue
+                found = self._selectOperand('name',name) or \
+                        self._selectOperand('sym',name)
+                if len(found) == 0:
+                    print('Error: %s: \'%s\' constant not found' % (value,name))
+                keys |= found
+
+        return keys
+
+    #________________________________________________
+
+    def Select (self,expression=''):
+        '''
+        Return the set of constant keys chosen by a selection
+        expression, e.g. 'universal | @five.txt' or
+        'atomic units - glob:*electron*'; None on error.
+        Only keys are combined; callers fetch the records.
+        '''
+
+        self._load()
+
+        try:
+            tree = selection.parse(expression)
+            return selection.evaluate(tree,self._selectOperand)
+        except selection.SelectionError as e:
+            print('Error: %s' % e)
+            return None
+
+    #________________________________________________
+
+    def Columns (self):
+        ''' numeric columns and sorted indexes, built once per dictionary '''
+
+        self._load()
+
+        if self._columns is None:
+            self._columns = query.Columns(self._constants)
+
+        return self._columns
+
+    #________________________________________________
+
+    def Query (self,where='',category=None,unit=None,exact=None,
+               value=None,reluncert=None,name=None):
+        '''
+        Return the set of constant keys satisfying every
+        predicate; None on error.  where is a clause string,
+        e.g. 'unit == J and reluncert > 1e-8'.  Keywords add
+        clauses: category, unit and name (a regular expression)
+        are strings, exact is True or False, and value and
+        reluncert are (low, high) ranges, None for open ends.
+        '''
+
+        try:
+            clauses = []
+            if where != '':
+                clauses = query.parseWhere(where)
+
+            for field,text in [('category',category),('unit',unit)]:
+                if text is not None:
+                    clauses.append((field,'==',text))
+
+            if name is not None:
+                clauses.append(query.checkClause('name','~',name))
+
+            if exact is not None:
+                clauses.append(('uncertainty','==' if exact else '>',0.0))
+
+            for field,bounds in [('value',value),('reluncert',reluncert)]:
+                if bounds is None:
+                    continue
+                low,high = bounds
+                if low is not None:
+                    clauses.append(query.checkClause(field,'>=',low))
+                if high is not None:
+                    clauses.append(query.checkClause(field,'<=',high))
+
+        except query.QueryError as e:
+            print('Error: %s' % e)
+            return None
+
+        # name == and != compare dictionary keys
+        clauses = [(f,op,_strip_name(x)) if f == 'name' and op != '~' else (f,op,x) \
+                        for f,op,x in clauses]
+
+        return self.Columns().where(clauses)
+
+    #________________________________________________
+
+    def Order (self,keys=None,by='name',reverse=False,top=None):
+        '''
+        Return constant keys as a list ordered by name, symbol,
+        category, value, magnitude, uncertainty or reluncert,
+        optionally reversed and cut to the first top.  keys is
+        a dictionary, set or list to order, default all.  The
+        dataset order is computed once; keys are picked from
+        it, not re-sorted.  None on error.
+        '''
+
+        names = self.IterKeys(keys,by,reverse,top)
+        if names is None:
+            return None
+
+        return list(names)
+
+    #________________________________________________
+
+    def IterKeys (self,keys=None,by='name',reverse=False,top=None):
+        '''
+        Generator form of Order(): yields the keys one at a
+        time from the precomputed order, without building a
+        list.  The sort key is checked at once; None on error.
+        '''
+
+        try:
+            order = self.Columns().order(by)
+        except query.QueryError as e:
+            print('Error: %s' % e)
+            return None
+
+        if keys is not None and not isinstance(keys,(Mapping,set,frozenset)):
+            keys = set(keys)
+
+        return self._walkOrder(order,keys,reverse,top)
+
+    def _walkOrder (self,order=[],keys=None,reverse=False,top=None):
+
+        count = 0
+        found = 0
+        for k in (reversed(order) if reverse else order):
+            if keys is not None:
+                if k not in keys:
+                    continue
+                found += 1
+            if top and count == top:
+                return
+            count += 1
+            yield k
+
+        # keys from outside the dataset, e.g. a synthetic dictionary
+        if keys is None or found == len(keys):
+            return
+
+        for k in sorted([k for k in keys if k not in self._constants],
+                        reverse=reverse):
+            if top and count == top:
+                return
+            count += 1
+            yield k
+
+    #________________________________________________
+
+    def IterConstants (self,selection=None,by='name',reverse=False,top=None):
+        '''
+        Generator over constant property dictionaries in the
+        order of Order().  selection is a selection expression,
+        a set or list of keys, or a constants dictionary whose
+        own records are yielded; default every constant.
+        Records are fetched as they are consumed, so a writer
+        reading them never holds the whole selection.  None on
+        error.
+        '''
+
+        self._load()
+
+        if isinstance(selection,basestring_):
+            selection = self.Select(selection)
+            if selection is None:
+                return None
+
+        names = self.IterKeys(selection,by,reverse,top)
+        if names is None:
+            return None
+
+        source = selection if isinstance(selection,Mapping) else self._constants
+
+        return (source[k] for k in names)
+
+    #________________________________________________
+
+    def Search (self,words='',mode='and',top=None):
+        '''
+        Return constant keys whose names, symbols or units
+        contain all (mode 'and') or any (mode 'or') of the
+        words, best match first.  words is a string or list.
+        The token index is built on the first search.
+        '''
+
+        self._load()
+
+        if mode not in ['and','or']:
+            print('Error: search mode must be and or or, not %s' % mode)
+            return None
+
+        if not isinstance(words,basestring_):
+            words = ' '.join(words)
+
+        if self._tokens is None:
+            self._tokens = textindex.TokenIndex(self._constants)
+
+        ranked = self._tokens.search(textindex.words(words),mode,top)
+
+        return [k for score,k in ranked]
+
+    #________________________________________________
+
+    def _nearNames (self):
+        ''' trigram index of names and symbols, built on first use '''
+
+        if self._ngrams is None:
+            names = {}
+            for k,record in self._constants.items():
+                names[k] = k
+                names[record['Quantity ']] = k
+            for symbol,k in self._symbol_index.items():
+                names[symbol] = k
+            for alias,k in self._alias_index.items():
+                names.setdefault(alias,k)
+            self._ngrams = fuzzy.NgramIndex(names)
+
+        return self._ngrams
+
+    def Suggest (self,name='',count=3):
+        '''
+        Return up to count (score, key) pairs of constants whose
+        names or symbols most resemble name, best first.  Scores
+        run from 0.5 to 1.0, an exact match.
+        '''
+        return self._load()._nearNames().suggest(name,count)
+
+    def Resolve (self,name='',threshold=0.8):
+        '''
+        Return the key of the constant a possibly misspelled
+        name or symbol most resembles, or '' when no match
+        scores threshold or more or two are too close to call.
+        '''
+        key,score = self._load()._nearNames().resolve(name,threshold)
+        return key or ''
+
+#_______________________________________________________
+
+# one Dataset per edition, created on request and
+# loaded on first use; module functions use the current one
+
+_datasets_ = {}
+_dataset_ = None
+
+# Changes are made to a copy of a dataset, which is then
+# published by rebinding the names above, read-copy-update
+# style: readers never lock and never see a half-built
+# dataset.  Writers take _write_lock_ in turn, and every
+# publication advances _generation_.
+_write_lock_ = threading.RLock()
+_load_lock_ = threading.RLock()
+_generation_ = 0
+
+#_______________________________________________________
+
+def _publish (old=None, new=None):
+    '''
+    Replace dataset old with new, as the cached dataset of
+    its edition and, if old was current, as the current one.
+    Call with _write_lock_ held.
+    '''
+
+    global _dataset_, _generation_
+
+    _generation_ += 1
+    new._generation = _generation_
+
+    if _datasets_.get(new.Edition()) is old:
+        _datasets_[new.Edition()] = new
+
+    if _dataset_ is old:
+        _dataset_ = new
+
+    return True
+
+#_______________________________________________________
+
+def _change (method, *args):
+    '''
+    Apply a Dataset method to a copy of the current dataset
+    and publish the copy if the method succeeds.
+    '''
+
+    with _write_lock_:
+        old = _dataset_
+        new = old._copy()
+        result = method(new,*args)
+        if result is not False:
+            _publish(old,new)
+        return result
+
+#_______________________________________________________
+
+def Generation ():
+    '''
+    Return a counter advanced whenever a changed dataset
+    is published or the current edition changes; a cache
+    built at one generation is stale at any other.
+    '''
+    return _generation_
+
+#_______________________________________________________
+
+def Reload (edition=None):
+    '''
+    Read an edition again, with its export file and overlay
+    files, and publish it in one step.  Readers keep the
+    dataset they hold until they ask again.  Returns False,
+    keeping the old dataset, if a file can't be read.
+    '''
+
+    with _write_lock_:
+        old = GetDataset(edition)
+        if old is None:
+            return False
+
+        new = old._reread()
+        if new is None:
+            print('Error: can\'t reload CODATA %s, keeping the loaded data' % \
+                    old.Edition())
+            return False
+
+        return _publish(old,new)
+
+#_______________________________________________________
+
+def _available (edition=0):
+    ''' True if an edition is built in or its data file is present '''
+    if edition == 2014 and len(_phys_const_) > 1:
+        return True
+    return edition in _edition_files_ and os.path.exists(_datafile(_edition_files_[edition]))
+
+def Editions ():
+    ''' return list of CODATA edition years whose data can be read '''
+    return sorted([e for e in _edition_files_ if _available(e)])
+
+#_______________________________________________________
+
+def RegisterEdition (edition=0, codata_file='', citation=''):
+    '''
+    Add or replace the NIST SRD121 JSON file for an edition,
+    e.g. a locally downloaded CODATA 2018 file.
+    '''
+
+    global _generation_
+
+    edition = int(edition)
+    _edition_files_[edition] = codata_file
+    if citation != '':
+        _citations_[edition] = citation
+
+    # forget any dataset read from the previous file
+    with _write_lock_:
+        if edition in _datasets_:
+            del _datasets_[edition]
+            _generation_ += 1
+
+#_______________________________________________________
+
+def GetDataset (edition=None):
+    '''
+    Return the cached Dataset for an edition, the current
+    dataset when edition is None, or None for an unknown
+    edition or one whose data file isn't present.
+    '''
+
+    if edition is None:
+        return _dataset_
+
+    try:
+        year = int(edition)
+    except ValueError:
+        year = None
+
+    if not _available(year):
+        missing = ''
+        if year in _edition_files_:
+            missing = ', %s not found' % _edition_files_[year]
+        print('Error: no CODATA %s edition%s; editions are %s' % \
+                (edition,missing,', '.join([str(e) for e in Editions()])))
+        return None
+
+    with _write_lock_:
+        if year not in _datasets_:
+            _datasets_[year] = Dataset(year)
+
+    return _datasets_[year]
+
+#_______________________________________________________
+
+def SetEdition (edition=_default_edition_):
+    ''' select the edition used by the module functions '''
+
+    global _dataset_, _generation_
+
+    dataset = GetDataset(edition)
+    if dataset is None:
+        return False
+
+    with _write_lock_:
+        if dataset is not _dataset_:
+            _dataset_ = dataset
+            _generation_ += 1
+
+    return True
+
+#_______________________________________________________
+
+def Edition():
+    ''' CODATA edition year of the current dataset '''
+    return _dataset_.Edition()
+
+#_______________________________________________________
+
+def __init__():
+    """pyLint"""
+
+    SetEdition(_default_edition_)
+
+#_______________________________________________________
+def Citation():
+    '''Unambiguous statement of source'''
+    return _dataset_.Citation()
+
+#_______________________________________________________
+
+def Dictionary ():
+    ''' return the ENTIRE pythonic CODATA dictionary '''
+    return _dataset_.Dictionary()
+
+#_______________________________________________________
+
+def Value(constantname=''):
+    '''
+    return value as numerical ASCII and leave
+    binary translation to the application language.
+    '''
+    return _dataset_.Value(constantname)
+
+#_______________________________________________________
+
+def Uncertainty(constantname=''):
+    ''' return absolute uncertainty as numerical ASCII string '''
+    return _dataset_.Uncertainty(constantname)
+
+#_______________________________________________________
+
+def Units(constantname=''):
+    '''
+    Return units of constant.
+    Dimensionless constants are denoted by a null string ''
+    '''
+    return _dataset_.Units(constantname)
+
+#_______________________________________________________
+
+def Canonical (constantname=''):
+    ''' return the key of a constant by name or alternate name, or '' '''
+    return _dataset_.Canonical(constantname)
+
+#_______________________________________________________
+
+def Properties(constantname=''):
+    '''
+    return the single dictionary entry for a constant
+
+    constantname = 'planck constant' returns:
+
+    { "Quantity ": "Planck constant",
+      "Category": "universal",
+      "Symbol": "h"
+      "Uncertainty": "0.000000081e-34",
+      "Unit": "J s"
+      "Value": "6.626070040e-34",
+    }
+
+    '''
+    return _dataset_.Properties(constantname)
+
+#_______________________________________________________
+
+def Symbol (constantname=''):
+    return _dataset_.Symbol(constantname)
+
+#_______________________________________________________
+
+def SymbolName (symbol=''):
+    ''' return the constant name (key) defined by a symbol, or '' '''
+    return _dataset_.SymbolName(symbol)
+
+#_______________________________________________________
+
+def Categories():
+    ''' return list of all constant categories '''
+    return _dataset_.Categories()
+
+#_______________________________________________________
+
+def Names():
+    ''' return list of all constant names '''
+    return _dataset_.Names()
+
+#_______________________________________________________
+
+def Ids ():
+    ''' return {key: stable integer ID} for every constant '''
+    return _dataset_.Ids()
+
+#_______________________________________________________
+
+def Id (constantname=''):
+    ''' return the stable integer ID of a constant, -1 if none '''
+    return _dataset_.Id(constantname)
+
+#_______________________________________________________
+
+def RegisterIds (id_file=''):
+    '''
+    Add the IDs of constants the ID file lacks, e.g. from a
+    newer edition or an overlay, to the file, so they keep
+    them in every later run.  Returns the number added, or
+    -1 if the file can't be written.
+    '''
+
+    if id_file == '':
+        id_file = _datafile(_id_file_)
+
+    registered = {}
+    if os.path.exists(id_file):
+        registered = dict(_id_table(id_file))
+    added = 0
+
+    for k,number in _dataset_.Ids().items():
+        if k not in registered and number not in registered.values():
+            registered[k] = number
+            added += 1
+
+    if added == 0:
+        return 0
+
+    try:
+        with open(id_file,'w') as idfp:
+            idfp.write('{ "ids": {\n')
+            idfp.write(',\n'.join(['    %s: %d' % (json.dumps(k),number) for k,number in \
+                            sorted(registered.items(),key=lambda item: item[1])]))
+            idfp.write('\n} }\n')
+    except (IOError,OSError) as e:
+        print('Error: can\'t write %s, %s' % (id_file,e))
+        return -1
+
+    _id_tables_.pop(id_file,None)
+
+    return added
+
+#_______________________________________________________
+
+def Constants(category=''):
+    '''
+    Return a dictionary of constants within a category,
+    e.g., all 'universal' constants or 'physicochemical' ones
+    '''
+    return _dataset_.Constants(category)
+
+#_______________________________________________________
+
+def Select (expression=''):
+    ''' return the set of constant keys chosen by a selection expression '''
+    return _dataset_.Select(expression)
+
+#_______________________________________________________
+
+def Query (where='',category=None,unit=None,exact=None,
+           value=None,reluncert=None,name=None):
+    ''' return the set of constant keys satisfying every predicate '''
+    return _dataset_.Query(where,category,unit,exact,value,reluncert,name)
+
+#_______________________________________________________
+
+def Order (keys=None,by='name',reverse=False,top=None):
+    ''' return constant keys as a list in a precomputed sort order '''
+    return _dataset_.Order(keys,by,reverse,top)
+
+#_______________________________________________________
+
+def IterKeys (keys=None,by='name',reverse=False,top=None):
+    ''' yield constant keys one at a time in a precomputed sort order '''
+    return _dataset_.IterKeys(keys,by,reverse,top)
+
+#_______________________________________________________
+
+def IterConstants (selection=None,by='name',reverse=False,top=None):
+    ''' yield the records of a selection one at a time, in order '''
+    return _dataset_.IterConstants(selection,by,reverse,top)
+
+#_______________________________________________________
+
+def Search (words='',mode='and',top=None):
+    ''' return constant keys matching search words, best first '''
+    return _dataset_.Search(words,mode,top)
+
+#_______________________________________________________
+
+def Suggest (name='',count=3):
+    ''' return (score, key) pairs of the constants most like name '''
+    return _dataset_.Suggest(name,count)
+
+#_______________________________________________________
+
+def Resolve (name='',threshold=0.8):
+    ''' return the key a possibly misspelled name most resembles, or '' '''
+    return _dataset_.Resolve(name,threshold)
+
+#_______________________________________________________
+
+def AddOverlay (fname=''):
+    ''' publish the current dataset with site-local constants layered over it '''
+    return _change(Dataset.AddOverlay,fname)
+
+#_______________________________________________________
+
+def ClearOverlays ():
+    ''' publish the current dataset without its overlays '''
+    return _change(Dataset.ClearOverlays)
+
+#_______________________________________________________
+
+def Overlays ():
+    ''' return list of overlay files of the current dataset '''
+    return _dataset_.Overlays()
+
+#_______________________________________________________
+
+
+# text type of JSON-decoded strings
+try:
+    basestring_ = basestring
+except NameError:
+    basestring_ = str
+
+# fixed column order for CSV, JSON and JSON-lines exports
+_export_fields_ = ['Quantity ','Value','Unit','Uncertainty','Symbol','Category']
+
+#_______________________________________________________
+
+def _records (source={},names=None):
+    '''
+    Generator over constant property dictionaries.
+    source is either a constants dictionary, visited in
+    name (or the given) key order, or any iterable of
+    property dictionaries, which is passed through.
+    '''
+
+    if isinstance(source,Mapping):
+        if names is None:
+            names = _dataset_.IterKeys(source)
+        for name in names:
+            yield source[name]
+
+    else:
+        for record in source:
+            yield record
+
+#_______________________________________________________
+
+def _openExport (outfile=''):
+    '''
+    Open an export file for writing, gzip compressed when
+    the name ends in ".gz".  csv wants bytes on Python 2 and
+    text without newline translation on Python 3.
+    '''
+
+    compress = outfile.endswith('.gz')
+
+    if sys.version_info[0] < 3:
+        if compress:
+            return gzip.open(outfile,'wb',compresslevel=6)
+        return open(outfile,'wb')
+
+    if compress:
+        return gzip.open(outfile,'wt',compresslevel=6,newline='')
+    return open(outfile,'w',newline='')
+
+#_______________________________________________________
+
+def _exportStream (outfile, streamer):
+    '''
+    Run streamer(ofp) on an open file object or on a
+    file name opened with _openExport().  Returns its result.
+    '''
+
+    if hasattr(outfile,'write'):
+        return streamer(outfile)
+
+    with _openExport(outfile) as ofp:
+        return streamer(ofp)
+
+#_______________________________________________________
+
+def _recordEncoder (fields,indent=None):
+    '''
+    Return a function that serializes a record's fields, in
+    field order, as a JSON object.  Field names are encoded
+    once here; values go through the C string encoder rather
+    than a json.dumps() call and a temporary dict per record.
+    '''
+
+    quote = json.encoder.encode_basestring_ascii
+
+    if indent is None:
+        pad = ''
+        opener,joiner,closer,colon = '{', ',', '}', ':'
+    else:
+        pad = ' ' * indent
+        opener,joiner,closer,colon = '{\n' + pad, ',\n' + pad, '\n}', ': '
+
+    keys = [quote(f) + colon for f in fields]
+
+    def value (v):
+        if isinstance(v,basestring_):
+            return quote(v)
+        return json.dumps(v)
+
+    def encode (record):
+        get = record.get
+        return opener + \
+            joiner.join([k + value(get(f,'')) for k,f in zip(keys,fields)]) + \
+            closer
+
+    return encode
+
+#_______________________________________________________
+
+def ExportCSV (source={},outfile='',fields=None):
+    '''
+    Stream constants as CSV with the csv module, one row per
+    record, quoting every field.  source is a constants
+    dictionary or any generator of property dictionaries.
+    outfile is a file name (".gz" compresses) or open file.
+    Returns the number of rows written.
+
+    Columns default to _export_fields_:
+      "Quantity ","Value","Unit","Uncertainty","Symbol","Category"
+    '''
+
+    if fields is None:
+        fields = _export_fields_
+
+    py2 = sys.version_info[0] < 3
+
+    def cell (value):
+        if py2 and isinstance(value,unicode):
+            return value.encode('utf-8')
+        return value
+
+    def streamer (ofp):
+        writer = csv.writer(ofp,quoting=csv.QUOTE_ALL,lineterminator='\n')
+        writer.writerow(fields)
+
+        count = 0
+        for record in _records(source):
+            writer.writerow([cell(record.get(f,'')) for f in fields])
+            count += 1
+        return count
+
+    return _exportStream(outfile,streamer)
+
+#_______________________________________________________
+
+def ExportJSON (source={},outfile='',fields=None,indent=None):
+    '''
+    Stream constants as one JSON object keyed by stripped
+    constant name, the same shape WriteJSON() produces.
+    Records are serialized one at a time; output is compact
+    unless indent is given.  Returns the number of records.
+    '''
+
+    if fields is None:
+        fields = _export_fields_
+
+    encode = _recordEncoder(fields,indent)
+    quote = json.encoder.encode_basestring_ascii
+
+    if indent is None:
+        opener,joiner,closer,colon = '{', ',', '}\n', ':'
+        pad = ''
+    else:
+        pad = ' ' * indent
+        opener,joiner,closer,colon = '{\n' + pad, ',\n' + pad, '\n}\n', ': '
+
+    def streamer (ofp):
+        ofp.write(opener)
+
+        count = 0
+        for record in _records(source):
+            if count > 0:
+                ofp.write(joiner)
+
+            body = encode(record)
+            if indent is not None:
+                body = body.replace('\n','\n' + pad)
+
+            ofp.write(quote(_strip_name(record['Quantity '])) + colon + body)
+            count += 1
+
+        ofp.write(closer)
+        return count
+
+    return _exportStream(outfile,streamer)
+
+#_______________________________________________________
+
+def ExportJSONLines (source={},outfile='',fields=None):
+    '''
+    Stream constants as JSON lines: one compact JSON object
+    per record, fields in fixed order.  Returns the number
+    of records written.
+    '''
+
+    if fields is None:
+        fields = _export_fields_
+
+    encode = _recordEncoder(fields)
+
+    def streamer (ofp):
+        count = 0
+        for record in _records(source):
+            ofp.write(encode(record) + '\n')
+            count += 1
+        return count
+
+    return _exportStream(outfile,streamer)
+
+#_______________________________________________________
+
+def WriteJSON (cdict={},outfile=''):
+
+    if len(cdict) < 1 or outfile == '':
+        return
+
+    ExportJSON(cdict,outfile,indent=2)
+
+#_______________________________________________________
+
+def WriteCSV (cdict={},outfile=''):
+
+    if len(cdict) < 1 or outfile == '':
+        return
+
+    ExportCSV(cdict,outfile)
+
+#_______________________________________________________
+
+def _openImport (infile=''):
+    ''' Open an export file for reading, gunzipping ".gz" names '''
+
+    compress = infile.endswith('.gz')
+
+    if sys.version_info[0] < 3:
+        if compress:
+            return gzip.open(infile,'rb')
+        return open(infile,'rb')
+
+    if compress:
+        return gzip.open(infile,'rt',newline='')
+    return open(infile,'r',newline='')
+
+#_______________________________________________________
+
+def _missingFields (fields=[]):
+    ''' return required export fields absent from a column list '''
+    return [f for f in _export_fields_ if f not in fields]
+
+#_______________________________________________________
+
+def ImportCSV (infile=''):
+    '''
+    Load a CSV export (ExportCSV, WriteCSV) into a constants
+    dictionary keyed by stripped name.  The header is checked
+    once; rows are then mapped by precomputed column position.
+    Extra columns are ignored.
+    '''
+
+    cdict = {}
+    py2 = sys.version_info[0] < 3
+
+    with _openImport(infile) as ifp:
+        reader = csv.reader(ifp)
+
+        try:
+            header = next(reader)
+        except StopIteration:
+            return cdict
+
+        if py2:
+            header = [h.decode('utf-8') for h in header]
+
+        missing = _missingFields(header)
+        if len(missing) > 0:
+            print('Error: %s lacks columns %s' % (infile,', '.join(missing)))
+            return {}
+
+        columns = [(f,header.index(f)) for f in _export_fields_]
+        ncols = len(header)
+
+        for row in reader:
+            if len(row) != ncols:
+                if len(row) == 0:
+                    continue
+                print('Error: %s line %d has %d columns, expected %d' % \
+                        (infile,reader.line_num,len(row),ncols))
+                return {}
+
+            if py2:
+                row = [c.decode('utf-8') for c in row]
+
+            record = dict([(f,row[i]) for f,i in columns])
+            cdict[_strip_name(record['Quantity '])] = record
+
+    return cdict
+
+#_______________________________________________________
+
+def ImportJSON (infile=''):
+    '''
+    Load a JSON export (ExportJSON, WriteJSON): one object
+    keyed by stripped name.  Fields are checked on the first
+    record only.
+    '''
+
+    with _openImport(infile) as ifp:
+        cdict = json.load(ifp)
+
+    if len(cdict) < 1:
+        return {}
+
+    first = cdict[next(iter(cdict))]
+    missing = _missingFields(first.keys())
+    if len(missing) > 0:
+        print('Error: %s lacks fields %s' % (infile,', '.join(missing)))
+        return {}
+
+    return cdict
+
+#_______________________________________________________
+
+def ImportJSONLines (infile=''):
+    '''
+    Load a JSON-lines export (ExportJSONLines), one record
+    per line.  Fields are checked on the first record only.
+    '''
+
+    cdict = {}
+    checked = False
+
+    with _openImport(infile) as ifp:
+        for lineno,line in enumerate(ifp):
+            line = line.strip()
+            if line == '':
+                continue
+
+            record = json.loads(line)
+
+            if not checked:
+                missing = _missingFields(record.keys())
+                if len(missing) > 0:
+                    print('Error: %s lacks fields %s' % \
+                            (infile,', '.join(missing)))
+                    return {}
+                checked = True
+
+            try:
+                cdict[_strip_name(record['Quantity '])] = record
+            except (KeyError,TypeError):
+                print('Error: %s line %d is not a constant record' % \
+                        (infile,lineno+1))
+                return {}
+
+    return cdict
+
+#_______________________________________________________
+
+def Import (infile=''):
+    '''
+    Load any export file, choosing the reader by suffix:
+    .csv, .json or .jsonl, optionally followed by .gz
+    '''
+
+    name = infile
+    if name.endswith('.gz'):
+        name = name[:-3]
+
+    if name.endswith('.csv'):
+        return ImportCSV(infile)
+
+    elif name.endswith('.jsonl'):
+        return ImportJSONLines(infile)
+
+    elif name.endswith('.json'):
+        return ImportJSON(infile)
+
+    print('Error: %s is not a .csv, .json or .jsonl file' % infile)
+    return {}
+
+#_______________________________________________________
+
+def LoadExport (infile=''):
+    ''' publish the current dataset with its dictionary replaced by an export file '''
+    return _change(Dataset.LoadExport,infile)
+
+#_______________________________________________________
+
+def OpenDataset (spec=None):
+    '''
+    Return a Dataset for a diff operand:
+
+        Dataset instance      - itself
+        None                  - the current dataset
+        2010, '2010'          - a cached edition
+        'site.csv'            - a fresh dataset holding an export file
+        '2014+site.json'      - a fresh dataset with overlays added,
+        'site.csv+more.json'    left to right
+
+    Returns None if any part can't be loaded.
+    '''
+
+    if isinstance(spec,Dataset):
+        return spec
+
+    if spec is None:
+        return GetDataset()
+
+    parts = str(spec).split('+')
+    base,overlays = parts[0],parts[1:]
+
+    if base.isdigit():
+        dataset = GetDataset(base)
+        if dataset is None:
+            return None
+
+        # keep the cached edition free of these overlays
+        if len(overlays) > 0:
+            cached = dataset
+            dataset = Dataset(cached.Edition(),cached._codata_file,
+                              cached._symbol_file,cached.Citation())
+
+    else:
+        dataset = Dataset()
+        if dataset.LoadExport(base) is False:
+            return None
+
+    for fname in overlays:
+        if dataset.AddOverlay(fname) is False:
+            return None
+
+    return dataset
+
+#_______________________________________________________
+
+_diff_fields_ = ['Value','Uncertainty','Unit','Symbol','Category']
+
+def _float (numstr=''):
+    ''' numeric string --> float, None if it isn't one '''
+    try:
+        return float(numstr)
+    except (TypeError,ValueError):
+        return None
+
+#_______________________________________________________
+
+def Diff (old=None, new=None):
+    '''
+    Compare two datasets (anything OpenDataset accepts) by
+    constant key in one pass over each key set.  Returns:
+
+        { 'added':   { key: record, ... },
+          'removed': { key: record, ... },
+          'changed': { key: { 'fields': ['Value', ...],
+                              'old': record, 'new': record,
+                              'shift': relative value shift or None },
+                       ... } }
+
+    Values and uncertainties are compared numerically, so
+    "299792458" and "299792458.0" are the same; the shift is
+    (new - old)/|old|.
+    '''
+
+    old = OpenDataset(old)
+    new = OpenDataset(new)
+    if old is None or new is None:
+        return None
+
+    olddict = old.Dictionary()
+    newdict = new.Dictionary()
+
+    added   = {}
+    removed = {}
+    changed = {}
+
+    for key in olddict:
+        if key not in newdict:
+            removed[key] = olddict[key]
+            continue
+
+        a = olddict[key]
+        b = newdict[key]
+        if a is b:
+            continue
+
+        fields = []
+        for f in _diff_fields_:
+            if a[f] == b[f]:
+                continue
+            if f in ['Value','Uncertainty']:
+                fa,fb = _float(a[f]),_float(b[f])
+                if fa is not None and fa == fb:
+                    continue
+            fields.append(f)
+
+        if len(fields) == 0:
+            continue
+
+        shift = None
+        fa,fb = _float(a['Value']),_float(b['Value'])
+        if 'Value' in fields and fa is not None and fb is not None and fa != 0.0:
+            shift = (fb - fa)/abs(fa)
+
+        changed[key] = {'fields':fields, 'old':a, 'new':b, 'shift':shift}
+
+    for key in newdict:
+        if key not in olddict:
+            added[key] = newdict[key]
+
+    return {'added':added, 'removed':removed, 'changed':changed}
+
+#_______________________________________________________
+
+def AffectedHeaders (diff={}, headers=[]):
+    '''
+    Return the generated header files that declare a constant
+    added, removed or changed in a Diff() result.  Declarations
+    are found by their description comment line,
+
+        # Planck constant                      (universal)
+
+    a C lookup header's index line or its source's names array,
+
+        //  251  h               Planck constant (universal)
+            "Planck constant",
+
+    or a Python module's trailing comment,
+
+        h = 6.626070040e-34               # Planck constant, +/-...
+
+    with one regular expression of every affected name, so
+    each header is read once.
+    '''
+
+    if diff is None:
+        return []
+
+    names = []
+    for key in diff['changed']:
+        names.append(diff['changed'][key]['old']['Quantity '])
+    for which in ['added','removed']:
+        for key in diff[which]:
+            names.append(diff[which][key]['Quantity '])
+
+    if len(names) == 0:
+        return []
+
+    # comment markers of every syntax in formats.py
+    names = sorted(set(names),key=len,reverse=True)
+    alternatives = '(?:' + '|'.join([re.escape(n) for n in names]) + ')'
+    pattern = re.compile(r'^\s*(?:#|//|/\*|C|!)\s*(?:\d+\s+\S+\s+)?' + \
+                         alternatives + r'\s*\(' + \
+                         r'|^\s*"' + alternatives + r'",$' + \
+                         r'|\S\s*#\s*' + alternatives + r',\s',
+                         re.IGNORECASE|re.MULTILINE)
+
+    affected = []
+    for fname in headers:
+        if not _fileExists(fname):
+            continue
+        with open(fname,'r') as ifp:
+            if pattern.search(ifp.read()) is not None:
+                affected.append(fname)
+
+    return affected
+
+#_______________________________________________________
+
+# Explicitly initialize since module isn't a class yet
+
+
+__init__()
+
+
+#_______________________________________________________
+
+#
+# Low-rent unit testing follows.
+
+def _test_codata():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+    print('CITATION:')
+    print(Citation())
+
+    # scan property dictionaries for oddness
+    cdict  = Dictionary()
+    keys = cdict.keys()
+    len_names = len(Names())
+    len_dict = len(cdict)
+    len_keys = len(keys)
+
+    print('CODATA dictionary has %d members' % len_dict)
+    print("NOTE: entries: %d  keys: %d" %(len_dict, len_keys))
+    print("NOTE: names() list len %d" %(len_names))
+
+    dict_err = 0
+    for name in keys:
+        mem = cdict[name]
+        if len(mem) == 0:
+            print('%s property dict is empty' % name)
+
+        elif len(mem)!=6:
+            print('%s property dict has len %d, should be 5' % (name,len(mem)))
+            dict_err+=1
+        else:
+            fields = ['Quantity ','Value','Category','Uncertainty','Symbol']
+            for fld in fields:
+                try:
                     if mem[fld] == '':
                         print('%s \'%s\' field is empty' % (name,fld))
                         dict_err+=1
@@ -3248,8 +5249,342 @@ def _test_codata():
         cat_total += catlen
     print('\ncategory total: %d, dictionary size: %d' % (cat_total, len_dict))
 
-    #WriteJSON (cdict={},outfile='')
-    #WriteCSV (cdict={},outfile='')
+    # streaming exporters, plain and compressed
+    import tempfile
+    tmpdir = tempfile.mkdtemp()
+    print('')
+    for ext in ['csv','json','jsonl','csv.gz','json.gz','jsonl.gz']:
+        fname = os.path.join(tmpdir,'codata.' + ext)
+        if ext.startswith('csv'):
+            nrec = ExportCSV(cdict,fname)
+        elif ext.startswith('jsonl'):
+            nrec = ExportJSONLines(_records(cdict),fname)
+        else:
+            nrec = ExportJSON(cdict,fname)
+
+        # round trip through the importers
+        back = Import(fname)
+        nread = len(back)
+        changed = [k for k in cdict.keys() if k not in back or \
+                    [back[k][f] for f in _export_fields_] != \
+                    [cdict[k][f] for f in _export_fields_]]
+
+        if nrec != len_dict or nread != len_dict or len(changed) > 0:
+            print('export %s wrote %d, read %d records, expected %d, %d changed' % \
+                    (ext,nrec,nread,len_dict,len(changed)))
+        else:
+            print('export %-8s: %d records round trip' % (ext,nread))
+        os.remove(fname)
+
+    # overlay layers
+    print('')
+    overlay = os.path.join(tmpdir,'site.json')
+    with open(overlay,'w') as ofp:
+        json.dump({'constant':[
+            {'Quantity ':'Planck constant','Symbol':'h_Planck'},
+            {'Quantity ':'silicon band gap','Value':1.12,'Unit':'eV',
+             'Category':'materials','Symbol':'E_g_Si'}],
+            'aliases':{'band gap of Si':'silicon band gap',
+                       'light speed':'Planck constant'}},ofp)
+
+    base_planck = Properties('Planck constant')
+    AddOverlay(overlay)
+
+    if Symbol('Planck constant') != 'h_Planck' or \
+        SymbolName('h_Planck') != 'planck constant' or \
+        SymbolName('h') != '':
+        print('overlay symbol override failed')
+    if Value('planck constant') != base_planck['Value'] or \
+        base_planck['Symbol'] != 'h':
+        print('overlay altered the base record')
+    if list(Constants('materials').keys()) != ['silicon band gap'] or \
+        Value('silicon band gap') != '1.12' or \
+        len(Dictionary()) != len_dict + 1 or len(Names()) != len_dict + 1:
+        print('overlay indexes not updated')
+    else:
+        print('overlay %s: %d constants, %d categories' % \
+                (os.path.basename(overlay),len(Dictionary()),len(Categories())))
+
+    # a value that isn't a number is refused
+    bad = os.path.join(tmpdir,'bad.json')
+    with open(bad,'w') as ofp:
+        json.dump({'constant':[{'Quantity ':'silicon band gap','Value':'1.1x'}]},ofp)
+    if AddOverlay(bad) is not False or Value('silicon band gap') != '1.12':
+        print('overlay with a bad value accepted')
+    os.remove(bad)
+
+    # stable IDs: registered, provisional for the overlay's constant, persisted
+    ids = Ids()
+    id_file = os.path.join(tmpdir,'ids.json')
+    if Id('Planck constant') != 251 or Id('no such constant') != -1 or \
+        len(set(ids.values())) != len(ids) or \
+        ids['silicon band gap'] != len_dict or \
+        RegisterIds(id_file) != len(ids) or RegisterIds(id_file) != 0 or \
+        _id_table(id_file) != ids:
+        print('stable IDs failed: Planck constant %d, silicon band gap %d' % \
+                (Id('Planck constant'),ids.get('silicon band gap',-1)))
+    else:
+        print('stable IDs: %d constants, %d registered' % (len(ids),len(ids) - 1))
+    os.remove(id_file)
+
+    # alternate names, built in and from the overlay
+    cases = [('Avogadro number','avogadro constant'),
+             ('electron-volt','electron volt'),
+             (u'electron\u2010volt','electron volt'),
+             ('proton magnetic moment','proton mag mom '),
+             ('vacuum permittivity','electric constant'),
+             ('band gap of Si','silicon band gap'),
+             ('light speed','planck constant'),
+             ('Planck constant','planck constant'),
+             ('no such constant','')]
+    for name,expected in cases:
+        if Canonical(name) != expected:
+            print('Canonical(%s) returned \'%s\', expected \'%s\'' % \
+                    (name,Canonical(name),expected))
+    if Value('Avogadro number') != Value('Avogadro constant'):
+        print('Value() did not resolve an alias')
+    else:
+        print('Canonical() resolved %d alternate names' % len(cases))
+
+    ClearOverlays()
+
+    if Canonical('band gap of Si') != '' or \
+        Canonical('light speed') != 'speed of light in vacuum':
+        print('ClearOverlays() left overlay aliases behind')
+
+    # keyed diff against the same edition plus the overlay
+    diff = Diff(Edition(),'%d+%s' % (Edition(),overlay))
+    if list(diff['added'].keys()) != ['silicon band gap'] or \
+        len(diff['removed']) != 0 or \
+        list(diff['changed'].keys()) != ['planck constant'] or \
+        diff['changed']['planck constant']['fields'] != ['Symbol']:
+        print('Diff() of overlay failed: %s' % diff)
+    else:
+        print('Diff() of overlay: 1 added, 1 changed')
+
+    # snapshots: read-only records, copy-on-write changes, atomic reload
+    snapshot = GetDataset()
+    generation = Generation()
+    try:
+        Properties('Planck constant')['Value'] = '0.0'
+        print('Properties() handed out a writable record')
+    except TypeError:
+        pass
+
+    AddOverlay(overlay)
+    with open(overlay,'w') as ofp:
+        json.dump({'constant':[{'Quantity ':'Planck constant','Symbol':'h_edited'}]},ofp)
+
+    failures = []
+    def reader ():
+        for i in range(200):
+            dataset = GetDataset()
+            if dataset.SymbolName(dataset.Symbol('Planck constant')) != 'planck constant':
+                failures.append(dataset.Generation())
+    readers = [threading.Thread(target=reader) for i in range(4)]
+    for thread in readers:
+        thread.start()
+    for i in range(5):
+        Reload()
+    for thread in readers:
+        thread.join()
+
+    if Symbol('Planck constant') != 'h_edited' or len(failures) > 0 or \
+        snapshot.Symbol('Planck constant') != 'h' or \
+        Generation() != generation + 6 or GetDataset().Generation() != Generation():
+        print('Reload() failed: symbol %s, %d inconsistent reads, generation %d' % \
+                (Symbol('Planck constant'),len(failures),Generation()))
+    else:
+        print('Reload() published generation %d; snapshot %d unchanged' % \
+                (Generation(),snapshot.Generation()))
+
+    os.remove(overlay)
+    if Reload() is not False or Symbol('Planck constant') != 'h_edited':
+        print('Reload() dropped data when an overlay went missing')
+    ClearOverlays()
+    if 'materials' in Categories() or SymbolName('h') != 'planck constant' or \
+        len(Dictionary()) != len_dict:
+        print('ClearOverlays() did not restore the base dictionary')
+
+    # selection algebra over category, name and symbol indexes
+    print('')
+    five = os.path.join(tmpdir,'five.txt')
+    with open(five,'w') as ofp:
+        ofp.write('# five names\nPlanck constant\nelectron mass\n\n' + \
+                  'proton mass\nneutron mass\nbogus constant\n')
+
+    universal = set(Constants('universal').keys())
+    atomic = set(Constants('atomic units').keys())
+    cases = [
+        ('universal | @%s' % five,  universal | set(['planck constant','electron mass',
+                                        'proton mass','neutron mass'])),
+        ('atomic units - glob:*electron*',
+                                    set([k for k in atomic if 'electron' not in k])),
+        ("(electron | muon) & re:'mag mom *$' - sym:mu_e",
+                                    set([k for k in list(Constants('electron').keys()) + \
+                                                    list(Constants('muon').keys()) \
+                                         if re.search('mag mom *$',k) and \
+                                            k != SymbolName('mu_e')])),
+        ('h + name:\'speed of light in vacuum\'',
+                                    set(['planck constant','speed of light in vacuum'])),
+        ('all',                     set(Names())),
+        ]
+    for expr,expected in cases:
+        keys = Select(expr)
+        if keys != expected or len(expected) == 0:
+            print('Select(%s) returned %s' % (expr,keys))
+        else:
+            print('Select %-50s: %d constants' % (expr.replace(five,'five.txt'),len(keys)))
+    for expr in ['nosuch category', 'universal |', 're:(']:
+        if Select(expr) is not None:
+            print('Select(%s) accepted a bad expression' % expr)
+    os.remove(five)
+
+    os.rmdir(tmpdir)
+
+    # predicate queries against brute-force scans of the records
+    def rel (k):
+        value = float(cdict[k]['Value'])
+        return abs(float(cdict[k]['Uncertainty'])/value) if value else 0.0
+
+    cases = [
+        ('unit == J and reluncert > 1e-8',
+            [k for k in keys if cdict[k]['Unit'] == 'J' and rel(k) > 1e-8]),
+        ('exact',
+            [k for k in keys if float(cdict[k]['Uncertainty']) == 0.0]),
+        ("value >= 1e-30 and value < 1e-20 and name ~ 'mass$'",
+            [k for k in keys if 1e-30 <= float(cdict[k]['Value']) < 1e-20 and \
+                                re.search('mass$',k)]),
+        ('category == universal and not exact and unit != m',
+            [k for k in Constants('universal').keys() if rel(k) > 0 and \
+                                cdict[k]['Unit'] != 'm']),
+        ]
+    print('')
+    for where,expected in cases:
+        found = Query(where)
+        if found != set(expected) or len(expected) == 0:
+            print('Query(%s) returned %s, expected %s' % (where,found,sorted(expected)))
+        else:
+            print('Query %-50s: %d constants' % (where,len(found)))
+
+    found = Query(unit='J',reluncert=(1e-8,None),name='energy')
+    if found != set([k for k in keys if cdict[k]['Unit'] == 'J' and \
+                        rel(k) >= 1e-8 and 'energy' in k]):
+        print('Query() keywords returned %s' % found)
+    if Query('unit ~ [') is not None or Query(value=('low',None)) is not None:
+        print('Query() accepted a bad clause')
+
+    # inverted token index against a scan of the names
+    found = Search('proton magnetic')
+    expected = [k for k in keys if 'proton' in k and ' mag ' in k + ' ']
+    if set(found) != set(expected) or len(expected) == 0:
+        print('Search(proton magnetic) returned %s, expected %s' % (found,expected))
+    elif found[0] != 'proton mag mom ':
+        print('Search(proton magnetic) ranked %s first' % found[0])
+    else:
+        print('Search proton magnetic: %d constants, best %s' % \
+                (len(found),cdict[found[0]]['Quantity ']))
+
+    found = Search(['muon','tau'],'or',top=5)
+    if len(found) != 5 or Search('mu_P')[0] != SymbolName('mu_P') or \
+        len(Search('proton neutron deuteron triton')) != 0:
+        print('Search() modes failed')
+    if Search('x','xor') is not None:
+        print('Search() accepted a bad mode')
+
+    # near-miss names from legacy input lists
+    cases = [('Plank constant','planck constant'),
+             ('Boltzman constant','boltzmann constant'),
+             ('speed of lite in vacuum','speed of light in vacuum'),
+             ('electron-volt','electron volt'),
+             ('avogadro numbr','avogadro constant'),
+             ('quark mass','')]
+    for name,expected in cases:
+        if Resolve(name) != expected:
+            print('Resolve(%s) returned \'%s\', expected \'%s\'' % \
+                    (name,Resolve(name),expected))
+    near = [k for score,k in Suggest('avogadro number')]
+    if 'avogadro constant' not in near:
+        print('Suggest(avogadro number) returned %s' % near)
+    else:
+        print('Resolve() and Suggest() matched %d misspelled names' % len(cases))
+
+    # precomputed sort orders and top-k
+    least = Order(by='reluncert',reverse=True,top=20)
+    expected = sorted(keys,key=lambda k: (rel(k),k),reverse=True)[:20]
+    if least != expected:
+        print('Order() 20 least precise: %s' % least)
+    universal = Constants('universal')
+    if Order(universal,'category') != sorted(universal.keys()) or \
+        Order(universal,'symbol') != sorted(universal.keys(),
+                                key=lambda k: (universal[k]['Symbol'],k)) or \
+        Order(by='magnitude',top=1) != \
+            [min(keys,key=lambda k: abs(float(cdict[k]['Value'])))] or \
+        Order(by='name') != sorted(keys) or \
+        GetDataset().Columns().order('value') is not \
+            GetDataset().Columns().order('value'):
+        print('Order() sort keys failed')
+    elif Order(by='colour') is not None:
+        print('Order() accepted a bad sort key')
+    else:
+        print('Order() 20 least precise, from %s to %s' % (least[0],least[-1]))
+
+    # lazy iteration in the same orders
+    stream = IterConstants('X-ray',by='value',reverse=True)
+    first = next(stream)
+    xray = Order(Constants('X-ray'),'value',True)
+    if first is not cdict[xray[0]] or \
+        [r['Quantity '] for r in stream] != \
+            [cdict[k]['Quantity '] for k in xray[1:]] or \
+        list(IterKeys(universal,top=3)) != Order(universal,top=3) or \
+        [r['Value'] for r in IterConstants({'x':{'Value':'1'}})] != ['1']:
+        print('IterConstants() order failed')
+    elif IterConstants('bogus |') is not None or IterKeys(by='colour') is not None:
+        print('IterConstants() accepted a bad selection')
+    else:
+        print('IterConstants() streamed %d X-ray records' % len(xray))
+
+    # a second edition shares unchanged records with the first
+    print('')
+    RegisterEdition(1914,_datafile(_codata2014_file_),'test edition\n')
+    other = GetDataset(1914)
+    if other._loaded:
+        print('edition 1914 loaded before use')
+    shared = [k for k in Names() if other.Properties(k) is Properties(k)]
+    if len(shared) != len_dict or other.Citation() != 'test edition\n':
+        print('edition 1914 shares %d of %d records' % (len(shared),len_dict))
+    else:
+        print('editions %d and %d share %d records' % \
+                (Edition(),other.Edition(),len(shared)))
+    del _edition_files_[1914]
+    del _datasets_[1914]
+    del _citations_[1914]
+
+    # an edition whose data file is missing is neither listed nor loaded
+    RegisterEdition(1915,'srd121_allascii_1915.json')
+    if 1915 in Editions() or GetDataset(1915) is not None or \
+        GetDataset('abc') is not None or Editions() != [_default_edition_]:
+        print('edition 1915 listed or loaded without its data file')
+    del _edition_files_[1915]
+
+    # a constant renamed in an edition keeps its symbol and category
+    renamed = os.path.join(tempfile.mkdtemp(),'srd121_allascii_1916.json')
+    with open(renamed,'w') as ofp:
+        json.dump({'constant':[
+            {'Quantity ':'reduced Planck constant','Value':'1.054 571 817... e-34',
+             'Uncertainty':'(exact)','Unit':'J s'},
+            {'Quantity ':'Planck constant','Value':'6.626 070 15 e-34',
+             'Uncertainty':'(exact)','Unit':'J Hz^-1'}]},ofp)
+    RegisterEdition(1916,renamed)
+    other = GetDataset(1916)
+    hbar = other.Properties('reduced Planck constant')
+    if hbar['Symbol'] != 'hbar' or hbar['Category'] != 'universal' or \
+        hbar['Quantity '] != 'reduced Planck constant' or '' in other.Categories():
+        print('renamed constant lost its symbol or category: %s' % dict(hbar))
+    del _edition_files_[1916]
+    del _datasets_[1916]
+    os.remove(renamed)
+    os.rmdir(os.path.dirname(renamed))
 
     print('\n#### END %s test\n' % __file__.upper())
 
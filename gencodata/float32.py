@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+ float32.py -
+
+    IEEE single precision values of CODATA constants, for
+    single and mixed precision output (--precision):
+
+        '6.626070040e-34'  --> 6.62607e-34     (float32 6.6260702e-34)
+        '299792458'        --> 2.9979245e8     (float32 299792448)
+
+    A value is rounded to the nearest float32, ties to even,
+    from the exact rational value of its decimal string, not
+    from a double: rounding to double first and then to
+    float32 can land on the wrong side of a tie.  The literal
+    written is the shortest decimal that rounds back to that
+    float32, so any conforming compiler reads the same value.
+
+    FLT_EPSILON is the float32 resolution: a constant whose
+    relative uncertainty is smaller is known better than a
+    float32 can hold it.
+
+ creation: 10/19/2026
+"""
+
+import sys
+import math
+
+from fractions import Fraction
+
+FLT_EPSILON = 2.0**-23
+FLT_MIN = 2.0**-126                     # smallest normal float32
+FLT_MAX = (2.0 - 2.0**-23)*2.0**127
+
+_digits_ = 23                           # stored significand bits
+_lowest_ = -149                         # exponent of the smallest subnormal
+
+#______________________________________________________
+
+def round32 (text=''):
+    '''
+    The float32 nearest the decimal string text, as a
+    float; inf beyond FLT_MAX.  Raises ValueError for a
+    string that is not a number.
+    '''
+
+    exact = Fraction(text.strip())
+    if exact == 0:
+        return 0.0
+
+    sign = -1.0 if exact < 0 else 1.0
+    exact = abs(exact)
+
+    # 2**power <= exact < 2**(power+1)
+    power = exact.numerator.bit_length() - exact.denominator.bit_length()
+    if exact < Fraction(2)**power:
+        power -= 1
+
+    # whole multiples of the spacing at that power, ties to even
+    quantum = max(power - _digits_,_lowest_)
+    scaled = exact / Fraction(2)**quantum
+    whole = scaled.numerator // scaled.denominator
+    rest = scaled - whole
+    if rest > Fraction(1,2) or (rest == Fraction(1,2) and whole % 2 == 1):
+        whole += 1
+
+    value = math.ldexp(whole,quantum)
+    if value > FLT_MAX:
+        return sign*float('inf')
+
+    return sign*value
+
+#______________________________________________________
+
+def literal32 (text=''):
+    '''
+    Shortest decimal string, e.g. '6.62607e-34', that
+    rounds to the same float32 as text.
+    '''
+
+    value = round32(text)
+    if value == 0.0 or math.isinf(value):
+        return repr(value)
+
+    for digits in range(1,10):
+        mantissa,exponent = ('%.*e' % (digits - 1,value)).split('e')
+        literal = '%se%d' % (mantissa,int(exponent))
+        if round32(literal) == value:
+            return literal
+
+    return literal
+
+#______________________________________________________
+
+def fits32 (text=''):
+    ''' True if text is zero or rounds to a normal, finite float32 '''
+
+    if Fraction(text.strip()) == 0:
+        return True
+
+    return FLT_MIN <= abs(round32(text)) <= FLT_MAX
+
+#______________________________________________________
+
+def _test_float32 ():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    cases = [
+        ('6.626070040e-34',     '6.62607e-34'),
+        ('299792458',           '2.9979245e8'),
+        ('0.1',                 '1e-1'),
+        ('-1.1517084',          '-1.1517084e0'),
+        ('16777217',            '1.6777216e7'),     # tie, rounds to even
+        ('16777219',            '1.677722e7'),      # tie, rounds up to even
+        ('1.4e-45',             '1e-45'),           # smallest subnormal
+        ]
+    for text,expected in cases:
+        literal = literal32(text)
+        if literal != expected:
+            print('!literal32(%s) = %s, expected %s' % (text,literal,expected))
+            errors += 1
+
+    # just above a tie: the double nearest this rounds to the tie, then to even
+    text = '1.00000005960464477539062500000000001'
+    if round32(text) != 1.0 + 2.0**-23 or float(text) != 1.0 + 2.0**-24:
+        print('!round32(%s) = %r, rounded through a double' % (text,round32(text)))
+        errors += 1
+
+    if not math.isinf(round32('3.5e38')) or fits32('6.2e-65') or \
+        fits32('1e-40') or not fits32('0.0') or not fits32('3.4e38'):
+        print('!round32() or fits32() range failed')
+        errors += 1
+
+    print('\t%d float32 errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_float32()
+    sys.exit()
@@ -1,15 +1,24 @@
+import re
 import sys
+import copy
 import time
+import keyword
+
+from collections import OrderedDict
+
 import codata
+import perfecthash
+import float32
 
 LINELEN=78
 
 class LanguageFormat:
 
-    def __init__(self,language,comment,indent,block='',endblock=''):
+    def __init__(self,language,comment,indent,block='',endblock='',extension='.txt'):
         self._language  = language
         self._comment   = comment
         self._indent    = indent
+        self._extension = extension
 
         '''C/C++, Python, et.al. have block commenting (/**/, """block""")
             Fortran has only line commenting.
@@ -21,6 +30,10 @@ class LanguageFormat:
     def language(self):
         return self._language
 
+    def Extension(self):
+        ''' file name suffix of a header in this syntax '''
+        return self._extension
+
     def _camelCase(self,s=''):
         ''' "Planck constant" --> PlanckConstant '''
         slist = s.replace('.','').replace('-',' ').split(' ')
@@ -58,6 +71,10 @@ class LanguageFormat:
         else:
             return sym
 
+    def Identifier (self,sym=''):
+        ''' the name code uses for a symbol; most syntaxes keep it '''
+        return sym
+
     def Description (self,name,cat):
         offset = 39 - (len(self._comment) + 1)
         fmtstr = ('%%-%ds(%%s)' % (offset))
@@ -80,14 +97,29 @@ class LanguageFormat:
         wrapped = (fmtstr % (start, line, end))
         return wrapped
 
-    def FileHead (self):
+    def FileHead (self,dataset=None):
         '''
         ---language-specific string---
         return a file header containing
-            title, date, and CODATA citation.
+            title, date, and CODATA citation
+            of dataset, default the current one.
         '''
 
-        cites = codata.Citation().split('\n')
+        if dataset is None:
+            dataset = codata.GetDataset()
+
+        self._defined = dict(self._claimed or {})
+
+        if self._index:
+            self._dataset = dataset
+            self._indexed = []
+
+        if self._convert:
+            self._dataset = dataset
+            self._relations = []
+
+        cites = dataset.Citation().split('\n')
+        title = 'CODATA %s CONSTANTS FROM NIST SRD121\n' % dataset.Edition()
 
         PAD = self._indent
 
@@ -101,7 +133,7 @@ class LanguageFormat:
             citebody = ''.join([('   %s\n' % line.strip()) for line in cites])
 
             fheader = STARTBLOCK + '\n' + \
-                    PAD + 'CODATA 2014 CONSTANTS FROM NIST SRD121\n' + \
+                    PAD + title + \
                     PAD + time.asctime() + '\n\n' + \
                     citebody + \
                     ENDBLOCK + '\n'
@@ -114,7 +146,7 @@ class LanguageFormat:
             citebody = CMNTSP.join([('%s\n' % line.strip()) for line in cites])
 
             fheader = CMNT + '\n' + \
-                    CMNT + PAD + 'CODATA 2014 CONSTANTS FROM NIST SRD121\n' + \
+                    CMNT + PAD + title + \
                     CMNT + PAD + time.asctime() + '\n' + \
                     CMNT + '\n' + \
                     CMNT + ' ' + citebody + \
@@ -126,12 +158,17 @@ class LanguageFormat:
 
     def formatMembers(self,cname,cdict):
 
+        if self._index:
+            self._indexed.append((cname,cdict))
+
+        if self._convert and cdict['Category'] == 'equivalents':
+            self._relations.append((cname,cdict))
+
         description = self.Description( cname, cdict['Category'])
 
         '''value & symbol fold into /defines/ string'''
-        value       = self.Value( cdict['Value'])
-        symbol      = self.Symbol( cdict['Symbol'], cname)
-        defines     = self.Define( symbol, value)
+        symbol      = self.Identifier( self.Symbol( cdict['Symbol'], cname))
+        defines     = self.Defines( symbol, cdict['Value'])
 
         uncerts     = self.Uncertainty( cdict['Uncertainty'])
         units       = self.Units( cdict['Unit'])
@@ -167,7 +204,302 @@ class LanguageFormat:
             (' END file: %s as %s %s\n' % \
             (fname,self._language,time.asctime()))
 
-        return ftail
+        return self.IndexTable() + self.ConversionTable() + ftail
+
+    # _______________________________________________________
+
+    def GuardHead(self,guard=''):
+        ''' ---language-specific string--- opens an include guard '''
+        return ''
+
+    def GuardTail(self,guard=''):
+        ''' ---language-specific string--- closes an include guard '''
+        return ''
+
+    def Include(self,fname=''):
+        '''
+        ---language-specific string---
+        pulls a split header into an umbrella header
+        '''
+        return ("%s include %s\n" % (self._comment,fname))
+
+    def ForUnit(self,name=''):
+        '''
+        format for one of several split files, named name;
+        syntaxes that name their output unit return a copy,
+        as does an indexed or converting format, its IDs and
+        kernels being per file
+        '''
+        if not self._index and not self._convert:
+            return self
+
+        unit = copy.copy(self)
+        unit._unit = name
+        return unit.Index(self._index).Convert(self._convert)
+
+    def Companion(self,fname=''):
+        '''
+        format of a second file written alongside a header
+        named fname, e.g. a C source file, or None
+        '''
+        return None
+
+    # _______________________________________________________
+
+    ''' stable constant IDs and values by ID, see Index() '''
+
+    _index = False
+    _unit  = 'codata'
+
+    def Index(self,on=True):
+        '''
+        also write each constant's stable ID, codata.Ids(), and
+        an array of values indexed by ID, in syntaxes with an
+        IdTable(); returns self
+        '''
+        self._index = on
+        self._indexed = []
+        return self
+
+    def IdName(self,cname=''):
+        ''' "Planck constant" --> CODATA_PLANCK_CONSTANT '''
+        return 'CODATA_' + re.sub(r'[^A-Z0-9]+','_',cname.upper()).strip('_')
+
+    def IndexTable(self):
+        '''
+        IDs and the value array of the constants written since
+        the last call: IdTable(ids, values) where ids is a list
+        of (ID, name) in ID order and values the value of each
+        ID up to the largest, None for IDs not written
+        '''
+        if not self._index or len(self._indexed) == 0:
+            return ''
+
+        indexed,self._indexed = self._indexed,[]
+        ids = sorted([(self._dataset.Id(cname),cname,cdict) \
+                        for cname,cdict in indexed])
+        ids = [entry for entry in ids if entry[0] >= 0]
+        if len(ids) == 0:
+            return ''
+
+        values = [None]*(ids[-1][0] + 1)
+        for number,cname,cdict in ids:
+            values[number] = self.Value(cdict['Value'])
+
+        return self.IdTable([(number,self.IdName(cname)) for number,cname,cdict in ids],values)
+
+    def IdTable(self,ids=[],values=[]):
+        ''' ---language-specific string--- '''
+        return ''
+
+    # _______________________________________________________
+
+    '''
+    symbols already defined, for syntaxes where a second
+    definition is an error, not a warning: the first
+    constant written keeps a symbol, e.g. codata::
+    electromagnetic::e is the elementary charge, and a
+    later one with the same symbol is noted and left out
+    '''
+
+    _defined = None
+
+    def Owner(self,sym='',cname='',scope=''):
+        ''' name of the constant defining sym in scope since FileHead() '''
+        if self._defined is None:
+            self._defined = {}
+        return self._defined.setdefault((scope,sym),cname)
+
+    _claimed = None
+
+    def Claim(self,records=[]):
+        '''
+        for split output: the records of every unit, in output
+        order.  A syntax whose units link into one program,
+        e.g. C externs, reserves each symbol for the first
+        constant defining it, in whichever unit.  Returns self.
+        '''
+        return self
+
+    def Skipped(self,sym='',owner=''):
+        ''' ---language-specific string--- notes a repeated symbol left out '''
+        return self._comment + (' %s is already the %s, not redefined\n' % (sym,owner))
+
+    # _______________________________________________________
+
+    ''' float32 values, see Precision() '''
+
+    _precision = 'double'
+
+    def Precision(self,precision='double'):
+        '''
+        'single' declares float32 values and 'mixed' a float32
+        twin, <symbol>_f32, before each double, in syntaxes
+        with a SingleDefine(); returns self.  A value outside
+        the normal float32 range stays double.
+        '''
+        self._precision = precision
+        return self
+
+    def SingleValue(self,val):
+        ''' ---language-specific string--- a float32 literal '''
+        return val
+
+    def SingleDefine(self,sym,val):
+        ''' ---language-specific string--- None if doubles only '''
+        return None
+
+    def Defines(self,sym,val):
+        ''' Define() the CODATA value string val at the chosen precision '''
+        defines = self.Define(sym,self.Value(val))
+        if self._precision == 'double' or not float32.fits32(val):
+            return defines
+
+        if self._precision == 'mixed':
+            single = self.SingleDefine(sym + '_f32',self.SingleValue(float32.literal32(val)))
+            return defines if single is None else single.rstrip() + '\n' + defines
+
+        single = self.SingleDefine(sym,self.SingleValue(float32.literal32(val)))
+        return defines if single is None else single
+
+    # _______________________________________________________
+
+    ''' unit conversion kernels, see Convert() '''
+
+    _convert = False
+
+    def Convert(self,on=True):
+        '''
+        also write a function per unit conversion the
+        equivalents written give, e.g. hartree_to_ev(x), x
+        times the factor, in syntaxes with ConversionKernels();
+        returns self
+        '''
+        self._convert = on
+        self._relations = []
+        return self
+
+    def ConversionTable(self):
+        '''
+        kernels of the equivalents written since the last call:
+        ConversionKernels(kernels) where kernels is a list of
+        (function name, factor, note), the factor a value string
+        '''
+        if not self._convert or len(self._relations) == 0:
+            return ''
+
+        relations,self._relations = self._relations,[]
+        kernels = []
+        for cname,cdict in relations:
+            kernels.extend(_conversions(cname,cdict,self._dataset))
+        if len(kernels) == 0:
+            return ''
+
+        return self.ConversionKernels(kernels)
+
+    def ConversionKernels(self,kernels=[]):
+        ''' ---language-specific string--- '''
+        return ''
+
+    def KernelVariants(self,name='',factor=''):
+        '''
+        (name, single, literal) of each kernel written for a
+        factor at the chosen precision, as Defines() does:
+        name_f32 is the float32 twin of mixed precision
+        '''
+        double = (name,False,self.Value(factor))
+        if self._precision == 'double' or not float32.fits32(factor):
+            return [double]
+
+        literal = self.SingleValue(float32.literal32(factor))
+        if self.SingleDefine(name,literal) is None:
+            return [double]
+        if self._precision == 'single':
+            return [(name,True,literal)]
+
+        return [(name + '_f32',True,literal),double]
+
+    def ValueLines(self,ids=[],values=[],missing='0.0',start='#',end=''):
+        ''' one array item a line, noting the ID name or number '''
+        names = dict(ids)
+        lines = []
+        for number,value in enumerate(values):
+            item = (missing if value is None else value) + ','
+            note = names.get(number,'%d not written' % number)
+            lines.append(('    %-24s %s %s %s' % (item,start,note,end)).rstrip() + '\n')
+        return ''.join(lines)
+
+# __________________________________________________________________________________
+
+_relation_re_ = re.compile(r'^(.+?)-(.+) relationship$')
+
+# unit --> kernel name part
+_unit_names_ = {'atomic mass unit':'amu', 'electron volt':'ev', 'hartree':'hartree',
+                'hertz':'hz', 'inverse meter':'inv_m', 'joule':'j', 'kelvin':'k',
+                'kilogram':'kg', 'calorie':'cal'}
+
+def _unitName (unit=''):
+    ''' "electron volt" --> ev, "J" --> j '''
+    unit = unit.strip().lower()
+    return _unit_names_.get(unit,re.sub(r'[^a-z0-9]+','_',unit).strip('_'))
+
+def _conversions (cname='',cdict={},dataset=None):
+    '''
+    (function name, factor, note) of the kernels an "X-Y
+    relationship" gives: X to Y, and from X-joule, X to and
+    from kJ/mol and kcal/mol (4.184 J/cal), from X-inverse
+    meter, X to and from cm^-1.  The way back uses the
+    Y-X relationship where the dataset has one, not the
+    reciprocal of a rounded value.  A unit of "J/cal" names
+    the ends itself: joules per calorie converts calorie to J.
+    '''
+    match = _relation_re_.match(cname.lower())
+    if match is None:
+        return []
+
+    source,target = match.groups()
+    back = '%s-%s relationship' % (target,source)
+    if '/' in cdict['Unit']:
+        target,source = cdict['Unit'].split('/',1)
+    source,target = _unitName(source),_unitName(target)
+
+    value = cdict['Value']
+    note = cdict.get('Quantity ',cname)
+    kernels = [('%s_to_%s' % (source,target),value,note)]
+
+    derived = []
+    if target == 'j' and source != 'cal':
+        scale = float(dataset.Value('Avogadro constant'))/1000.0
+        derived = [('kj_per_mol',scale),('kcal_per_mol',scale/4.184)]
+        note += ', Avogadro constant'
+    elif target == 'inv_m':
+        derived = [('inv_cm',0.01)]
+
+    if len(derived) > 0:
+        back = float(dataset.Properties(back).get('Value',1.0/float(value)))
+
+    for unit,scale in derived:
+        kernels.append(('%s_to_%s' % (source,unit),'%.16e' % (float(value)*scale),note))
+        kernels.append(('%s_to_%s' % (unit,source),'%.16e' % (back/scale),note))
+
+    return kernels
+
+def _identifier (sym=''):
+    ''' "M(12_C)" --> M_12_C: letters, digits and _, not a digit first '''
+    name = re.sub(r'\W+','_',sym).strip('_')
+    if name == '' or name[0].isdigit():
+        name = '_' + name
+    return name
+
+def _pythonKernels (fmt,kernels=[]):
+    ''' def codata_hartree_to_ev(x): ... for a Python format '''
+    text = "\n# unit conversions, x times the CODATA factor; x may be a NumPy array\n"
+    for name,factor,note in kernels:
+        for kernel,single,literal in fmt.KernelVariants(name,factor):
+            text += ("\n\ndef codata_%s(x):\n" % kernel) + \
+                    ("    ''' %s '''\n" % note) + \
+                    ("    return x*%s\n" % literal)
+    return text + '\n'
 
 # __________________________________________________________________________________
 
@@ -179,11 +511,196 @@ class FormatPython(LanguageFormat):
         self._indent      = ' '
         self._block       = "'''"
         self._endblock    = "'''"
+        self._extension   = '.py'
 
     def Define (self,sym,val):
         s =  ("%s = %s" % (sym,val))
         return ("%-39s" % s)
 
+    def ConversionKernels(self,kernels=[]):
+        return _pythonKernels(self,kernels)
+
+    ''' a module is imported once, no guard needed '''
+
+    def Include(self,fname=''):
+        return ("from %s import *\n" % fname.rsplit('.',1)[0])
+
+    '''
+    indexed output adds:
+
+    CODATA_PLANCK_CONSTANT = 251
+    CODATA_COUNT = 337
+    codata_values = (
+        ...
+        6.626070040e-34,         # CODATA_PLANCK_CONSTANT
+        ...
+    )
+    '''
+
+    def IdTable(self,ids=[],values=[]):
+        unit = self._unit
+        return '\n# stable constant IDs, see codata.Ids(), and values by ID\n\n' + \
+            ''.join(['%s = %d\n' % (name,number) for number,name in ids]) + \
+            ('%s_COUNT = %d\n' % (unit.upper(),len(values))) + \
+            ('\n%s_values = (\n' % unit) + \
+            self.ValueLines(ids,values,'None','#') + ')\n\n'
+
+
+# __________________________________________________________________________________
+
+class FormatPythonModule(LanguageFormat):
+
+    # categories bound at import; the others wait for first use
+    _eager_ = ['universal','electromagnetic','physicochemical','atomic',
+               'electron','proton','neutron']
+
+    def __init__(self,eager=None):
+
+        self._language    = 'Python module'
+        self._comment     = '#'
+        self._indent      = '    '
+        self._block       = '"""'
+        self._endblock    = '"""'
+        self._extension   = '.py'
+        self._eager       = self._eager_ if eager is None else eager
+        self._entries     = []      # (symbol, value, comment, category)
+
+    '''
+    output is an importable module needing nothing at run
+    time: a class per category holding its constants as
+    float literals, __slots__ = () so it never grows an
+    instance dict, and the constants of the common
+    categories bound at module level:
+
+    class Universal(object):
+        __slots__ = ()
+        h = 6.626070040e-34             # Planck constant, +/-0.000000081e-34 in units 'J s'
+
+    h = Universal.h
+
+    The rest, e.g. Equivalents.AMU_to_eV, are bound by the
+    module's __getattr__ on first use, so an import runs a
+    few dozen assignments.  Python before 3.7 has no module
+    __getattr__, and binds them all at import instead.
+    __all__ names every class and constant.  A symbol
+    defined in two categories names the first at module
+    level.
+    '''
+
+    def ForUnit(self,name=''):
+        return FormatPythonModule(self._eager).Convert(self._convert)
+
+    def ClassName(self,cat=''):
+        ''' "atomic units" --> AtomicUnits, "X-ray" --> XRay '''
+        return self._camelCase(cat.replace('_',' ')) or 'Uncategorized'
+
+    def Identifier(self,sym=''):
+        ''' "M(12_C)" --> M_12_C, a keyword gets a trailing _ '''
+        name = _identifier(sym)
+        if keyword.iskeyword(name):
+            name += '_'
+        return name
+
+    def Define (self,sym,val):
+        return self._indent + ("%-34s" % ("%s = %s" % (sym,val)))
+
+    def ConversionKernels(self,kernels=[]):
+        return _pythonKernels(self,kernels)
+
+    def FileHead (self,dataset=None):
+        self._entries = []
+        return LanguageFormat.FileHead(self,dataset)
+
+    def BuildDefinition (self,cname,cdict):
+        description,defines,uncerts,units = self.formatMembers(cname,cdict)
+        symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+
+        self._entries.append((symbol,self.Value(cdict['Value']),
+                              '%s, %s %s' % (cname,uncerts,units),cdict['Category']))
+        return ''
+
+    def FileTail(self,fname='<stdout>'):
+        if len(self._entries) == 0:
+            return LanguageFormat.FileTail(self,fname)
+
+        categories = []
+        members = {}
+        for symbol,value,comment,cat in self._entries:
+            if cat not in members:
+                categories.append(cat)
+                members[cat] = OrderedDict()
+            members[cat].setdefault(symbol,(value,comment))
+
+        # eager categories first, so they own a symbol they share
+        eager = [cat for cat in categories if cat in self._eager]
+        lazy = [cat for cat in categories if cat not in self._eager]
+        classes = [self.ClassName(cat) for cat in eager + lazy]
+
+        owner = OrderedDict()
+        for cat in eager + lazy:
+            for symbol in members[cat]:
+                if symbol not in classes:
+                    owner.setdefault(symbol,cat)
+
+        kernels = self.ConversionTable()
+        functions = re.findall(r'^def (\w+)',kernels,re.M)
+
+        text = '\n__all__ = [\n' + \
+            ''.join(["    '%s',\n" % name for name in classes + list(owner.keys()) + functions]) + \
+            ']\n'
+
+        for cat in eager + lazy:
+            text += '\n\nclass %s(object):\n' % self.ClassName(cat) + \
+                self._indent + ("''' %d %s constants '''\n" % (len(members[cat]),cat)) + \
+                self._indent + '__slots__ = ()\n\n' + \
+                ''.join(['%s# %s\n' % (self.Define(symbol,value),comment) \
+                            for symbol,(value,comment) in members[cat].items()])
+
+        text += '\n\n# constants of the common categories, bound at import\n\n' + \
+            ''.join(['%s = %s.%s\n' % (symbol,self.ClassName(cat),symbol) \
+                        for symbol,cat in owner.items() if cat in eager])
+
+        text += kernels
+
+        if len(lazy) > 0:
+            text += _module_getattr_ % ', '.join([self.ClassName(cat) for cat in lazy] + [''])
+
+        self._entries = []
+
+        return text + '\n' + LanguageFormat.FileTail(self,fname)
+
+    def Include(self,fname=''):
+        return ("from %s import *\n" % fname.rsplit('.',1)[0])
+
+_module_getattr_ = '''
+
+import sys
+
+# the less used categories, searched by __getattr__ on first use
+_lazy = (%s)
+
+
+def __getattr__(name):
+    \'\'\' bind a constant of a less used category on first use \'\'\'
+    if not name.startswith('_'):
+        for category in _lazy:
+            if name in vars(category):
+                value = globals()[name] = vars(category)[name]
+                return value
+    raise AttributeError('module %%r has no attribute %%r' %% (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# before Python 3.7 a module has no __getattr__: bind them all now
+if sys.version_info < (3, 7):
+    for _category in _lazy:
+        for _name, _value in list(vars(_category).items()):
+            if not _name.startswith('_'):
+                globals().setdefault(_name, _value)
+'''
 
 # __________________________________________________________________________________
 
@@ -196,6 +713,7 @@ class FormatCansi(LanguageFormat):
         self._indent      = ' '
         self._block       = "/*"
         self._endblock    = "*/"
+        self._extension   = '.h'
 
     '''
     output is:
@@ -205,6 +723,23 @@ class FormatCansi(LanguageFormat):
         s =  ("#define %s %s" % (sym,val))
         return ("%-39s" % s)
 
+    def SingleValue(self,val):
+        ''' "6.62607e-34" --> "6.62607e-34f" '''
+        return val + 'f'
+
+    def SingleDefine(self,sym,val):
+        return self.Define(sym,val)
+
+    ''' K&R C has no inline: kernels are function-like macros '''
+
+    def ConversionKernels(self,kernels=[]):
+        text = '/* unit conversions, x times the CODATA factor */\n'
+        for name,factor,note in kernels:
+            for kernel,single,literal in self.KernelVariants(name,factor):
+                text += '%-62s /* %s */\n' % \
+                    ('#define codata_%s(x) ((x)*%s)' % (kernel,literal),note)
+        return text + '\n'
+
     ''' ANSI C wraps lines in block comments'''
 
     def BuildDefinition (self,cname,cdict):
@@ -217,11 +752,36 @@ class FormatCansi(LanguageFormat):
                     '\n'
         return definition
 
+    def GuardHead(self,guard=''):
+        return ("#ifndef %s\n#define %s\n\n" % (guard,guard))
+
+    def GuardTail(self,guard=''):
+        return ("\n#endif /* %s */\n" % guard)
+
+    def Include(self,fname=''):
+        return ('#include "%s"\n' % fname)
+
+    '''
+    indexed output adds an enum of IDs, CODATA_COUNT and
+    codata_values[CODATA_COUNT], zero for IDs not written
+    '''
+
+    def IdTable(self,ids=[],values=[]):
+        unit = self._unit
+        return self.Wrapline('stable constant IDs, see codata.Ids(), and values by ID',
+                             self._block,self._endblock) + '\n' + \
+            'enum {\n' + \
+            ',\n'.join(['    %-42s = %d' % (name,number) for number,name in ids]) + \
+            '\n};\n' + \
+            ('#define %s_COUNT %d\n' % (unit.upper(),len(values))) + \
+            ('\nstatic const double %s_values[%s_COUNT] = {\n' % (unit,unit.upper())) + \
+            self.ValueLines(ids,values,'0.0','/*','*/') + '};\n\n'
+
     def FileTail(self,fname='<stdout>'):
         notes = ('END file: %s as %s %s' % \
             (fname,self._language,time.asctime()))
         ftail = self.Wrapline(notes,self._block,self._endblock) + '\n'
-        return ftail
+        return self.IndexTable() + self.ConversionTable() + ftail
 # __________________________________________________________________________________
 
 class FormatC99(LanguageFormat):
@@ -233,6 +793,7 @@ class FormatC99(LanguageFormat):
         self._indent      = ' '
         self._block       = "/*"
         self._endblock    = "*/"
+        self._extension   = '.h'
 
     '''
     output is:
@@ -241,6 +802,542 @@ class FormatC99(LanguageFormat):
     def Define (self,sym,val):
         s =  ("#define %s %s" % (sym,val))
         return ("%-39s" % s)
+
+    def SingleValue(self,val):
+        ''' "6.62607e-34" --> "6.62607e-34f" '''
+        return val + 'f'
+
+    def SingleDefine(self,sym,val):
+        return self.Define(sym,val)
+
+    '''
+    kernels are static inline, so a loop calling one over
+    an array inlines and vectorizes:
+
+    static inline double codata_hartree_to_ev (double x) { return x*27.21138602; }
+    '''
+
+    def ConversionKernels(self,kernels=[]):
+        text = '// unit conversions, x times the CODATA factor\n'
+        for name,factor,note in kernels:
+            for kernel,single,literal in self.KernelVariants(name,factor):
+                ctype = 'float' if single else 'double'
+                text += 'static inline %s codata_%s (%s x) { return x*%s; }  // %s\n' % \
+                    (ctype,kernel,ctype,literal,note)
+        return text + '\n'
+
+    def GuardHead(self,guard=''):
+        return ("#ifndef %s\n#define %s\n\n" % (guard,guard))
+
+    def GuardTail(self,guard=''):
+        return ("\n#endif // %s\n" % guard)
+
+    def Include(self,fname=''):
+        return ('#include "%s"\n' % fname)
+
+    ''' indexed output as for FormatCansi '''
+
+    def IdTable(self,ids=[],values=[]):
+        unit = self._unit
+        return '// stable constant IDs, see codata.Ids(), and values by ID\n' + \
+            'enum {\n' + \
+            ',\n'.join(['    %-42s = %d' % (name,number) for number,name in ids]) + \
+            '\n};\n' + \
+            ('#define %s_COUNT %d\n' % (unit.upper(),len(values))) + \
+            ('\nstatic const double %s_values[%s_COUNT] = {\n' % (unit,unit.upper())) + \
+            self.ValueLines(ids,values,'0.0','//') + '};\n\n'
+# ________________________________________________________________________
+
+def _cString (s=''):
+    ''' C string literal '''
+    return '"' + s.replace('\\','\\\\').replace('"','\\"') + '"'
+
+class FormatCExtern(FormatC99):
+
+    def __init__(self,uncertainty=False,table=False,unit='codata'):
+
+        self._language    = 'C99 extern'
+        self._comment     = '//'
+        self._indent      = ' '
+        self._block       = "/*"
+        self._endblock    = "*/"
+        self._extension   = '.h'
+        self._uncertainty = uncertainty
+        self._table       = table
+        self._unit        = unit
+        self._entries     = []      # (name, symbol) for the table
+
+    '''
+    output is a header of declarations only:
+
+    // Planck constant                     (universal)
+    extern const double h;                 // +/-0.000000081e-34 in units 'J s'
+
+    and, written alongside it by Companion(), one source
+    file defining each constant once.  A changed value then
+    rebuilds one object, and the header rarely changes.
+    With table, both also carry <unit>_count, <unit>_names,
+    <unit>_symbols and <unit>_values: the names, symbols
+    and addresses of the constants in output order.
+    '''
+
+    def ForUnit(self,name=''):
+        unit = FormatCExtern(self._uncertainty,self._table,name)
+        unit._claimed = self._claimed
+        return unit
+
+    def Companion(self,fname=''):
+        source = FormatCSource(self._uncertainty,self._table,self._unit,
+                               fname.replace('\\','/').split('/')[-1])
+        source._claimed = self._claimed
+        return source
+
+    def Claim(self,records=[]):
+        self._claimed = {}
+        for cdict in records:
+            cname = cdict['Quantity ']
+            symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+            self._claimed.setdefault(('',symbol),cname)
+        return self
+
+    def Define (self,sym,val):
+        return ("%-38s " % ("extern const double %s;" % sym))
+
+    def SingleDefine(self,sym,val):
+        ''' the tables point at doubles; no float32 '''
+        return None
+
+    def Identifier(self,sym=''):
+        ''' "M(12_C)" --> M_12_C '''
+        return _identifier(sym)
+
+    '''
+    each unit defines a symbol once, see Owner(), and split
+    units a symbol between them, see Claim(); a repeat, e.g.
+    e of the atomic unit of charge, is left out of the
+    header, the source and their tables alike
+    '''
+
+    def Repeated(self,cname,cdict,owner=''):
+        symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+        return self._comment + self._indent + \
+            self.Description(cname,cdict['Category']) + '\n' + \
+            self.Skipped(symbol,owner)
+
+    def Index(self,on=True):
+        ''' the pair has its own tables, see --table; no IDs '''
+        return LanguageFormat.Index(self,False)
+
+    def Convert(self,on=True):
+        ''' nor conversion kernels '''
+        return LanguageFormat.Convert(self,False)
+
+    ''' the header guards itself, named for its unit '''
+
+    def Guard(self):
+        return self._unit.upper() + '_H'
+
+    def GuardHead(self,guard=''):
+        return ''
+
+    def GuardTail(self,guard=''):
+        return ''
+
+    def FileHead (self,dataset=None):
+        self._entries = []
+        return LanguageFormat.FileHead(self,dataset) + \
+            ("\n#ifndef %s\n#define %s\n" % (self.Guard(),self.Guard()))
+
+    def BuildDefinition (self,cname,cdict):
+        symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+
+        owner = self.Owner(symbol,cname)
+        if owner != cname:
+            return self.Repeated(cname,cdict,owner)
+
+        definition = LanguageFormat.BuildDefinition(self,cname,cdict)
+
+        if self._uncertainty:
+            definition += "extern const double %s_uncertainty;\n" % symbol
+
+        self._entries.append((cdict.get('Quantity ',cname),symbol))
+
+        return definition
+
+    def TableHead(self):
+        ''' declarations of the name table '''
+        unit = self._unit
+        return ("\nextern const int %s_count;\n" % unit) + \
+               ("extern const char *const %s_names[];\n" % unit) + \
+               ("extern const char *const %s_symbols[];\n" % unit) + \
+               ("extern const double *const %s_values[];\n" % unit)
+
+    def FileTail(self,fname='<stdout>'):
+        table = ''
+        if self._table and len(self._entries) > 0:
+            table = self.TableHead()
+        return table + ("\n#endif // %s\n\n" % self.Guard()) + \
+            LanguageFormat.FileTail(self,fname)
+
+# ________________________________________________________________________
+
+class FormatCSource(FormatCExtern):
+
+    def __init__(self,uncertainty=False,table=False,unit='codata',header='codata.h'):
+
+        FormatCExtern.__init__(self,uncertainty,table,unit)
+        self._language    = 'C99 source'
+        self._extension   = '.c'
+        self._header      = header
+
+    '''
+    output is the definitions for a FormatCExtern header:
+
+    // Planck constant                     (universal)
+    const double h = 6.626070040e-34;      // +/-0.000000081e-34 in units 'J s'
+    '''
+
+    def ForUnit(self,name=''):
+        unit = FormatCSource(self._uncertainty,self._table,name,name + '.h')
+        unit._claimed = self._claimed
+        return unit
+
+    def Companion(self,fname=''):
+        return None
+
+    def Define (self,sym,val):
+        return ("%-38s " % ("const double %s = %s;" % (sym,val)))
+
+    def FileHead (self,dataset=None):
+        self._entries = []
+        return LanguageFormat.FileHead(self,dataset) + \
+            ('\n#include "%s"\n' % self._header)
+
+    def BuildDefinition (self,cname,cdict):
+        symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+
+        owner = self.Owner(symbol,cname)
+        if owner != cname:
+            return self.Repeated(cname,cdict,owner)
+
+        definition = LanguageFormat.BuildDefinition(self,cname,cdict)
+
+        if self._uncertainty:
+            definition += "const double %s_uncertainty = %s;\n" % \
+                (symbol,self.Value(cdict['Uncertainty']))
+
+        self._entries.append((cdict.get('Quantity ',cname),symbol))
+
+        return definition
+
+    def FileTail(self,fname='<stdout>'):
+        unit = self._unit
+        table = ''
+        if self._table and len(self._entries) > 0:
+            table = ("\nconst int %s_count = %d;\n" % (unit,len(self._entries))) + \
+                ("\nconst char *const %s_names[] = {\n" % unit) + \
+                ''.join(['    %s,\n' % _cString(name) for name,sym in self._entries]) + \
+                "};\n" + \
+                ("\nconst char *const %s_symbols[] = {\n" % unit) + \
+                ''.join(['    %s,\n' % _cString(sym) for name,sym in self._entries]) + \
+                "};\n" + \
+                ("\nconst double *const %s_values[] = {\n" % unit) + \
+                ''.join(['    &%s,\n' % sym for name,sym in self._entries]) + \
+                "};\n"
+        return table + '\n' + LanguageFormat.FileTail(self,fname)
+
+# ________________________________________________________________________
+
+class FormatCLookup(FormatCExtern):
+
+    def __init__(self,unit='codata'):
+
+        FormatCExtern.__init__(self,False,False,unit)
+        self._language    = 'C99 lookup'
+
+    '''
+    output is a header for run-time lookup by name:
+
+    extern const int codata_count;
+    extern const char *const codata_names[];
+    extern const double codata_values[];
+    extern const double codata_uncertainties[];
+    int codata_lookup (const char *name);
+
+    and, written alongside it by Companion(), the source
+    defining the parallel arrays and codata_lookup(), which
+    returns the index of a name or symbol, or -1.  Names
+    are matched as perfecthash.normalize() matches them,
+    so case and punctuation don't matter; where a symbol
+    normalizes like a name, the name wins.  Each constant's
+    index is listed in the header:
+
+    //    12  h               Planck constant (universal)
+    '''
+
+    def ForUnit(self,name=''):
+        return FormatCLookup(name)
+
+    def Companion(self,fname=''):
+        return FormatCLookupSource(self._unit,fname.replace('\\','/').split('/')[-1])
+
+    def BuildDefinition (self,cname,cdict):
+        symbol = self.Symbol(cdict['Symbol'],cname)
+        definition = "%s %4d  %-15s %s (%s)" % \
+                (self._comment,len(self._entries),symbol,cname,cdict['Category'])
+
+        self._entries.append((cdict.get('Quantity ',cname),symbol,cdict))
+
+        return definition
+
+    def FileTail(self,fname='<stdout>'):
+        unit = self._unit
+        if len(self._entries) == 0:
+            return FormatCExtern.FileTail(self,fname)
+
+        table = ("\nextern const int %s_count;\n" % unit) + \
+                ("extern const char *const %s_names[];\n" % unit) + \
+                ("extern const char *const %s_symbols[];\n" % unit) + \
+                ("extern const char *const %s_units[];\n" % unit) + \
+                ("extern const double %s_values[];\n" % unit) + \
+                ("extern const double %s_uncertainties[];\n" % unit) + \
+                ("\nint %s_lookup (const char *name);\n" % unit)
+        return table + ("\n#endif // %s\n\n" % self.Guard()) + \
+            LanguageFormat.FileTail(self,fname)
+
+# ________________________________________________________________________
+
+_lookup_code_ = r'''
+/* 32-bit FNV-1a, offset basis mixed with seed, high half folded
+   into the low, as perfecthash.fnv() */
+
+static uint32_t %(unit)s_hash (uint32_t seed, const char *key)
+{
+    uint32_t h = 0x811c9dc5u ^ (seed * 0x9e3779b9u);
+
+    for (; *key != '\0'; key++)
+        h = (h ^ (unsigned char) *key) * 0x01000193u;
+
+    return h ^ (h >> 16);
+}
+
+/* lowercase ASCII letters and digits between single spaces */
+
+static int %(unit)s_normalize (const char *name, char *key, int size)
+{
+    int n = 0, space = 0;
+
+    for (; *name != '\0'; name++) {
+        int c = (unsigned char) *name;
+        if (c >= 'A' && c <= 'Z')
+            c += 'a' - 'A';
+        if (!((c >= 'a' && c <= 'z') || (c >= '0' && c <= '9'))) {
+            space = 1;
+            continue;
+        }
+        if (n + space + 1 >= size)
+            return -1;
+        if (space && n > 0)
+            key[n++] = ' ';
+        key[n++] = (char) c;
+        space = 0;
+    }
+    key[n] = '\0';
+
+    return n;
+}
+
+/* index of a constant name or symbol, -1 if there is none */
+
+int %(unit)s_lookup (const char *name)
+{
+    char key[%(keysize)d];
+    uint32_t slot;
+    int d;
+
+    if (name == NULL || %(unit)s_normalize(name,key,sizeof key) < 0)
+        return -1;
+
+    d = %(unit)s_displace[%(unit)s_hash(0,key) %% %(slots)du];
+    slot = d < 0 ? (uint32_t) (-d - 1) : %(unit)s_hash((uint32_t) d,key) %% %(slots)du;
+
+    if (strcmp(%(unit)s_keys[slot],key) != 0)
+        return -1;
+
+    return %(unit)s_index[slot];
+}
+'''
+
+class FormatCLookupSource(FormatCLookup):
+
+    def __init__(self,unit='codata',header='codata.h'):
+
+        FormatCLookup.__init__(self,unit)
+        self._language    = 'C99 lookup source'
+        self._extension   = '.c'
+        self._header      = header
+
+    '''
+    output is the arrays of a FormatCLookup header, in
+    output order, and codata_lookup() over a minimal
+    perfect hash of the normalized names and symbols,
+    built here by perfecthash.build(): one displacement
+    per slot, the key and constant index in each slot.
+    Nothing is built at run time.
+    '''
+
+    def ForUnit(self,name=''):
+        return FormatCLookupSource(name,name + '.h')
+
+    def Companion(self,fname=''):
+        return None
+
+    def FileHead (self,dataset=None):
+        self._entries = []
+        return LanguageFormat.FileHead(self,dataset) + \
+            '\n#include <stdint.h>\n#include <stddef.h>\n#include <string.h>\n' + \
+            ('#include "%s"\n' % self._header)
+
+    def BuildDefinition (self,cname,cdict):
+        self._entries.append((cdict.get('Quantity ',cname),
+                              self.Symbol(cdict['Symbol'],cname),cdict))
+        return ''
+
+    def Keys(self):
+        '''
+        normalized name or symbol --> index.  Names come first;
+        a symbol shared with an atomic unit, e.g. hbar, goes to
+        the other constant, else to the first in output order.
+        '''
+        keys = {}
+        for i,(name,sym,cdict) in enumerate(self._entries):
+            keys.setdefault(perfecthash.normalize(name),i)
+
+        ranked = sorted(range(len(self._entries)),
+                        key=lambda i: (self._entries[i][2]['Category'] == 'atomic units',i))
+        for i in ranked:
+            key = perfecthash.normalize(self._entries[i][1])
+            if key != '':
+                keys.setdefault(key,i)
+        return keys
+
+    def Array(self,ctype,name,items,notes=None):
+        ''' a C array definition, one item a line, each with an optional note '''
+        if notes is None:
+            lines = ['    %s,\n' % item for item in items]
+        else:
+            lines = ['    %-24s // %s\n' % (item + ',',note) for item,note in zip(items,notes)]
+        return ("\n%s %s_%s[] = {\n" % (ctype,self._unit,name)) + ''.join(lines) + "};\n"
+
+    def FileTail(self,fname='<stdout>'):
+        unit = self._unit
+        entries = self._entries
+        if len(entries) == 0:
+            return '\n' + LanguageFormat.FileTail(self,fname)
+
+        keys = self.Keys()
+        displace,slots = perfecthash.build(keys.keys())
+
+        table = ("\nconst int %s_count = %d;\n" % (unit,len(entries))) + \
+            self.Array('const char *const','names',[_cString(name) for name,sym,c in entries]) + \
+            self.Array('const char *const','symbols',[_cString(sym) for name,sym,c in entries]) + \
+            self.Array('const char *const','units',[_cString(c['Unit']) for name,sym,c in entries]) + \
+            self.Array('const double','values',[self.Value(c['Value']) for name,sym,c in entries],
+                       [sym for name,sym,c in entries]) + \
+            self.Array('const double','uncertainties',[self.Value(c['Uncertainty']) for name,sym,c in entries],
+                       [sym for name,sym,c in entries]) + \
+            ("\n/* minimal perfect hash over %d normalized names and symbols */\n" % len(slots)) + \
+            self.Array('static const int','displace',[str(d) for d in displace]) + \
+            self.Array('static const char *const','keys',[_cString(key) for key in slots]) + \
+            self.Array('static const short','index',[str(keys[key]) for key in slots]) + \
+            _lookup_code_ % {'unit':unit, 'slots':len(slots),
+                             'keysize':max([len(key) for key in slots]) + 2}
+
+        return table + '\n' + LanguageFormat.FileTail(self,fname)
+
+# ________________________________________________________________________
+
+class FormatCpp17(LanguageFormat):
+
+    def __init__(self,uncertainty=False):
+
+        self._language    = 'C++17'
+        self._comment     = '//'
+        self._indent      = '    '
+        self._block       = "/*"
+        self._endblock    = "*/"
+        self._extension   = '.hpp'
+        self._uncertainty = uncertainty
+
+    '''
+    output is typed, compile-time constants, one definition
+    across translation units, in a namespace per category:
+
+    namespace codata::universal {
+        inline constexpr double h = 6.626070040e-34;
+    }
+
+    With uncertainty, a nested namespace holds the absolute
+    uncertainties: codata::universal::uncertainty::h.  A
+    symbol repeated in a namespace is defined once, see
+    Owner().
+    '''
+
+    def Namespace(self,cat=''):
+        ''' "atomic units" --> atomic_units, "X-ray" --> x_ray '''
+        return re.sub(r'[^a-z0-9]+','_',cat.lower()).strip('_')
+
+    def Identifier(self,sym=''):
+        ''' "M(12_C)" --> M_12_C '''
+        return _identifier(sym)
+
+    def Define (self,sym,val):
+        return self._indent + ("inline constexpr double %s = %s;\n" % (sym,val))
+
+    def SingleValue(self,val):
+        return val + 'f'
+
+    def SingleDefine(self,sym,val):
+        return self._indent + ("inline constexpr float %s = %s;\n" % (sym,val))
+
+    def ConversionKernels(self,kernels=[]):
+        text = '\n// unit conversions, x times the CODATA factor\nnamespace codata::convert {\n'
+        for name,factor,note in kernels:
+            for kernel,single,literal in self.KernelVariants(name,factor):
+                ctype = 'float' if single else 'double'
+                text += self._indent + \
+                    ('inline constexpr %s %s (%s x) noexcept { return x*%s; }  // %s\n' % \
+                     (ctype,kernel,ctype,literal,note))
+        return text + '}\n\n'
+
+    def FileHead (self,dataset=None):
+        return LanguageFormat.FileHead(self,dataset) + '\n#pragma once\n'
+
+    def BuildDefinition (self,cname,cdict):
+        symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+        description,defines,uncerts,units = self.formatMembers(cname,cdict)
+        namespace = self.Namespace(cdict['Category'])
+
+        definition = self._comment + ' ' + description + '\n' + \
+                    self._comment + ' ' + uncerts + ' ' + units + '\n'
+
+        # e.g. atomic unit of charge and elementary charge are both e
+        owner = self.Owner(symbol,cname,namespace)
+        if owner != cname:
+            return definition + self.Skipped(symbol,owner)
+
+        definition += ('namespace codata::%s {\n' % namespace) + defines
+
+        if self._uncertainty:
+            definition += self._indent + \
+                    ('namespace uncertainty { inline constexpr double %s = %s; }\n' % \
+                     (symbol,self.Value(cdict['Uncertainty'])))
+
+        return definition + '}\n'
+
+    def Include(self,fname=''):
+        return ('#include "%s"\n' % fname)
+
 # ________________________________________________________________________
 class FormatFortran77(LanguageFormat):
 
@@ -251,23 +1348,66 @@ class FormatFortran77(LanguageFormat):
         self._indent      = '      '
         self._block       = ''
         self._endblock    = ''
+        self._extension   = '.f'
+
+    ''' Fortran has no preprocessor guard; the umbrella includes each file once '''
+
+    def Include(self,fname=''):
+        return (self._indent + "include '%s'\n" % fname)
 
     def Define (self,sym,val):
         defs = self._indent + ("double precision %s\n" % (sym)) + \
                self._indent + ("parameter(%s = %s)\n" % (sym,val))
         return defs
 
+    ''' default REAL is single precision, its exponent letter e '''
+
+    def SingleDefine(self,sym,val):
+        return self._indent + ("real %s\n" % (sym)) + \
+               self._indent + ("parameter(%s = %s)\n" % (sym,val))
+
+    def Statement(self,text=''):
+        '''
+        a statement in columns 7-72, continued as needed;
+        blanks don't count in fixed form, so a long name
+        may break anywhere
+        '''
+        lines = [text[i:i+66] for i in range(0,len(text),66)]
+        return self._indent + '\n     &'.join(lines) + '\n'
+
+    '''
+    indexed output adds integer parameters of the IDs,
+    CODATA_COUNT, and codata_values(0:CODATA_COUNT-1),
+    set by DATA statements, zero for IDs not written
+    '''
+
+    def IdTable(self,ids=[],values=[]):
+        unit = self._unit
+        count = unit.upper() + '_COUNT'
+        table = 'C\nC stable constant IDs, see codata.Ids(), and values by ID\nC\n'
+        for number,name in ids + [(len(values),count)]:
+            table += self.Statement('integer %s' % name) + \
+                     self.Statement('parameter(%s = %d)' % (name,number))
+        table += self.Statement('double precision %s_values(0:%s-1)' % (unit,count))
+        for number,value in enumerate(values):
+            if value is not None:
+                table += self.Statement('data %s_values(%d) /%s/' % (unit,number,value))
+        return table + 'C\n'
+
     def Value (self,val):
         val = val.lower()
 
+        ''' "123" --> "123.0", "1e-3" --> "1.0e-3" '''
+        if '.' not in val:
+            if 'e' in val:
+                val = val.replace('e','.0e')
+            else:
+                val += '.0'
+
         ''' "1.23e4" --> "1.23d4" '''
         if 'e' in val:
             val = val.replace('e','d')
 
-        ''' "123" --> "123.0" '''
-        if '.' not in val:
-            val += '.0'
-
         return val
 
     def BuildDefinition (self,cname,cdict):
@@ -299,22 +1439,60 @@ class FormatFortran90(LanguageFormat):
         self._indent      = '      '
         self._block       = ''
         self._endblock    = ''
+        self._extension   = '.f90'
+
+    def Include(self,fname=''):
+        return (self._indent + "include '%s'\n" % fname)
 
     def Define (self,sym,val):
         defs = self._indent + ("real*8, parameter :: %s = %s\n" % (sym,val))
         return defs
 
+    def SingleDefine(self,sym,val):
+        return self._indent + ("real*4, parameter :: %s = %s\n" % (sym,val))
+
+    '''
+    indexed output adds integer parameters of the IDs,
+    CODATA_COUNT, and a parameter array of values,
+    codata_values(0:CODATA_COUNT-1), zero for IDs not
+    written.  Three values a line keep the statement
+    within the 255 continuation lines of Fortran 2003.
+    '''
+
+    def RealType(self):
+        return 'real*8'
+
+    def IdTable(self,ids=[],values=[]):
+        unit = self._unit
+        count = unit.upper() + '_COUNT'
+        items = [self.Value('0.0e0') if value is None else value for value in values]
+
+        # an array constructor takes one kind: "376.73" --> "376.73d0"
+        items = [v if ('d' in v or '_' in v) else v + 'd0' for v in items]
+        rows = [', '.join(items[i:i+3]) for i in range(0,len(items),3)]
+
+        table = '\n! stable constant IDs, see codata.Ids(), and values by ID\n'
+        for number,name in ids + [(len(values),count)]:
+            table += self._indent + ('integer, parameter :: %s = %d\n' % (name,number))
+        table += self._indent + ('%s, parameter :: %s_values(0:%s-1) = (/ &\n' % \
+                    (self.RealType(),unit,count)) + \
+                 ', &\n'.join([self._indent + '    ' + row for row in rows]) + ' /)\n\n'
+        return table
+
     def Value (self,val):
         val = val.lower()
 
+        ''' "123" --> "123.0", "1e-3" --> "1.0e-3" '''
+        if '.' not in val:
+            if 'e' in val:
+                val = val.replace('e','.0e')
+            else:
+                val += '.0'
+
         ''' "1.23e4" --> "1.23d4" '''
         if 'e' in val:
             val = val.replace('e','d')
 
-        ''' "123" --> "123.0" '''
-        if '.' not in val:
-            val += '.0'
-
         return val
 
     def BuildDefinition (self,cname,cdict):
@@ -333,6 +1511,116 @@ class FormatFortran90(LanguageFormat):
 
         return definition
 
+# ________________________________________________________________________
+
+class FormatFortranModule(FormatFortran90):
+
+    def __init__ (self,module='codata_constants'):
+
+        self._language    = 'Fortran module'
+        self._comment     = '!'
+        self._indent      = '    '
+        self._block       = ''
+        self._endblock    = ''
+        self._extension   = '.f90'
+        self._module      = module
+
+    '''
+    output is one module, compiled once to a .mod file
+    that every unit using the constants shares:
+
+    module codata_constants
+        use, intrinsic :: iso_fortran_env, only: real64
+    ...
+    end module codata_constants
+    '''
+
+    def ForUnit(self,name=''):
+        unit = FormatFortranModule(name)
+        unit._unit = name
+        return unit.Index(self._index).Precision(self._precision).Convert(self._convert)
+
+    def FileHead (self,dataset=None):
+        kinds = 'real64' if self._precision == 'double' else 'real32, real64'
+        return LanguageFormat.FileHead(self,dataset) + \
+            ("module %s\n" % self._module) + \
+            self._indent + ("use, intrinsic :: iso_fortran_env, only: %s\n" % kinds)
+
+    def FileTail(self,fname='<stdout>'):
+        kernels = self.ConversionTable()
+        if kernels != '':
+            kernels = '\ncontains\n' + kernels
+        return self.IndexTable() + kernels + ("end module %s\n" % self._module) + \
+            LanguageFormat.FileTail(self,fname)
+
+    ''' kernels are elemental, so they take whole arrays too '''
+
+    def ConversionKernels(self,kernels=[]):
+        text = ''
+        for name,factor,note in kernels:
+            for kernel,single,literal in self.KernelVariants(name,factor):
+                kind = 'real(real32)' if single else 'real(real64)'
+                function = 'codata_' + kernel
+                text += '\n' + self._indent + ('! %s\n' % note) + \
+                    self._indent + ('elemental pure function %s (x) result(y)\n' % function) + \
+                    self._indent*2 + ('%s, intent(in) :: x\n' % kind) + \
+                    self._indent*2 + ('%s :: y\n' % kind) + \
+                    self._indent*2 + ('y = x*%s\n' % literal) + \
+                    self._indent + ('end function %s\n' % function)
+        return text + '\n'
+
+    def RealType(self):
+        return 'real(real64)'
+
+    def Identifier(self,sym=''):
+        ''' "M(12_C)" --> M_12_C '''
+        return _identifier(sym)
+
+    '''
+    a module is one scope, and Fortran ignores case: the
+    first of m_e, electron mass, and M_e, electron molar
+    mass, keeps the name, see Owner()
+    '''
+
+    def BuildDefinition (self,cname,cdict):
+        definition = FormatFortran90.BuildDefinition(self,cname,cdict)
+        symbol = self.Identifier(self.Symbol(cdict['Symbol'],cname))
+
+        owner = self.Owner(symbol.lower(),cname)
+        if owner != cname:
+            comments = definition.split('\n')[:2]
+            return '\n'.join(comments) + '\n' + self.Skipped(symbol,owner)
+
+        return definition
+
+    def Define (self,sym,val):
+        defs = self._indent + ("real(real64), parameter :: %s = %s\n" % (sym,val))
+        return defs
+
+    def Value (self,val):
+        ''' "6.626e-34" --> "6.626e-34_real64" '''
+        val = val.lower()
+
+        if '.' not in val:
+            if 'e' in val:
+                val = val.replace('e','.0e')
+            else:
+                val += '.0'
+
+        return val + '_real64'
+
+    def SingleValue(self,val):
+        ''' "6.62607e-34" --> "6.62607e-34_real32" '''
+        return val + '_real32'
+
+    def SingleDefine(self,sym,val):
+        return self._indent + ("real(real32), parameter :: %s = %s\n" % (sym,val))
+
+    ''' a split category is a module of its own; the umbrella module uses it '''
+
+    def Include(self,fname=''):
+        return (self._indent + "use %s\n" % fname.rsplit('.',1)[0])
+
 # ________________________________________________________________________
 def _test_formats ():
 
@@ -390,6 +1678,142 @@ def _test_formats ():
     print (f90.FileTail())
     ruler()
 
+    cext = FormatCExtern(uncertainty=True,table=True)
+    csrc = cext.Companion('include/codata.h')
+    print (cext.BuildDefinition(key, dictionary[key]))
+    print (csrc.BuildDefinition(key, dictionary[key]))
+    if 'extern const double h;' not in cext.BuildDefinition(key, dictionary[key]) or \
+        'const double h_uncertainty = 0.000000081e-34;' not in \
+            csrc.BuildDefinition(key, dictionary[key]) or \
+        '"Planck constant",' not in csrc.FileTail() or \
+        'extern const char *const codata_names[];' not in cext.FileTail() or \
+        'h is already the Planck constant, not redefined' not in \
+            csrc.BuildDefinition('Planck constant in eV s',dictionary[key]) or \
+        'M_12_C_uncertainty' not in \
+            cext.BuildDefinition('molar mass of carbon-12',dict(dictionary[key],Symbol='M(12_C)')):
+        print('Error: C extern declaration, definition or table is wrong')
+    ruler()
+
+    lookup = FormatCLookup()
+    lsrc = lookup.Companion('include/codata.h')
+    lhead = lsrc.FileHead()
+    for name,sym in [('Planck constant','h'),('Boltzmann constant','k'),
+                     ('atomic unit of action','hbar'),('Planck constant over 2 pi','hbar')]:
+        lsrc.BuildDefinition(name,dict(dictionary[key],Symbol=sym,Category=name.split()[0]))
+    lsrc._entries[2][2]['Category'] = 'atomic units'
+    ltail = lsrc.FileTail()
+    print (lookup.BuildDefinition(key, dictionary[key]))
+    if '#include "codata.h"' not in lhead or \
+        'int codata_lookup (const char *name)' not in ltail or \
+        'static const int codata_displace[] = {' not in ltail or \
+        '6.626070040e-34,         // h' not in ltail or \
+        lsrc.Keys() != {'planck constant':0,'h':0,'boltzmann constant':1,'k':1,
+                        'atomic unit of action':2,'planck constant over 2 pi':3,'hbar':3} or \
+        'int codata_lookup (const char *name);' not in lookup.FileTail():
+        print('Error: C lookup keys, arrays or function are wrong')
+    ruler()
+
+    pymod = FormatPythonModule()
+    pymod.FileHead()
+    pymod.BuildDefinition(key, dictionary[key])
+    pymod.BuildDefinition('lattice parameter of silicon',
+                          dict(dictionary[key],Symbol='a',Category='X-ray'))
+    mtail = pymod.FileTail()
+    print (mtail[:200])
+    space = {}
+    exec(mtail,space)
+    if space['h'] != space['Universal'].h or ('a' in space) != (sys.version_info < (3,7)) or \
+        space['__getattr__']('a') != space['XRay'].a or \
+        space['__all__'] != ['Universal','XRay','h','a'] or \
+        pymod.ClassName('atomic units') != 'AtomicUnits' or \
+        pymod.Identifier('M(12_C)') != 'M_12_C' or pymod.Identifier('lambda') != 'lambda_':
+        print('Error: Python module classes, bindings or names are wrong')
+    ruler()
+
+    single = FormatFortranModule().Precision('single')
+    print (single.BuildDefinition(key, dictionary[key]))
+    if 'real(real32), parameter :: h = 6.62607e-34_real32' not in \
+            single.BuildDefinition(key, dictionary[key]) or \
+        'only: real32, real64' not in single.FileHead() or \
+        single.ForUnit('codata_universal')._precision != 'single' or \
+        '#define h_f32 6.62607e-34f\n#define h 6.626070040e-34 ' not in \
+            FormatCansi().Precision('mixed').BuildDefinition(key, dictionary[key]) or \
+        'h_f32' in FormatCExtern().Precision('mixed').BuildDefinition(key, dictionary[key]) or \
+        'double precision t_P' not in FormatFortran77().Precision('single').BuildDefinition( \
+            'Planck time',dict(dictionary[key],Value='5.39116e-44',Symbol='t_P')):
+        print('Error: single or mixed precision output is wrong')
+    ruler()
+
+    hartree = {'Quantity ':'hartree-joule relationship', 'Value':'4.359744650e-18',
+               'Uncertainty':'0.000000054e-18', 'Unit':'J', 'Category':'equivalents',
+               'Symbol':'Eh_to_J'}
+    kernels = dict([(name,factor) for name,factor,note in \
+                    _conversions('hartree-joule relationship',hartree,codata.GetDataset())])
+    calorie = _conversions('Joule-calorie relationship',dict(hartree,Value='4.184',Unit='J/cal'))
+    conv = FormatC99().Convert()
+    conv.FileHead()
+    conv.BuildDefinition('hartree-joule relationship',hartree)
+    ctail = conv.FileTail()
+    print (ctail[:300])
+    if sorted(kernels.keys()) != ['hartree_to_j','hartree_to_kcal_per_mol','hartree_to_kj_per_mol',
+                                  'kcal_per_mol_to_hartree','kj_per_mol_to_hartree'] or \
+        abs(float(kernels['hartree_to_kcal_per_mol']) - 627.509474) > 1e-6 or \
+        [name for name,factor,note in calorie] != ['cal_to_j'] or \
+        'static inline double codata_hartree_to_j (double x) { return x*4.359744650e-18; }' \
+            not in ctail or conv.FileTail() == ctail or \
+        'hartree_to_j_f32 (float x)' not in FormatCpp17().Convert().Precision('mixed').ConversionKernels(
+            [('hartree_to_j','4.359744650e-18','')]) or \
+        FormatCExtern().Convert()._convert:
+        print('Error: conversion kernels are wrong')
+    ruler()
+
+    f77 = FormatFortran77().Index()
+    f77.FileHead()
+    f77.BuildDefinition(key, dictionary[key])
+    table = f77.IndexTable()
+    print (table[:200])
+    if '      parameter(CODATA_PLANCK_CONSTANT = 251)\n' not in table or \
+        '      data codata_values(251) /6.626070040d-34/\n' not in table or \
+        f77.IndexTable() != '' or \
+        max([len(line) for line in f77.Statement('x'*100).split('\n')]) > 72 or \
+        f77.Value('1e-3') != '1.0d-3' or \
+        FormatC99().Index().ForUnit('codata_x_ray')._unit != 'codata_x_ray' or \
+        FormatCExtern().Index()._index:
+        print('Error: Fortran 77 ID table, value or unit copy is wrong')
+    ruler()
+
+    cpp = FormatCpp17(uncertainty=True)
+    print (cpp.BuildDefinition(key, dictionary[key]))
+    if 'namespace uncertainty { inline constexpr double h = 0.000000081e-34; }' \
+            not in cpp.BuildDefinition(key, dictionary[key]) or \
+        cpp.Namespace('atomic units') != 'atomic_units' or \
+        cpp.Namespace('X-ray') != 'x_ray' or \
+        'is already the Planck constant, not redefined' not in \
+            cpp.BuildDefinition('atomic unit of action',dict(dictionary[key],Symbol='h')) or \
+        'namespace codata::atomic_units {' not in \
+            cpp.BuildDefinition('atomic unit of action',dict(dictionary[key],Symbol='h',
+                                                            Category='atomic units')) or \
+        'inline constexpr double M_12_C = 12e-3;' not in \
+            cpp.BuildDefinition('molar mass of carbon-12',dict(dictionary[key],Symbol='M(12_C)',
+                                                              Value='12e-3')):
+        print('Error: C++17 uncertainty, namespace or repeated symbol is wrong')
+    ruler()
+
+    fmod = FormatFortranModule()
+    print (fmod.BuildDefinition(key, dictionary[key]))
+    print (fmod.FileTail())
+    if fmod.Value('299792458') != '299792458.0_real64' or \
+        fmod.Value('1E3') != '1.0e3_real64' or \
+        fmod.ForUnit('codata_universal').Include('codata_x_ray.f90') != \
+            '    use codata_x_ray\n' or \
+        'H is already the Planck constant, not redefined' not in \
+            fmod.BuildDefinition('Planck molar constant',dict(dictionary[key],Symbol='H')) or \
+        'M_12_C = 12.0e-3_real64' not in \
+            fmod.BuildDefinition('molar mass of carbon-12',dict(dictionary[key],Symbol='M(12_C)',
+                                                               Value='12e-3')):
+        print('Error: Fortran module value, use statement or repeated symbol is wrong')
+    ruler()
+
     print('\n#### END %s test\n' % __file__.upper())
 
     return
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+ fuzzy.py -
+
+    typo-tolerant lookup of constant names and symbols by
+    character trigrams, for codata.Resolve() and Suggest():
+
+        'Plank constant'     --> planck constant
+        'Boltzman constant'  --> boltzmann constant
+
+    Names are reduced to lowercase letters and digits between
+    single spaces and cut into overlapping three-letter grams.
+    Matches are scored by the Dice coefficient of the two gram
+    sets: 1.0 is an exact match.
+
+    A name scoring at least floor must share a known minimum
+    of the query's grams, so it must hold at least one of the
+    query's rarest grams.  Only those grams' postings are read
+    to find candidates (prefix filtering); common grams such
+    as "con" from "constant" are never scanned.
+
+ creation: 10/19/2026
+"""
+
+import re
+import sys
+import math
+
+_norm_re_ = re.compile(r'[^a-z0-9]+')
+
+#______________________________________________________
+
+def normalize (name=''):
+    ''' lowercase letters and digits between single spaces '''
+    return _norm_re_.sub(' ',name.lower()).strip()
+
+#______________________________________________________
+
+def grams (text=''):
+    ''' set of trigrams of a normalized name, padded at the ends '''
+    text = ' ' + text + ' '
+    return set([text[i:i+3] for i in range(len(text)-2)])
+
+#______________________________________________________
+
+class NgramIndex(object):
+    '''
+    Trigram postings over normalized names: gram --> list of
+    entry numbers.  Each entry maps back to a constant key.
+    Each entry keeps its gram set for scoring candidates.
+    Lookups are remembered, so repeated misspellings in a
+    long list cost one dictionary probe.
+    '''
+
+    def __init__(self,names={}):
+        ''' names maps each name or symbol to its constant key '''
+
+        self.entries = []       # (normalized name, gram set, key)
+        self.postings = {}
+        self.memo = {}
+
+        seen = set()
+        for name,key in names.items():
+            text = normalize(name)
+            if text == '' or (text,key) in seen:
+                continue
+            seen.add((text,key))
+
+            entry_grams = grams(text)
+            for gram in entry_grams:
+                self.postings.setdefault(gram,[]).append(len(self.entries))
+            self.entries.append((text,entry_grams,key))
+
+    #________________________________________________
+
+    def suggest (self,name='',count=3,floor=0.5):
+        '''
+        Return up to count (score, key) pairs scoring at least
+        floor, best first, one per constant.
+        '''
+
+        text = normalize(name)
+        memo_key = (text,count,floor)
+        if memo_key in self.memo:
+            return self.memo[memo_key]
+
+        query_grams = grams(text)
+        size = len(query_grams)
+
+        # 2c/(size+e) >= floor with c <= e needs c >= floor*size/(2-floor)
+        needed = int(math.ceil(floor*size/(2.0 - floor) - 1e-9))
+        rarest = sorted(query_grams,key=lambda g: len(self.postings.get(g,[])))
+
+        candidates = set()
+        for gram in rarest[:max(size - needed + 1,1)]:
+            candidates.update(self.postings.get(gram,[]))
+
+        best = {}
+        for entry in candidates:
+            entry_text,entry_grams,key = self.entries[entry]
+            score = 2.0*len(query_grams & entry_grams)/(size + len(entry_grams))
+            if score >= floor and score > best.get(key,0.0):
+                best[key] = score
+
+        ranked = sorted([(-score,key) for key,score in best.items()])[:count]
+        result = [(-score,key) for score,key in ranked]
+
+        self.memo[memo_key] = result
+
+        return result
+
+    #________________________________________________
+
+    def resolve (self,name='',threshold=0.8):
+        '''
+        Return (key, score) of the best match scoring at least
+        threshold and clearly ahead of the runner-up, else
+        (None, best score).
+        '''
+
+        # look a little below threshold for a close runner-up
+        ranked = self.suggest(name,2,max(threshold - 0.05,0.0))
+        if len(ranked) == 0:
+            return (None,0.0)
+
+        score,key = ranked[0]
+        if score < threshold:
+            return (None,score)
+
+        # two near-equal candidates: too close to call
+        if len(ranked) > 1 and score - ranked[1][0] < 0.05 and score < 1.0:
+            return (None,score)
+
+        return (key,score)
+
+#______________________________________________________
+
+def _test_fuzzy ():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    names = {'planck constant':'planck constant',
+             'boltzmann constant':'boltzmann constant',
+             'avogadro constant':'avogadro constant',
+             'electron volt':'electron volt',
+             'electron mass':'electron mass',
+             'eV':'electron volt',
+             'h':'planck constant'}
+    index = NgramIndex(names)
+
+    cases = [
+        ('Plank constant',      'planck constant'),
+        ('Boltzman constant',   'boltzmann constant'),
+        ('electron-volt',       'electron volt'),
+        ('EV',                  'electron volt'),
+        ('electron',            None),
+        ('quark mass',          None),
+        ]
+    for name,expected in cases:
+        key,score = index.resolve(name)
+        if key != expected:
+            print('!resolve(%s) = %s %.2f, expected %s' % (name,key,score,expected))
+            errors += 1
+
+    ranked = index.suggest('avogadro number')
+    if len(ranked) == 0 or ranked[0][1] != 'avogadro constant':
+        print('!suggest(avogadro number) = %s' % ranked)
+        errors += 1
+
+    if index.suggest('Plank constant') is not index.suggest('plank  constant'):
+        print('!suggest() did not remember a lookup')
+        errors += 1
+
+    print('\t%d fuzzy errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_fuzzy()
+    sys.exit()
@@ -26,7 +26,8 @@ def main(argv=None):
 
     parsed = cliargs.argvParse()
 
-    outputs.handleArgs(parsed)
+    if outputs.handleArgs(parsed) is False:
+        sys.exit(1)
 
     sys.exit(0)
 
@@ -11,11 +11,26 @@
 # ISO Python modules
 
 import os
+import re
 import sys
+import json
+import time
+import tempfile
+import py_compile
+import subprocess
+
+from multiprocessing.pool import ThreadPool
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 
 # CODATA database module
 
 import codata
+import shake
+import float32
 
 # language output class module for C, Fortran, and Python
 
@@ -24,10 +39,17 @@ global Fmt              # used by genericWrite()
 
 # _______________________________________________________
 
-def SetFormat(syntaxObj=''):
-    ''' Select output format from argparse object '''
-
-    global Fmt
+def GetFormat(syntaxObj='', uncertainty=False, table=False, ids=False,
+              precision='double', conversions=False):
+    '''
+    Return a new output format object for a syntax name.
+    uncertainty asks syntaxes that can to declare the
+    uncertainties as well as the values, table for a
+    table of constant names, ids for the stable constant
+    IDs and an array of values indexed by them, precision
+    'single' or 'mixed' for float32 values, conversions for
+    unit conversion functions of the equivalents.
+    '''
 
     ''' argparse flags have a list wrapper '''
     if type(syntaxObj).__name__ == 'list':
@@ -41,23 +63,106 @@ def SetFormat(syntaxObj=''):
 
 
     if syntax == 'c' or syntax == 'cansi' or syntax == 'k&r' or syntax == 'k&rc':
-        Fmt = formats.FormatCansi()
+        fmt = formats.FormatCansi()
 
     elif syntax == 'c99':
-        Fmt = formats.FormatC99()
+        fmt = formats.FormatC99()
+
+    elif syntax in ['cextern','c-extern','cpair']:
+        fmt = formats.FormatCExtern(uncertainty,table)
+
+    elif syntax in ['clookup','c-lookup']:
+        fmt = formats.FormatCLookup()
+
+    elif syntax in ['c++','cpp','cxx','c++17','cpp17']:
+        fmt = formats.FormatCpp17(uncertainty)
 
     #elif syntax == 'f' or syntax == 'f77' or syntax == 'fortran':
     elif syntax in ['f','f77','fortran','fortran77']:
-        Fmt = formats.FormatFortran77()
+        fmt = formats.FormatFortran77()
 
     elif syntax == 'f90' or syntax == 'fortran90':
-        Fmt = formats.FormatFortran90()
+        fmt = formats.FormatFortran90()
+
+    elif syntax in ['fmod','f90mod','f90module','fortranmodule']:
+        fmt = formats.FormatFortranModule()
 
     elif syntax in ['python','python2','python3']:
-        Fmt = formats.FormatPython()
+        fmt = formats.FormatPython()
+
+    elif syntax in ['module','pymodule','python-module']:
+        fmt = formats.FormatPythonModule()
 
     else:
-        Fmt = formats.FormatPython()
+        fmt = formats.FormatPython()
+
+    if ids:
+        fmt.Index()
+
+    if conversions:
+        fmt.Convert()
+
+    return fmt.Precision(precision or 'double')
+
+# _______________________________________________________
+
+def SetFormat(syntaxObj='', uncertainty=False, table=False, ids=False,
+              precision='double', conversions=False):
+    ''' Select output format from argparse object '''
+
+    global Fmt
+
+    Fmt = GetFormat(syntaxObj,uncertainty,table,ids,precision,conversions)
+
+# _______________________________________________________
+
+global Sort             # (sort key, reverse) used by the writers
+Sort = ('name',False)
+
+def SetOrder(by='name', reverse=False):
+    '''
+    Select the order of declarations, listings and exports:
+    name, symbol, category, value, magnitude, uncertainty
+    or reluncert, optionally reversed.
+    '''
+
+    global Sort
+
+    if codata.Order([],by) is None:
+        return False
+
+    Sort = (by,reverse)
+    return True
+
+# _______________________________________________________
+
+def orderedNames(constants_dict={}, dataset=None, top=None):
+    '''
+    Return the keys of constants_dict in the selected order,
+    picked from the dataset's precomputed sort index.
+    '''
+
+    if dataset is None:
+        dataset = codata.GetDataset()
+
+    return dataset.Order(constants_dict,Sort[0],Sort[1],top)
+
+def streamRecords(selection={}, dataset=None, top=None):
+    '''
+    Return an iterator over the records of a selection in the
+    selected order.  selection is a constants dictionary or a
+    set of keys, whose records are fetched one at a time, or
+    an iterable of records, which is passed through as is.
+    '''
+
+    if not isinstance(selection,(dict,set,frozenset)) and \
+            not hasattr(selection,'keys'):
+        return iter(selection)
+
+    if dataset is None:
+        dataset = codata.GetDataset()
+
+    return dataset.IterConstants(selection,Sort[0],Sort[1],top)
 
 # _______________________________________________________
 
@@ -70,21 +175,24 @@ def fileExists (fname):
         return False
 #______________________________________________________
 
-def doCategories (category_args=[]):
+def doCategories (category_args=[], dataset=None):
     ''' construct dictionary of requested constants by category '''
 
+    if dataset is None:
+        dataset = codata.GetDataset()
+
     const_dict = {}
 
     if 'all' in category_args:
-        const_dict = codata.Dictionary()
+        const_dict.update(dataset.Dictionary())
 
     else:
-        catlist = sorted(codata.Categories())
+        catlist = sorted(dataset.Categories())
 
         for category in category_args:
 
             if category in catlist:
-                tempdict = codata.Constants(category)
+                tempdict = dataset.Constants(category)
                 const_dict.update(tempdict)
 
             else:
@@ -94,81 +202,241 @@ def doCategories (category_args=[]):
 
 #______________________________________________________
 
-def readFileList (fname=''):
+def doNames (name_list=[], dataset=None, fuzzy=None):
     '''
-    Read list of constants from a text file.
-    Constant names are one per line.
-        blank lines ignored
-        # commented lines ignored
+    Construct dictionary of requested constants by name,
+    or by alternate name, e.g. Avogadro number.
+
+    Misspelled names are matched against names and symbols:
+    with fuzzy set to a threshold (0 to 1.0), the best match
+    scoring that much replaces the name; otherwise the
+    closest names are suggested.
     '''
 
-    if fileExists(fname) is False:
-        return {}
+    if dataset is None:
+        dataset = codata.GetDataset()
 
     constants_dict = {}
+    constants = dataset.Dictionary()
+
+    for name in name_list:
+        key = dataset.Canonical(name.strip())
+        name = codata._strip_name(name.strip())
+
+        if key != '':
+            constants_dict[key] = constants[key]
+            continue
+
+        if fuzzy is not None:
+            key = dataset.Resolve(name,fuzzy)
+            if key != '':
+                print('\'%s\' resolved to \'%s\'' % (name,constants[key]['Quantity ']))
+                constants_dict[key] = constants[key]
+                continue
+
+        print('\'%s\' constant not found' % name)
+
+        near = [constants[k]['Quantity '] for score,k in dataset.Suggest(name)]
+        if len(near) > 0:
+            print('    did you mean: %s?' % ', '.join(near))
+
+    return constants_dict
+
+#______________________________________________________
+
+def doSelection (expression='', dataset=None):
+    '''
+    Construct dictionary of constants chosen by a selection
+    expression.  The algebra runs on key sets; records are
+    looked up only here, once, for the surviving keys.
+    '''
+
+    if dataset is None:
+        dataset = codata.GetDataset()
+
+    keys = dataset.Select(expression)
+    if keys is None:
+        return {}
+
+    constants = dataset.Dictionary()
+
+    return dict([(k,constants[k]) for k in keys])
+
+#______________________________________________________
+
+def doQuery (where='', dataset=None):
+    '''
+    Construct dictionary of constants satisfying where
+    clauses, e.g. 'unit == J and reluncert > 1e-8'.
+    '''
+
+    if dataset is None:
+        dataset = codata.GetDataset()
+
+    keys = dataset.Query(where)
+    if keys is None:
+        return {}
+
+    constants = dataset.Dictionary()
+
+    return dict([(k,constants[k]) for k in keys])
+
+#______________________________________________________
+
+def doShake (srcdir='', fmt=None, dataset=None):
+    '''
+    Construct dictionary of the constants whose symbols, as
+    fmt declares them, or ID names are used by the C,
+    Fortran and Python sources under srcdir.  A symbol
+    two constants share names the first by key, outside
+    atomic units where it can.  Returns None on error.
+    '''
+
+    if not os.path.isdir(srcdir):
+        print('Error: source directory %s not found' % srcdir)
+        return None
+
+    if fmt is None:
+        fmt = formats.FormatPython()
+
+    if dataset is None:
+        dataset = codata.GetDataset()
+
+    constants = dataset.Dictionary()
+
+    symbols = {}
+    for k in sorted(constants.keys(),
+                    key=lambda k: (constants[k]['Category'] == 'atomic units',k)):
+        record = constants[k]
+        name = record['Quantity ']
+        symbols.setdefault(fmt.Identifier(fmt.Symbol(record['Symbol'],name)),k)
+        symbols.setdefault(fmt.IdName(name),k)
+
+    users,scanned,generated = shake.SymbolScanner(symbols).scanTree(srcdir)
+
+    return dict([(k,constants[k]) for k in users])
+
+#______________________________________________________
+
+def readLines (fname=''):
+    '''
+    Read a text file of entries, one per line.
+        blank lines ignored
+        # commented lines ignored
+    '''
+
+    name_list = []
 
     with open(fname,'r') as ifp:
         for line in ifp:
             name = line.strip()
 
             if name != '' and name[0] != '#':
-                name = codata._strip_name(name)
-                if name in codata.Names():
+                name_list.append(name)
 
-                    constants_dict[name] = codata.Properties(name)
+    ifp.close()
 
-                else:
-                    print('\'%s\' constant not found' % name)
+    return name_list
 
-    ifp.close()
+#______________________________________________________
 
-    return constants_dict
+def readFileList (fname='', dataset=None, fuzzy=None):
+    '''
+    Read list of constants from a text file.
+    Constant names are one per line.
+        blank lines ignored
+        # commented lines ignored
+    Misspelled names are handled as by doNames().
+    '''
+
+    if fileExists(fname) is False:
+        return {}
+
+    return doNames(readLines(fname),dataset,fuzzy)
 
 #______________________________________________________
 def dumpList (cdict={}):
     '''
     Print list of constants in category to console.
+    cdict is a dictionary, key set or record iterator.
 
     if no categories were specified,
     do nothing.
     '''
 
-    if len(cdict)<1:
-        print('No constants in list')
+    count = 0
+    for record in streamRecords(cdict):
+        print(record['Quantity '])
+        count += 1
 
-    else:
-        namelist = sorted(cdict.keys())
-        for name in namelist:
-            print(cdict[name]['Quantity '])
+    if count < 1:
+        print('No constants in list')
 
     return
 
 #______________________________________________________
 
-def genericWrite(outfp,constants_dict={}):
+def renderDefinitions(outfp,constants_dict={},fmt=None,fname=None,names=None,
+                      dataset=None):
+    '''
+    Write file header, sorted declarations and file tail
+    to any file-like object.  Does not flush or close it.
+    constants_dict is a dictionary, key set or record
+    iterator, rendered as it is read.  names is an optional
+    pre-sorted key list, whose records come from
+    constants_dict when it is a dictionary, else from the
+    dataset; dataset, default the current one, also supplies
+    the header's edition and citation.
+    '''
 
-    global Fmt
+    if fmt is None:
+        fmt = formats.FormatPython()
 
-    #print('genericWrite: syntax = %s' % Fmt.language())
+    if fname is None:
+        fname = getattr(outfp,'name','<stream>')
 
     # file header with date and provenance info
-    citation = Fmt.FileHead()
+    citation = fmt.FileHead(dataset)
     outfp.write(citation + '\n')
 
-    # sort by name for easier visual search
-    constants_list = sorted(constants_dict.keys())
+    # sort by name (or the selected order) for easier visual search
+    if names is None:
+        records = streamRecords(constants_dict,dataset)
+    elif hasattr(constants_dict,'keys'):
+        records = (constants_dict[key] for key in names)
+    else:
+        source = codata.GetDataset() if dataset is None else dataset
+        records = (source.Properties(key) for key in names)
 
-    for key in constants_list:
-        property = constants_dict[key]
+    for property in records:
 
         # use uncooked CODATA constant name instead of stripped lowercase key
         name = property['Quantity ']
 
-        decl = Fmt.BuildDefinition(name,property)
-        outfp.write(decl + '\n')
+        decl = fmt.BuildDefinition(name,property)
+        if decl != '':
+            outfp.write(decl + '\n')
 
     # file tail with file name, time info
-    outfp.write(Fmt.FileTail(outfp.name))
+    outfp.write(fmt.FileTail(fname))
+
+    return
+
+#______________________________________________________
+
+def genericWrite(outfp,constants_dict={}):
+
+    global Fmt
+
+    #print('genericWrite: syntax = %s' % Fmt.language())
+
+    renderDefinitions(outfp,constants_dict,Fmt,outfp.name)
+
+    # e.g. the C source file defining the header's constants
+    companion = Fmt.Companion(outfp.name)
+    if companion is not None:
+        outfp.write('\n')
+        renderDefinitions(outfp,constants_dict,companion,outfp.name)
 
     outfp.flush()
 
@@ -177,7 +445,6 @@ def genericWrite(outfp,constants_dict={}):
 
     return
 
-
 #______________________________________________________
 
 def writeConsole (constants_dict={}):
@@ -194,7 +461,7 @@ def writeFile (constants_dict={}, outFileName=''):
         return
 
     try:
-        ofp = open(outFileName,'wa')
+        ofp = open(outFileName,'w')
         genericWrite(ofp,constants_dict)
     except:
         print("ERROR: can\'t open file %s" % outFileName)
@@ -203,75 +470,809 @@ def writeFile (constants_dict={}, outFileName=''):
 
 #______________________________________________________
 
+# permissions of a new file.  The umask can only be read by
+# setting it, process-wide, so it is read once, at import,
+# not while other threads may be creating files.
+_umask_ = os.umask(0)
+os.umask(_umask_)
+_file_mode_ = 0o666 & ~_umask_
+
+def _atomicWrite (fname, writer, mode=_file_mode_):
+    '''
+    Call writer(tmpname) to fill a temporary file in the
+    destination directory, then rename it over fname so
+    readers never see a partial file.  The temporary name
+    keeps fname's suffix (".gz" selects compression) and,
+    since mkstemp() files are private, mode restores the
+    usual permissions.
+    Returns (fname, elapsed seconds, error string or None).
+    '''
+
+    start = time.time()
+    dirname = os.path.dirname(os.path.abspath(fname))
+    tmpname = None
+
+    try:
+        fd,tmpname = tempfile.mkstemp(dir=dirname, prefix='.',
+                        suffix='.' + os.path.basename(fname))
+        os.close(fd)
+
+        writer(tmpname)
+        os.chmod(tmpname,mode)
+
+        # os.rename can't replace an existing file on Windows
+        if hasattr(os,'replace'):
+            os.replace(tmpname,fname)
+        else:
+            os.rename(tmpname,fname)
+
+    except Exception as err:
+        # e.g. a UnicodeEncodeError from the writer: report it, leave no temporary
+        if tmpname is not None and os.path.exists(tmpname):
+            os.remove(tmpname)
+        if not isinstance(err,(IOError,OSError)):
+            err = '%s: %s' % (type(err).__name__,err)
+        return (fname, time.time() - start, str(err))
+
+    return (fname, time.time() - start, None)
+
+#______________________________________________________
+
+def _byteCompile (fname='', python=None):
+    '''
+    Byte-compile a Python module for an interpreter, the
+    one running gencodata when python is None.  A .pyc is
+    read only by the Python version that wrote it, so a
+    module imported under python3 is compiled by python3.
+    Returns an error string or None.
+    '''
+
+    if python is None:
+        try:
+            py_compile.compile(fname,doraise=True)
+        except (py_compile.PyCompileError,IOError,OSError) as e:
+            return 'can\'t byte-compile, %s' % e
+        return None
+
+    try:
+        proc = subprocess.Popen([python,'-m','py_compile',fname],
+                                stdout=subprocess.PIPE,stderr=subprocess.STDOUT)
+        diagnostics = proc.communicate()[0].decode('latin-1').strip()
+    except OSError as e:
+        return 'can\'t run %s, %s' % (python,e)
+
+    if proc.returncode != 0:
+        return 'can\'t byte-compile with %s, %s' % (python,diagnostics)
+
+    return None
+
+#______________________________________________________
+
+def writeArtifacts (constants_dict={}, artifacts=[], fmt=None, report=False,
+                    python=None):
+    '''
+    Write header, CSV and JSON files concurrently.
+
+    artifacts is a list of (kind, file name) tuples where
+    kind is 'header', 'module', 'csv', 'json' or 'jsonl'.
+    A module is a FormatPythonModule, whatever the syntax,
+    with fmt's conversion kernels, byte-compiled once in
+    place for the interpreter python, see _byteCompile().
+    constants_dict
+    is a dictionary or key set.  Every writer reads its own
+    stream of records from the dataset's precomputed order;
+    each file is written on a small thread pool and atomically
+    replaced.  A header whose syntax has a companion, e.g. the
+    C source of a CExtern header, gets it written alongside,
+    named like the header with the companion's extension.
+    '''
+
+    global Fmt
+
+    if len(constants_dict) < 1 or len(artifacts) < 1:
+        return
+
+    if fmt is None:
+        fmt = Fmt
+
+    companions = {}
+    for kind,fname in list(artifacts):
+        companion = fmt.Companion(fname) if kind == 'header' else None
+        if companion is not None:
+            source = os.path.splitext(fname)[0] + companion.Extension()
+            companions[source] = companion
+            artifacts = artifacts + [('source',source)]
+
+    # one stream per writer, opened here so the order is built once
+    streams = [streamRecords(constants_dict) for artifact in artifacts]
+
+    def header (fname,records):
+        def writer (tmpname):
+            with open(tmpname,'w') as ofp:
+                renderDefinitions(ofp,records,fmt,fname)
+        return writer
+
+    def source (fname,records):
+        def writer (tmpname):
+            with open(tmpname,'w') as ofp:
+                renderDefinitions(ofp,records,companions[fname],fname)
+        return writer
+
+    def module (fname,records):
+        def writer (tmpname):
+            with open(tmpname,'w') as ofp:
+                renderDefinitions(ofp,records,
+                    formats.FormatPythonModule().Convert(getattr(fmt,'_convert',False)),fname)
+        return writer
+
+    def csv (fname,records):
+        return lambda tmpname: codata.ExportCSV(records,tmpname)
+
+    def json (fname,records):
+        return lambda tmpname: codata.ExportJSON(records,tmpname,indent=2)
+
+    def jsonl (fname,records):
+        return lambda tmpname: codata.ExportJSONLines(records,tmpname)
+
+    writers = {'header':header, 'source':source, 'module':module, 'csv':csv,
+               'json':json, 'jsonl':jsonl}
+
+    jobs = [(fname, writers[kind](fname,records)) \
+                for (kind,fname),records in zip(artifacts,streams)]
+
+    pool = ThreadPool(min(len(jobs),4))
+    try:
+        results = pool.map(lambda job: _atomicWrite(job[0],job[1]), jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+    for (kind,fname),(_,elapsed,err) in zip(artifacts,results):
+        if err is None and kind == 'module':
+            err = _byteCompile(fname,python)
+
+        if err is not None:
+            print("ERROR: can\'t write file %s: %s" % (fname,err))
+
+        elif report is True:
+            print('%-6s %-40s %8.2f ms' % (kind,fname,elapsed*1000.0))
+
+    return
+
+#______________________________________________________
+
+# time.asctime() stamps in file heads and tails, ignored when
+# deciding whether a regenerated file has changed
+_stamp_re_ = re.compile(r'[A-Z][a-z]{2} [A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d \d{4}')
+
+def _writeIfChanged (fname, text='', mode=_file_mode_):
+    '''
+    Atomically replace fname with text unless it already holds
+    the same text, generation time stamps aside, leaving its
+    modification time alone so make and friends skip its
+    dependents.  Returns (fname, elapsed, error, written).
+    '''
+
+    start = time.time()
+
+    if os.path.exists(fname):
+        try:
+            with open(fname,'r') as ifp:
+                old = ifp.read()
+            if _stamp_re_.sub('',old) == _stamp_re_.sub('',text):
+                return (fname, time.time() - start, None, False)
+        except (IOError,OSError):
+            pass
+
+    def writer (tmpname):
+        with open(tmpname,'w') as ofp:
+            ofp.write(text)
+
+    fname,elapsed,err = _atomicWrite(fname,writer,mode)
+
+    return (fname, elapsed, err, err is None)
+
+#______________________________________________________
+
+def splitName (category='', prefix='codata'):
+    ''' file stem of a category header: 'atomic units' --> codata_atomic_units '''
+    return prefix + '_' + re.sub(r'[^a-z0-9]+','_',category.lower()).strip('_')
+
+#______________________________________________________
+
+def writeSplit (constants_dict={}, dirname='', fmt=None, prefix='codata',
+                report=False):
+    '''
+    Write one include-guarded header per category of the
+    selection, plus an umbrella header including them all,
+    into dirname.  Files are rendered on a small thread pool
+    and replaced only when their declarations change, so an
+    edit to one constant touches one category's header and
+    recompiles only the code including it.
+
+    Returns the list of files written, or None on error.
+    '''
+
+    global Fmt
+
+    if len(constants_dict) < 1:
+        return []
+
+    if fmt is None:
+        fmt = Fmt
+
+    dataset = codata.GetDataset()
+
+    if not os.path.isdir(dirname):
+        try:
+            os.makedirs(dirname)
+        except OSError as err:
+            print("ERROR: can\'t create directory %s: %s" % (dirname,err))
+            return None
+
+    # group the keys by category; records are fetched while rendering
+    source = constants_dict if hasattr(constants_dict,'keys') else dataset.Dictionary()
+    groups = {}
+    for k in constants_dict:
+        groups.setdefault(source[k]['Category'],[]).append(k)
+
+    categories = [c for c in dataset.Categories() if c in groups] + \
+                 sorted([c for c in groups if c not in dataset.Categories()])
+
+    ext = fmt.Extension()
+
+    def render (fname, guard, records):
+        unit = units.ForUnit(os.path.basename(fname).rsplit('.',1)[0])
+        strfp = StringIO()
+        strfp.write(unit.GuardHead(guard))
+        renderDefinitions(strfp,records,unit,os.path.basename(fname),None,dataset)
+        strfp.write(unit.GuardTail(guard))
+        return strfp.getvalue()
+
+    jobs = []
+    for cat in categories:
+        stem = splitName(cat,prefix)
+        keys = groups[cat]
+        if source is constants_dict:
+            keys = dict([(k,constants_dict[k]) for k in keys])
+        else:
+            keys = set(keys)
+        jobs.append((os.path.join(dirname,stem + ext),
+                     (stem + ext).upper().replace('.','_'),
+                     streamRecords(keys,dataset),keys))
+
+    # e.g. C sources linked into one program: a symbol is defined once
+    units = fmt.ForUnit(prefix).Claim(record for fname,guard,records,keys in jobs \
+                                          for record in streamRecords(keys,dataset))
+
+    def job (args):
+        fname,guard,records,keys = args
+        results = [_writeIfChanged(fname,render(fname,guard,records))]
+
+        # e.g. the C source defining the category header's constants
+        stem = os.path.basename(fname).rsplit('.',1)[0]
+        companion = units.ForUnit(stem).Companion(fname)
+        if companion is not None:
+            source = os.path.splitext(fname)[0] + companion.Extension()
+            strfp = StringIO()
+            renderDefinitions(strfp,streamRecords(keys,dataset),companion,
+                              os.path.basename(source),None,dataset)
+            results.append(_writeIfChanged(source,strfp.getvalue()))
+
+        return results
+
+    pool = ThreadPool(min(len(jobs),4))
+    try:
+        results = sum(pool.map(job,jobs),[])
+    finally:
+        pool.close()
+        pool.join()
+
+    # umbrella header, in the same syntax
+    umbrella = os.path.join(dirname,prefix + ext)
+    guard = (prefix + ext).upper().replace('.','_')
+
+    strfp = StringIO()
+    strfp.write(fmt.GuardHead(guard))
+    strfp.write(fmt.FileHead(dataset) + '\n')
+    for fname,_,_,_ in jobs:
+        strfp.write(fmt.Include(os.path.basename(fname)))
+    strfp.write('\n' + fmt.FileTail(os.path.basename(umbrella)))
+    strfp.write(fmt.GuardTail(guard))
+
+    results.append(_writeIfChanged(umbrella,strfp.getvalue()))
+
+    written = []
+    for fname,elapsed,err,changed in results:
+        if err is not None:
+            print("ERROR: can\'t write file %s: %s" % (fname,err))
+            continue
+
+        if changed:
+            written.append(fname)
+
+        if report is True:
+            print('%-6s %-40s %8.2f ms' % ('split' if changed else 'same',
+                                          fname,elapsed*1000.0))
+
+    if report is True:
+        print('%d of %d files changed' % (len(written),len(results)))
+
+    return written
+
+#______________________________________________________
+
+def printDiff (diff={}):
+    ''' print a codata.Diff() result to console '''
+
+    added   = diff['added']
+    removed = diff['removed']
+    changed = diff['changed']
+
+    print('%d added, %d removed, %d changed' % \
+            (len(added),len(removed),len(changed)))
+
+    for key in sorted(added):
+        print('+ %s' % added[key]['Quantity '])
+
+    for key in sorted(removed):
+        print('- %s' % removed[key]['Quantity '])
+
+    for key in sorted(changed):
+        change = changed[key]
+        old,new = change['old'],change['new']
+
+        print('~ %s' % old['Quantity '])
+        for f in change['fields']:
+            print('    %-12s %s --> %s' % (f,old[f],new[f]))
+        if change['shift'] is not None:
+            print('    %-12s %+.3e' % ('shift',change['shift']))
+
+    return
+
+#______________________________________________________
+
+def writeDiff (diff={}, outFileName=''):
+    ''' write a codata.Diff() result as JSON '''
+
+    added   = diff['added']
+    removed = diff['removed']
+    changed = diff['changed']
+
+    changes = []
+    for k in sorted(changed):
+        change = dict(changed[k])
+        change['Quantity '] = change['old']['Quantity ']
+        changes.append(change)
+
+    jdict = {
+        'added':   [added[k] for k in sorted(added)],
+        'removed': [removed[k] for k in sorted(removed)],
+        'changed': changes,
+        }
+
+    try:
+        with open(outFileName,'w') as ofp:
+            json.dump(jdict,ofp,indent=2,separators=(',',': '))
+            ofp.write('\n')
+    except (IOError,OSError):
+        print("ERROR: can\'t open file %s" % outFileName)
+
+    return
+
+#______________________________________________________
+
+def handleDiff (parsed):
+    '''
+    gencodata diff OLD NEW [-m MANIFEST] [-o OUTPUT] [-j JSON]
+
+    Print constants added, removed and changed between two
+    datasets.  With a manifest of generated headers, list the
+    headers that declare any of them, on console or to OUTPUT.
+    '''
+
+    diff = codata.Diff(parsed.old,parsed.new)
+    if diff is None:
+        return
+
+    printDiff(diff)
+
+    if parsed.json != '':
+        writeDiff(diff,parsed.json[0])
+
+    if parsed.manifest != '':
+        if fileExists(parsed.manifest[0]) is False:
+            return
+
+        headers = readLines(parsed.manifest[0])
+        affected = codata.AffectedHeaders(diff,headers)
+
+        if parsed.output != '':
+            try:
+                with open(parsed.output[0],'w') as ofp:
+                    for fname in affected:
+                        ofp.write(fname + '\n')
+            except (IOError,OSError):
+                print("ERROR: can\'t open file %s" % parsed.output[0])
+        else:
+            print('\n%d of %d headers affected' % (len(affected),len(headers)))
+            for fname in affected:
+                print(fname)
+
+    return
+
+#______________________________________________________
+
+def handleSearch (parsed):
+    '''
+    gencodata search WORD [WORD ...] [-a] [--top N]
+
+    List constants whose names, symbols or units contain
+    every (or, with -a, any) word, best match first.
+    '''
+
+    mode = 'or' if parsed.any else 'and'
+
+    keys = codata.Search(parsed.words,mode,parsed.top[0])
+    if keys is None:
+        return
+
+    if len(keys) < 1:
+        print('No constants match \'%s\'' % ' '.join(parsed.words))
+        return
+
+    constants = codata.Dictionary()
+    for rank,k in enumerate(keys):
+        record = constants[k]
+        print('%3d  %-50s %-20s (%s)' % \
+                (rank+1,record['Quantity '],record['Symbol'],record['Category']))
+
+    return
+
+#______________________________________________________
+
+def handleShake (parsed, selected=set()):
+    '''
+    gencodata shake SRC_DIR --unused
+
+    Print how many constants the sources use and list those
+    they don't, instead of declaring the ones they do.
+    '''
+
+    constants = codata.Dictionary()
+    unused = set(constants.keys()) - set(selected)
+
+    print('%d of %d constants used under %s, %d unused:\n' % \
+            (len(selected),len(constants),parsed.srcdir,len(unused)))
+    dumpList(unused)
+
+    return
+
+#______________________________________________________
+
+def handleFloat32 (selected=set()):
+    '''
+    gencodata ... --float32
+
+    List the selected constants a float32 can't do justice:
+    those known to a relative uncertainty below FLT_EPSILON,
+    exact ones included, and those outside its normal range.
+    '''
+
+    print('%-10s %-12s %s' % ('reluncert','float32 err','name'))
+
+    count = 0
+    for record in streamRecords(selected):
+        value = record['Value']
+        exact = float(value)
+        reluncert = 0.0 if exact == 0.0 else float(record['Uncertainty'])/abs(exact)
+
+        if not float32.fits32(value):
+            error = 'out of range'
+        elif reluncert < float32.FLT_EPSILON:
+            error = '%.1e' % (0.0 if exact == 0.0 else \
+                                abs(float32.round32(value) - exact)/abs(exact))
+        else:
+            continue
+
+        uncert = 'exact' if reluncert == 0.0 else '%.1e' % reluncert
+        print('%-10s %-12s %s' % (uncert,error,record['Quantity ']))
+        count += 1
+
+    print('\n%d of %d constants lose accuracy or range as float32, resolution %.1e' % \
+            (count,len(selected),float32.FLT_EPSILON))
+
+    return
+
+#______________________________________________________
+
 def handleArgs (parsed):
 
     ''' Assign actions to parsed arguments.
     parsed is of type <class 'argparse.Namespace'>.
     Looks like:
 
-    Namespace(category=['atomic'], csv='', input='', json='',
-                     list=False, output='', syntax=['C99'])
+    Namespace(category=['atomic'], csv='', data='', edition='', fuzzy=None,
+                     input='', json='', jsonl='',
+                     list=False, output='', overlay=[], reverse=False,
+                     select='', sort='', split='', syntax=['C99'],
+                     timing=False, top=None)
 
     Note that args retrieved from command line have a list wrapper
     while default values do not.
+
+    Only constant keys are collected; the writers fetch the
+    records one at a time as they render them.
+
+    Returns False when the selected edition, export file or
+    an overlay file can't be loaded, so gencodata exits with
+    status 1.
     '''
 
-    constants_dict = {}
+    selected = set()
     if parsed == None:
         return
 
-    '''build constants dict from category list'''
+    '''sub-commands have their own handlers'''
+
+    command = getattr(parsed,'command','')
+    if command == 'diff':
+        handleDiff(parsed)
+        return
+
+    '''select the CODATA edition'''
+
+    edition = getattr(parsed,'edition','')
+    if edition != '':
+        if codata.SetEdition(edition[0]) is False:
+            return False
+
+    '''replace CODATA with a curated export file'''
+
+    data = getattr(parsed,'data','')
+    if data != '':
+        if codata.LoadExport(data[0]) is False:
+            return False
+
+    '''layer site-local overlay files'''
+
+    for overlay in getattr(parsed,'overlay',[]):
+        if codata.AddOverlay(overlay) is False:
+            return False
+
+    '''search sub-command: ranked list, no declarations'''
+
+    if command == 'search':
+        handleSearch(parsed)
+        return
+
+    '''query sub-command: constants satisfying the where clauses'''
+
+    if command == 'query':
+        selected = set(doQuery(' and '.join(parsed.where)))
+
+    '''shake sub-command: constants the sources use, as the syntax names them'''
+
+    if command == 'shake':
+        shaken = doShake(parsed.srcdir,GetFormat(parsed.syntax))
+        if shaken is None:
+            return
+
+        selected = set(shaken)
+        if parsed.unused:
+            handleShake(parsed,selected)
+            return
+
+    '''select constants from category list'''
 
     if len(parsed.category)>0:
         category_list = parsed.category
-        constants_dict = doCategories(category_list)
+        selected = set(doCategories(category_list))
 
     '''
     read constant names from file
-    and build dictionary of them.
+    and add them to the selection.
     '''
     if parsed.input != '':
         infile = parsed.input[0]
-        tempdict = readFileList(infile)
-        constants_dict.update(tempdict)
+        tempdict = readFileList(infile,fuzzy=getattr(parsed,'fuzzy',None))
+        selected.update(tempdict)
+
+    '''add constants chosen by a selection expression'''
+
+    select = getattr(parsed,'select','')
+    if select != '':
+        selected.update(doSelection(select[0]))
+
+    '''order the selection, keeping only the first --top'''
+
+    sort = getattr(parsed,'sort','')
+    if SetOrder(sort[0] if sort != '' else 'name',
+                getattr(parsed,'reverse',False)) is False:
+        return
+
+    top = getattr(parsed,'top',None)
+    if top is not None:
+        selected = set(orderedNames(selected,top=top[0]))
 
     '''dump the constant names to console and QUIT'''
     if parsed.list is True:
-        dumpList(constants_dict)
+        dumpList(selected)
+        return
+
+    '''report the constants float32 output loses and QUIT'''
+    if getattr(parsed,'float32',False) is True:
+        handleFloat32(selected)
         return
 
     # bail if nothing to do
-    if len(constants_dict)<1:
+    if len(selected)<1:
         return
 
     ''' Select language syntax/format for output '''
-    SetFormat(parsed.syntax)
+    precision = getattr(parsed,'precision','')
+    SetFormat(parsed.syntax,getattr(parsed,'uncertainty',False),
+              getattr(parsed,'table',False),getattr(parsed,'ids',False),
+              precision[0] if precision != '' else 'double',
+              getattr(parsed,'conversions',False))
+
 
+    jsonl = getattr(parsed,'jsonl','')
+
+    split = getattr(parsed,'split','')
+
+    module = getattr(parsed,'module','')
 
     # If NO output files,  write to console
     if (parsed.output == '' and \
         parsed.csv == '' and \
-        parsed.json == ''):
+        parsed.json == '' and \
+        jsonl == '' and \
+        module == '' and \
+        split == ''):
 
-        writeConsole(constants_dict)
+        writeConsole(selected)
 
     # write to output file(s)
     # Header, CSV, and JSON file outputs are not mutually exclusive
     else:
+        artifacts = []
+
         # generate a Simplified Header Interface File
         if parsed.output != '':
-            outFileName = parsed.output[0]
-            writeFile(constants_dict,outFileName)
+            artifacts.append(('header',parsed.output[0]))
+
+        # generate an importable, byte-compiled python module
+        if module != '':
+            artifacts.append(('module',module[0]))
 
         # generate a CSV database file
         if parsed.csv != '':
-            csvFileName = parsed.csv[0]
-            codata.WriteCSV(constants_dict,csvFileName)
+            artifacts.append(('csv',parsed.csv[0]))
 
         # generate a JSON data export file
         if parsed.json != '':
-            jsonFileName = parsed.json[0]
-            codata.WriteJSON(constants_dict,jsonFileName)
+            artifacts.append(('json',parsed.json[0]))
+
+        # generate a JSON-lines data export file
+        if jsonl != '':
+            artifacts.append(('jsonl',jsonl[0]))
+
+        python = getattr(parsed,'python','')
+        writeArtifacts(selected,artifacts,Fmt,
+                       getattr(parsed,'timing',False),
+                       python[0] if python != '' else None)
+
+        # generate per-category headers and an umbrella header
+        if split != '':
+            writeSplit(selected,split[0],Fmt,
+                       report=getattr(parsed,'timing',False))
+
+#______________________________________________________
+
+def Generate (categories=[], names=[], inputfile='',
+              syntax='python', outfp=None, fname='<string>', edition=None,
+              select='', sort='name', reverse=False, top=None, fuzzy=None,
+              uncertainty=False, table=False, ids=False, precision='double',
+              conversions=False):
+    '''
+    Library entry point: render declarations without argparse,
+    sys.exit or module globals.
+
+        categories  - category names, or ['all']
+        names       - constant names, case-insensitive
+        inputfile   - text file of constant names, one per line
+        syntax      - any name accepted by --syntax
+        outfp       - optional file-like object to write to
+        fname       - file name reported in the file tail
+        edition     - CODATA edition year, default the current one
+        select      - selection expression, e.g. 'universal | @five.txt'
+        sort        - declaration order: name, symbol, category, value,
+                      magnitude, uncertainty or reluncert
+        reverse     - reverse the order
+        top         - keep only the first top constants in that order
+        fuzzy       - resolve misspelled names matching this well (0-1.0)
+        uncertainty - declare uncertainties too, where the syntax can
+        table       - declare a table of constant names, where the syntax can
+        ids         - declare stable constant IDs and values by ID, in C,
+                      Fortran and Python syntax
+        precision   - 'single' for float32 values or 'mixed' for a float32
+                      twin, <symbol>_f32, of each double, in C, C++ and
+                      Fortran syntax
+        conversions - define unit conversion functions of the equivalents
+                      selected, in C, C++, Fortran module and Python syntax
+
+    Returns the rendered text, or None when written to outfp.
+    Each edition is loaded once, on first use, and reused.
+    Syntaxes with a companion source file, e.g. CExtern,
+    render the header only; writeArtifacts() writes both.
+    '''
+
+    dataset = codata.GetDataset(edition)
+    if dataset is None:
+        return None
+
+    selected = set()
+
+    if len(categories) > 0:
+        selected.update(doCategories(categories,dataset))
+
+    if len(names) > 0:
+        selected.update(doNames(names,dataset,fuzzy))
+
+    if inputfile != '':
+        selected.update(readFileList(inputfile,dataset,fuzzy))
+
+    if select != '':
+        selected.update(doSelection(select,dataset))
+
+    records = dataset.IterConstants(selected,sort,reverse,top)
+    if records is None:
+        return None
+
+    fmt = GetFormat(syntax,uncertainty,table,ids,precision,conversions)
+
+    if outfp is not None:
+        renderDefinitions(outfp,records,fmt,fname,None,dataset)
+        return None
+
+    strfp = StringIO()
+    renderDefinitions(strfp,records,fmt,fname,None,dataset)
+    return strfp.getvalue()
+
+#______________________________________________________
+
+def _findProgram (name=''):
+    ''' path of an executable on PATH, None if there is none '''
+
+    for dirname in os.environ.get('PATH','').split(os.pathsep):
+        path = os.path.join(dirname,name)
+        if os.path.isfile(path) and os.access(path,os.X_OK):
+            return path
+
+    return None
+
+def _compileErrors (command=[], files={}):
+    '''
+    Write files, a dictionary of file name --> text, to a
+    temporary directory and run command there.  Returns
+    the compiler's diagnostics when it fails, else None.
+    '''
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for fname,text in files.items():
+            with open(os.path.join(tmpdir,fname),'w') as ofp:
+                ofp.write(text)
+
+        proc = subprocess.Popen(command,cwd=tmpdir,stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        diagnostics = proc.communicate()[0].decode('latin-1')
+        return diagnostics if proc.returncode != 0 else None
+    finally:
+        for fname in os.listdir(tmpdir):
+            os.remove(os.path.join(tmpdir,fname))
+        os.rmdir(tmpdir)
 
 #______________________________________________________
 
@@ -334,8 +1335,8 @@ def _test_outputs ():
     print('\n ----- syntax arg test -----\n')
     ArgList =   ['C','C99','K&R','K&RC',
                 'F','F77','Fortran','Fortran77',
-                'Fortran90','F90',
-                'Python','Python2','Python3']
+                'Fortran90','F90','Fmod','F90module','C++','cpp17','cextern','Clookup',
+                'Python','Python2','Python3','module']
 
     for i in range(0,len(ArgList)):
         SetFormat(ArgList[i])
@@ -364,7 +1365,7 @@ def _test_outputs ():
     testkeys = _test_dict.keys()
     tempdict = {}
     for tkey in testkeys:
-        if tkey not in codata._phys_const_keys_:
+        if tkey not in codata.Dictionary():
             print("Error: couldn\'t find \'%s\'." % tkey)
 
         else:
@@ -379,6 +1380,298 @@ def _test_outputs ():
         print("test dictionary correctly built:")
         writeConsole(tempdict)
 
+    print('\n ----- in-memory Generate() test -----\n')
+
+    text = Generate(categories=['X-ray'], names=['Planck constant'],
+                    syntax='C99')
+    for sym in ['W_K_alpha','d_220','#define h ']:
+        if sym not in text:
+            print("Error: Generate() output lacks \'%s\'" % sym)
+
+    strfp = StringIO()
+    if Generate(names=['speed of light in vacuum'], outfp=strfp) is not None:
+        print('Error: Generate() returned text when given outfp')
+    if 'c = 299792458.0' not in strfp.getvalue():
+        print('Error: Generate() did not write to outfp')
+    print('Generate() rendered %d lines' % len(text.split('\n')))
+
+    text = Generate(select='X-ray - sym:d_220 | h', syntax='C99')
+    if 'W_K_alpha' not in text or 'd_220' in text or '#define h ' not in text:
+        print('Error: Generate() selection output is wrong')
+    else:
+        print('Generate(select=...) rendered %d lines' % len(text.split('\n')))
+
+    text = Generate(categories=['X-ray'], syntax='C99', sort='value',
+                    reverse=True, top=2)
+    if text.count('#define') != 2 or 'W_K_alpha' in text or \
+        text.index('#define a ') > text.index('#define d_220'):
+        print('Error: Generate() sort and top output is wrong')
+    else:
+        print('Generate(sort=...,top=2) rendered 2 declarations')
+
+    text = Generate(names=['Plank constant','Boltzman constant'], fuzzy=0.8)
+    if 'h = ' not in text or 'k_B = ' not in text:
+        print('Error: Generate() did not resolve misspelled names')
+    else:
+        print('Generate(fuzzy=0.8) resolved misspelled names')
+
+    text = Generate(names=['Planck constant','speed of light in vacuum'], syntax='Python',
+                    ids=True)
+    space = {}
+    exec(text,space)
+    if space['codata_values'][space['CODATA_PLANCK_CONSTANT']] != space['h'] or \
+        space['CODATA_COUNT'] != codata.Id('speed of light in vacuum') + 1:
+        print('Error: Generate(ids=True) values by ID are wrong')
+    else:
+        print('Generate(ids=True) declared values by ID')
+
+    text = Generate(categories=['universal','alpha'], syntax='module')
+    space = {'__name__':'codata_module'}
+    exec(text,space)
+    if space['h'] != space['Universal'].h or \
+        ('m_alpha' in space) != (sys.version_info < (3,7)) or \
+        space['__getattr__']('m_alpha') != space['Alpha'].m_alpha or \
+        'Alpha' not in space['__all__']:
+        print('Error: Generate(syntax=module) classes or lazy bindings are wrong')
+    else:
+        print('Generate(syntax=module) bound alpha constants on first use')
+
+    # imported, and star-imported, by this python and python3 if there is one
+    import shutil
+    check = 'import sys; sys.path.insert(0,sys.argv[1]); from codata_module import *; ' + \
+            'import codata_module as m; sys.exit(m_alpha != m.Alpha.m_alpha or m.h != m.Universal.h)'
+    for python in [None,_findProgram('python3')]:
+        tmpdir = tempfile.mkdtemp()
+        fname = os.path.join(tmpdir,'codata_module.py')
+        writeArtifacts(doCategories(['universal','alpha']),[('module',fname)],
+                       formats.FormatC99(),python=python)
+        compiled = [name for name in os.listdir(tmpdir) if name.endswith('.pyc')]
+        if os.path.isdir(os.path.join(tmpdir,'__pycache__')):
+            compiled += os.listdir(os.path.join(tmpdir,'__pycache__'))
+        if subprocess.call([python or sys.executable,'-c',check,tmpdir]) != 0 or len(compiled) == 0:
+            print('Error: module not byte-compiled or imported by %s' % (python or sys.executable))
+        else:
+            print('module byte-compiled and imported by %s' % (python or sys.executable))
+        shutil.rmtree(tmpdir)
+
+    text = Generate(names=['Planck constant','Planck time'], syntax='C99',
+                    precision='mixed')
+    if '#define h_f32 6.62607e-34f' not in text or '#define h 6.626' not in text or \
+        'Planck time' not in text or 't_P_f32' in text:
+        print('Error: Generate(precision=mixed) float32 twins are wrong')
+    else:
+        print('Generate(precision=mixed) declared float32 twins')
+    handleFloat32(doNames(['Planck constant','Planck time','speed of light in vacuum']))
+
+    text = Generate(names=['hartree-electron volt relationship','hertz-inverse meter relationship'],
+                    conversions=True)
+    space = {}
+    exec(text,space)
+    if space['codata_hartree_to_ev'](2.0) != 2.0*space['Ha_to_eV'] or \
+        abs(space['codata_inv_cm_to_hz'](1.0) - 29979245800.0) > 1e-3:
+        print('Error: Generate(conversions=True) kernels are wrong')
+    else:
+        print('Generate(conversions=True) defined %d kernels' % len(re.findall('def codata_',text)))
+
+    print('\n ----- compiled header test -----\n')
+
+    # every shipped category must build, repeated symbols and all
+    categories = sorted(codata.GetDataset().Categories())
+
+    if _findProgram('g++') is None:
+        print('no g++, C++17 headers not compiled')
+    else:
+        failed = []
+        for cat in categories + ['all']:
+            errors = _compileErrors(['g++','-std=c++17','-fsyntax-only','main.cpp'],
+                                    {'codata.hpp':Generate(categories=[cat],syntax='C++',
+                                                           uncertainty=True),
+                                     'main.cpp':'#include "codata.hpp"\n'})
+            if errors is not None:
+                failed.append(cat)
+                print(errors[:600])
+        if len(failed) > 0:
+            print('Error: C++17 headers of %s don\'t compile' % ', '.join(failed))
+        else:
+            print('C++17 headers of %d categories compiled' % len(categories))
+
+    if _findProgram('gfortran') is None:
+        print('no gfortran, Fortran modules not compiled')
+    else:
+        failed = []
+        for cat in categories + ['all']:
+            errors = _compileErrors(['gfortran','-fsyntax-only','codata.f90'],
+                                    {'codata.f90':Generate(categories=[cat],syntax='Fmod',
+                                                           precision='mixed')})
+            if errors is not None:
+                failed.append(cat)
+                print(errors[:600])
+        if len(failed) > 0:
+            print('Error: Fortran modules of %s don\'t compile' % ', '.join(failed))
+        else:
+            print('Fortran modules of %d categories compiled' % len(categories))
+
+    if _findProgram('gcc') is None:
+        print('no gcc, C header and source pairs not compiled')
+    else:
+        failed = []
+        for cat in categories + ['all']:
+            pair = formats.FormatCExtern(uncertainty=True,table=True)
+            files = {}
+            for fname,fmt in [('codata.h',pair),('codata.c',pair.Companion('codata.h'))]:
+                strfp = StringIO()
+                renderDefinitions(strfp,doCategories([cat]),fmt,fname)
+                files[fname] = strfp.getvalue()
+            errors = _compileErrors(['gcc','-std=c99','-Wall','-Werror','-c','codata.c'],files)
+            if errors is not None:
+                failed.append(cat)
+                print(errors[:600])
+
+        # split pairs link into one program, a symbol defined once
+        tmpdir = tempfile.mkdtemp()
+        writeSplit(doCategories(['all']),tmpdir,formats.FormatCExtern(uncertainty=True))
+        files = {'main.c':'#include "codata.h"\nint main (void) { return hbar > 0.0 ? 0 : 1; }\n'}
+        for fname in os.listdir(tmpdir):
+            files[fname] = open(os.path.join(tmpdir,fname)).read()
+            os.remove(os.path.join(tmpdir,fname))
+        os.rmdir(tmpdir)
+        errors = _compileErrors(['gcc','-std=c99','-Wall','-Werror','-o','codata'] + \
+                                sorted([f for f in files if f.endswith('.c')]),files)
+        if errors is not None:
+            failed.append('all, split')
+            print(errors[:600])
+
+        if len(failed) > 0:
+            print('Error: C header and source pairs of %s don\'t compile' % ', '.join(failed))
+        else:
+            print('C header and source pairs of %d categories compiled and linked' % len(categories))
+
+    print('\n ----- affected headers test -----\n')
+
+    # a changed h and m_e flag every header declaring either, in any syntax
+    syntaxes = ['C','C99','Cextern','Clookup','C++','F77','F90','Fmod','Python','module']
+    tmpdir = tempfile.mkdtemp()
+    headers = []
+    for syntax in syntaxes:
+        for stem,names in [('both',['Planck constant','electron mass']),
+                           ('neither',['Boltzmann constant'])]:
+            fname = os.path.join(tmpdir,'%s_%s.txt' % (stem,syntax.replace('+','p')))
+            with open(fname,'w') as ofp:
+                Generate(names=names,syntax=syntax,outfp=ofp)
+            headers.append(fname)
+    source = os.path.join(tmpdir,'both_lookup.c')
+    with open(source,'w') as ofp:
+        renderDefinitions(ofp,doNames(['Planck constant','electron mass']),
+                          formats.FormatCLookup().Companion('codata.h'))
+    headers.append(source)
+
+    diff = {'added':{}, 'removed':{}, 'changed':dict([(key,{'old':codata.Properties(key)}) \
+                                for key in ['planck constant','electron mass']])}
+    affected = [os.path.basename(f) for f in codata.AffectedHeaders(diff,headers)]
+    expected = [os.path.basename(f) for f in headers if 'both_' in f]
+    if affected != expected:
+        print('Error: AffectedHeaders() flagged %s, expected %s' % (affected,expected))
+    else:
+        print('AffectedHeaders() flagged %d of %d headers' % (len(affected),len(headers)))
+    for fname in headers:
+        os.remove(fname)
+    os.rmdir(tmpdir)
+
+    print('\n ----- streaming record test -----\n')
+
+    strfp = StringIO()
+    renderDefinitions(strfp,codata.IterConstants('X-ray',top=2),
+                      formats.FormatC99(),'<stream>')
+    if strfp.getvalue().count('#define') != 2:
+        print('Error: renderDefinitions() did not stream records')
+    else:
+        print('renderDefinitions() rendered 2 streamed records')
+    strfp = StringIO()
+    renderDefinitions(strfp,set(alphadict.keys()),formats.FormatC99(),'<keys>',
+                      names=sorted(alphadict.keys())[:2])
+    if strfp.getvalue().count('#define') != 2:
+        print('Error: renderDefinitions() did not resolve names of a key set')
+    dumpList(codata.IterConstants('alpha'))
+    dumpList(iter([]))
+
+    print('\n ----- shake test -----\n')
+
+    tmpdir = tempfile.mkdtemp()
+    with open(os.path.join(tmpdir,'model.c'),'w') as ofp:
+        ofp.write('#include "codata.h"\ndouble E (double w) { return hbar*w + m_P; } /* h */\n')
+    with open(os.path.join(tmpdir,'flux.f90'),'w') as ofp:
+        ofp.write('x = k_b*T*CODATA_AVOGADRO_CONSTANT  ! c\n')
+    with open(os.path.join(tmpdir,'codata.h'),'w') as ofp:
+        renderDefinitions(ofp,doCategories(['universal']),formats.FormatC99())
+
+    shaken = doShake(tmpdir,formats.FormatC99())
+    if sorted(shaken.keys()) != ['avogadro constant','boltzmann constant',
+                                 'planck constant over 2 pi','planck mass']:
+        print('Error: doShake() kept %s' % sorted(shaken.keys()))
+    else:
+        print('doShake() kept %d constants' % len(shaken))
+
+    for fname in os.listdir(tmpdir):
+        os.remove(os.path.join(tmpdir,fname))
+    os.rmdir(tmpdir)
+
+    print('\n ----- split header test -----\n')
+
+    tmpdir = tempfile.mkdtemp()
+    split = doSelection('universal | X-ray')
+    written = writeSplit(split,tmpdir,formats.FormatC99())
+    names = sorted(os.listdir(tmpdir))
+    if names != ['codata.h','codata_universal.h','codata_x_ray.h'] or \
+        len(written) != 3:
+        print('Error: writeSplit() wrote %s' % names)
+    umbrella = open(os.path.join(tmpdir,'codata.h')).read()
+    if '#include "codata_x_ray.h"' not in umbrella or \
+        '#ifndef CODATA_H' not in umbrella:
+        print('Error: writeSplit() umbrella header lacks includes or guard')
+
+    # same declarations: nothing rewritten; one change: one file
+    if writeSplit(split,tmpdir,formats.FormatC99()) != []:
+        print('Error: writeSplit() rewrote unchanged headers')
+    key = codata.Canonical('Cu x unit')
+    split[key] = dict(split[key], Value='1.0')
+    written = writeSplit(split,tmpdir,formats.FormatC99())
+    if written != [os.path.join(tmpdir,'codata_x_ray.h')]:
+        print('Error: writeSplit() changed %s' % written)
+    else:
+        print('writeSplit() rewrote only %s' % os.path.basename(written[0]))
+
+    for fname in os.listdir(tmpdir):
+        os.remove(os.path.join(tmpdir,fname))
+    os.rmdir(tmpdir)
+
+    print('\n ----- concurrent writeArtifacts() test -----\n')
+
+    tmpdir = tempfile.mkdtemp()
+    artifacts = [('header',os.path.join(tmpdir,'alpha.h')),
+                 ('csv',   os.path.join(tmpdir,'alpha.csv')),
+                 ('json',  os.path.join(tmpdir,'alpha.json'))]
+
+    writeArtifacts(alphadict,artifacts,formats.FormatC99(),report=True)
+
+    for kind,fname in artifacts:
+        if not os.path.exists(fname):
+            print('Error: %s file %s not written' % (kind,fname))
+        else:
+            os.remove(fname)
+
+    # any writer exception is reported, its temporary file removed
+    def failing (tmpname):
+        with open(tmpname,'w') as ofp:
+            ofp.write('partial')
+        raise KeyError('Value')
+    fname,elapsed,err = _atomicWrite(os.path.join(tmpdir,'alpha.h'),failing)
+    if err != "KeyError: 'Value'":
+        print('Error: _atomicWrite() reported %s' % err)
+
+    if len(os.listdir(tmpdir)) > 0:
+        print('Error: temporary files left in %s' % tmpdir)
+    os.rmdir(tmpdir)
+
     print('\n#### END %s test\n' % __file__.upper())
     return
 
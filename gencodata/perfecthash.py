@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+ perfecthash.py -
+
+    minimal perfect hash over constant names and symbols,
+    computed at generation time for the generated C lookup
+    (gencodata -s Clookup), so codata_lookup() finds a name
+    with two hashes and one string compare and builds no
+    table at run time.
+
+    Keys are normalized as the C code normalizes its input:
+    ASCII letters lowercased, digits kept, any other run of
+    characters one space, no leading or trailing space.
+
+        'Planck constant'   --> 'planck constant'
+        'mu_0'              --> 'mu 0'
+
+    Hash and displace: every key is hashed into one of n
+    buckets, n the number of keys.  Buckets are placed
+    largest first; each gets the first displacement d whose
+    hash puts all its keys in free slots.  A bucket of one
+    key takes a free slot directly, stored as -slot-1.
+
+        slot = d < 0 ? -d-1 : hash(d, key) % n,  d = displace[hash(0, key) % n]
+
+    hash() is 32-bit FNV-1a with a seeded offset basis and
+    its high half folded into the low; the C template in
+    formats.FormatCLookupSource repeats it.
+
+ creation: 10/19/2026
+"""
+
+import re
+import sys
+
+_norm_re_ = re.compile(r'[^a-z0-9]+')
+
+_fnv_basis_ = 0x811c9dc5
+_fnv_prime_ = 0x01000193
+_seed_mix_  = 0x9e3779b9
+
+#______________________________________________________
+
+def normalize (name=''):
+    ''' lowercase ASCII letters and digits between single spaces '''
+    return _norm_re_.sub(' ',name.lower()).strip()
+
+#______________________________________________________
+
+def fnv (seed=0, key=''):
+    '''
+    32-bit FNV-1a of a normalized key, offset basis mixed
+    with seed, high half folded into the low: FNV's low
+    bits depend only on the seed's low bits, so without the
+    fold two keys colliding mod a power of two collide for
+    every seed and build() never places them.
+    '''
+
+    h = (_fnv_basis_ ^ (seed*_seed_mix_)) & 0xffffffff
+    for c in bytearray(key.encode('ascii','replace')):
+        h = ((h ^ c)*_fnv_prime_) & 0xffffffff
+
+    return h ^ (h >> 16)
+
+#______________________________________________________
+
+def build (keys=[]):
+    '''
+    Return (displace, slots): displace has one entry per
+    bucket, slots the key placed at each slot.  keys are
+    distinct normalized strings; the result depends only
+    on them, not on their order.
+    '''
+
+    keys = sorted(keys)
+    size = len(keys)
+    if size == 0:
+        return ([],[])
+
+    buckets = [[] for i in range(size)]
+    for key in keys:
+        buckets[fnv(0,key) % size].append(key)
+
+    displace = [0]*size
+    slots = [None]*size
+
+    order = sorted(range(size),key=lambda b: (-len(buckets[b]),b))
+
+    for b in order:
+        bucket = buckets[b]
+        if len(bucket) <= 1:
+            break
+
+        d = 1
+        while True:
+            placed = [fnv(d,key) % size for key in bucket]
+            if len(set(placed)) == len(placed) and \
+                    all([slots[s] is None for s in placed]):
+                break
+            d += 1
+
+        displace[b] = d
+        for key,s in zip(bucket,placed):
+            slots[s] = key
+
+    free = [s for s in range(size) if slots[s] is None]
+    for b in order:
+        if len(buckets[b]) != 1:
+            continue
+        s = free.pop(0)
+        displace[b] = -s - 1
+        slots[s] = buckets[b][0]
+
+    return (displace,slots)
+
+#______________________________________________________
+
+def lookup (displace=[], slots=[], name=''):
+    ''' slot of name in a table from build(), or -1; what the C code does '''
+
+    if len(slots) == 0:
+        return -1
+
+    key = normalize(name)
+    d = displace[fnv(0,key) % len(slots)]
+    s = -d - 1 if d < 0 else fnv(d,key) % len(slots)
+
+    return s if slots[s] == key else -1
+
+#______________________________________________________
+
+def _test_perfecthash ():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    keys = [normalize(k) for k in ['Planck constant','h','mu_0','speed of light in vacuum',
+            'c','electron mass','m_e','Boltzmann constant','k_B','Avogadro constant',
+            'N_A','elementary charge','e','Rydberg constant','R_inf']]
+    displace,slots = build(keys)
+
+    if sorted(slots) != sorted(keys):
+        print('!build() placed %s' % slots)
+        errors += 1
+
+    for key in keys:
+        if slots[lookup(displace,slots,key)] != key:
+            print('!lookup(%s) failed' % key)
+            errors += 1
+
+    for name in ['PLANCK  constant','Mu-0']:
+        if lookup(displace,slots,name) < 0:
+            print('!lookup(%s) missed a normalized name' % name)
+            errors += 1
+
+    for name in ['planck','x','']:
+        if lookup(displace,slots,name) != -1:
+            print('!lookup(%s) found a missing name' % name)
+            errors += 1
+
+    if build(keys[::-1]) != (displace,slots) or build([]) != ([],[]):
+        print('!build() depends on key order')
+        errors += 1
+
+    # h and m e collide mod 4 under plain FNV-1a whatever the seed
+    small = ['planck constant','h','electron mass','m e']
+    displace,slots = build(small)
+    if sorted(slots) != sorted(small):
+        print('!build() placed %s' % slots)
+        errors += 1
+
+    if fnv(0,'a') != 0xe40c292c ^ 0xe40c:
+        print('!fnv(0,a) = %x, expected folded FNV-1a e40ccd20' % fnv(0,'a'))
+        errors += 1
+
+    print('\t%d perfect hash errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_perfecthash()
+    sys.exit()
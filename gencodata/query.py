@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+"""
+ query.py -
+
+    predicate queries over a constants dictionary, for
+    codata.Query() and gencodata query --where:
+
+        unit == J and reluncert > 1e-8
+        exact and category == universal
+        value >= 1e3 and name ~ 'mass$'
+
+    Clauses are joined by 'and'.  Each is one of
+
+        exact, not exact            uncertainty is (or isn't) zero
+        FIELD OP OPERAND
+
+    Numeric fields:  value, uncertainty, reluncert
+        OP is one of == != < <= > >=
+    Text fields:     category, unit, symbol, name
+        OP is == or != for equality, ~ for a regular expression
+
+    Operands with spaces are quoted: unit == 'J T^{-1}'
+
+    Columns holds the numbers parsed once per dictionary,
+    sorted for bisect range scans, the text indexes, and
+    the key orders used to sort output.
+
+ creation: 10/19/2026
+"""
+
+import re
+import sys
+
+from bisect import bisect_left, bisect_right
+
+_numeric_fields_ = ['value','uncertainty','reluncert']
+_text_fields_    = ['category','unit','symbol','name']
+
+# orders offered by Columns.order(), ties broken by name
+_sort_keys_      = ['name','symbol','category','value','magnitude',
+                    'uncertainty','reluncert']
+
+_record_fields_  = {'value':'Value', 'uncertainty':'Uncertainty',
+                    'category':'Category', 'unit':'Unit', 'symbol':'Symbol',
+                    'name':'Quantity '}
+
+_clause_re_ = re.compile(r'''
+    \s*(?:
+        (?P<flag>(?:not\s+)?exact)                                      |
+        (?P<field>[a-z]+)\s*(?P<op>==|!=|<=|>=|=|<|>|~)\s*
+            (?P<operand>'[^']*'|"[^"]*"|[^\s'"]+)
+    )\s*(?:(?P<conj>and)\b|$)''', re.VERBOSE | re.IGNORECASE)
+
+#______________________________________________________
+
+class QueryError(ValueError):
+    ''' malformed where clause '''
+    pass
+
+#______________________________________________________
+
+def _number (numstr=''):
+    try:
+        return float(numstr)
+    except (TypeError,ValueError):
+        return None
+
+#______________________________________________________
+
+def parseWhere (where=''):
+    '''
+    Parse a where string into a list of (field, op, operand)
+    clauses; numeric operands are converted to float.
+    '''
+
+    clauses = []
+    pos = 0
+    where = where.strip()
+
+    while pos < len(where):
+        match = _clause_re_.match(where,pos)
+        if match is None:
+            raise QueryError('can\'t parse where clause at \'%s\'' % where[pos:])
+        if match.group('conj') is None and match.end() < len(where):
+            raise QueryError('expected \'and\' at \'%s\'' % where[match.end():])
+        pos = match.end()
+
+        if match.group('flag') is not None:
+            negate = match.group('flag').lower().startswith('not')
+            clauses.append(('uncertainty','>' if negate else '==',0.0))
+            continue
+
+        field = match.group('field').lower()
+        op = match.group('op')
+        operand = match.group('operand')
+        if operand[0] in '\'"':
+            operand = operand[1:-1]
+        if op == '=':
+            op = '=='
+
+        clauses.append(checkClause(field,op,operand))
+
+    if len(clauses) == 0:
+        raise QueryError('empty where clause')
+
+    return clauses
+
+#______________________________________________________
+
+def checkClause (field='', op='==', operand=''):
+    ''' validate one clause, returning it with a float operand for numeric fields '''
+
+    if field in _numeric_fields_:
+        if op == '~':
+            raise QueryError('%s is numeric, use == != < <= > >=' % field)
+        number = _number(operand)
+        if number is None:
+            raise QueryError('%s %s %s: not a number' % (field,op,operand))
+        return (field,op,number)
+
+    if field in _text_fields_:
+        if op not in ['==','!=','~']:
+            raise QueryError('%s is text, use ==, != or ~' % field)
+        if op == '~':
+            try:
+                re.compile(operand)
+            except re.error as e:
+                raise QueryError('bad pattern %s ~ %s, %s' % (field,operand,e))
+        return (field,op,operand)
+
+    raise QueryError('unknown field \'%s\', use one of %s' % \
+            (field,', '.join(['exact'] + _numeric_fields_ + _text_fields_)))
+
+#______________________________________________________
+
+class Columns(object):
+    '''
+    Numeric columns and sorted indexes of a constants
+    dictionary.  Value and uncertainty strings are parsed
+    once here; queries bisect the sorted columns and look
+    up the text indexes instead of scanning records.
+    '''
+
+    def __init__(self,constants={}):
+
+        self.constants = constants
+        self.keys = list(constants.keys())
+
+        self.number = {}        # field --> {key: float}
+        self.text = {}          # field --> {text: [keys]}
+        self.sorted = {}        # field --> (sorted floats, keys in that order)
+        self.orders = {}        # sort key --> every key in that order
+
+        for field in _numeric_fields_:
+            self.number[field] = {}
+        for field in ['category','unit','symbol']:
+            self.text[field] = {}
+
+        for k in self.keys:
+            record = constants[k]
+
+            value = _number(record['Value'])
+            uncertainty = _number(record['Uncertainty'])
+
+            if value is not None:
+                self.number['value'][k] = value
+            if uncertainty is not None:
+                self.number['uncertainty'][k] = uncertainty
+            if value is not None and uncertainty is not None:
+                if value != 0.0:
+                    self.number['reluncert'][k] = abs(uncertainty/value)
+                elif uncertainty == 0.0:
+                    self.number['reluncert'][k] = 0.0
+
+            for field in ['category','unit','symbol']:
+                self.text[field].setdefault(record[_record_fields_[field]],[]).append(k)
+
+        for field,column in self.number.items():
+            pairs = sorted([(v,k) for k,v in column.items()])
+            self.sorted[field] = ([v for v,k in pairs],[k for v,k in pairs])
+
+    #________________________________________________
+
+    def order (self,by='name'):
+        '''
+        Every key in the order named by, one of _sort_keys_,
+        computed once and kept.  Ties and constants lacking
+        a number fall back to name order, the latter last.
+        '''
+
+        if by in self.orders:
+            return self.orders[by]
+
+        if by not in _sort_keys_:
+            raise QueryError('can\'t sort by \'%s\', use one of %s' % \
+                    (by,', '.join(_sort_keys_)))
+
+        if by == 'name':
+            order = sorted(self.keys)
+
+        elif by in ['symbol','category']:
+            field = _record_fields_[by]
+            order = sorted(self.keys,key=lambda k: (self.constants[k][field],k))
+
+        elif by == 'magnitude':
+            column = self.number['value']
+            order = [k for v,k in sorted([(abs(v),k) for k,v in column.items()])]
+            order += sorted([k for k in self.keys if k not in column])
+
+        else:
+            column = self.number[by]
+            order = self.sorted[by][1] + \
+                        sorted([k for k in self.keys if k not in column])
+
+        self.orders[by] = order
+
+        return order
+
+    #________________________________________________
+
+    def range (self,field='value',op='==',number=0.0):
+        ''' keys whose numeric field satisfies op, by bisection '''
+
+        values,keys = self.sorted[field]
+
+        if op == '<':
+            return set(keys[:bisect_left(values,number)])
+        if op == '<=':
+            return set(keys[:bisect_right(values,number)])
+        if op == '>':
+            return set(keys[bisect_right(values,number):])
+        if op == '>=':
+            return set(keys[bisect_left(values,number):])
+
+        equal = set(keys[bisect_left(values,number):bisect_right(values,number)])
+        if op == '!=':
+            return set(keys) - equal
+        return equal
+
+    #________________________________________________
+
+    def match (self,field='unit',op='==',text=''):
+        ''' keys whose category, unit or symbol matches, from the text index '''
+
+        index = self.text[field]
+
+        if op == '~':
+            pattern = re.compile(text)
+            keys = set()
+            for value,members in index.items():
+                if pattern.search(value):
+                    keys.update(members)
+            return keys
+
+        equal = set(index.get(text,[]))
+        if op == '!=':
+            return set(self.keys) - equal
+        return equal
+
+    #________________________________________________
+
+    def where (self,clauses=[]):
+        '''
+        Return the set of keys satisfying every clause.
+        Indexed clauses are intersected first; name clauses
+        are checked only on the keys that survive them.
+        '''
+
+        keys = None
+        names = []
+
+        for field,op,operand in clauses:
+            if field == 'name':
+                names.append((op,operand))
+                continue
+
+            if field in _numeric_fields_:
+                found = self.range(field,op,operand)
+            else:
+                found = self.match(field,op,operand)
+
+            keys = found if keys is None else keys & found
+
+        if keys is None:
+            keys = set(self.keys)
+
+        for op,operand in names:
+            if op == '~':
+                pattern = re.compile(operand,re.IGNORECASE)
+                keys = set([k for k in keys if pattern.search(k) or \
+                        pattern.search(self.constants[k]['Quantity '])])
+            elif op == '==':
+                keys = keys & set([operand])
+            else:
+                keys = keys - set([operand])
+
+        return keys
+
+#______________________________________________________
+
+def _test_query ():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    cases = [
+        ('unit == J and reluncert > 1e-8',
+                [('unit','==','J'),('reluncert','>',1e-8)]),
+        ('exact AND category=universal',
+                [('uncertainty','==',0.0),('category','==','universal')]),
+        ("not exact and name ~ 'mass$' and value<=1e3",
+                [('uncertainty','>',0.0),('name','~','mass$'),('value','<=',1e3)]),
+        ("unit == 'J T^{-1}'",
+                [('unit','==','J T^{-1}')]),
+        ]
+
+    for where,expected in cases:
+        clauses = parseWhere(where)
+        if clauses != expected:
+            print('!parseWhere(%s) = %s, expected %s' % (where,clauses,expected))
+            errors += 1
+
+    for where in ['', 'unit', 'unit == J or exact', 'value ~ 3', 'value > big',
+                  'unit < J', 'colour == red', 'name ~ (']:
+        try:
+            parseWhere(where)
+            print('!parseWhere(%s) accepted a bad clause' % where)
+            errors += 1
+        except QueryError:
+            pass
+
+    constants = {
+        'a':{'Quantity ':'a','Value':'1.0','Uncertainty':'0.0','Unit':'J',
+             'Category':'x','Symbol':'A'},
+        'b':{'Quantity ':'b','Value':'2.0','Uncertainty':'0.2','Unit':'J',
+             'Category':'x','Symbol':'B'},
+        'c':{'Quantity ':'c','Value':'-4.0','Uncertainty':'0.004','Unit':'m',
+             'Category':'y','Symbol':'C'},
+        }
+    columns = Columns(constants)
+
+    checks = [
+        ('exact',                           set(['a'])),
+        ('value >= 1 and value < 2',        set(['a'])),
+        ('reluncert > 1e-2',                set(['b'])),
+        ('unit ~ ^J and not exact',         set(['b'])),
+        ('category != x',                   set(['c'])),
+        ('name ~ [ac]',                     set(['a','c'])),
+        ]
+    for where,expected in checks:
+        keys = columns.where(parseWhere(where))
+        if keys != expected:
+            print('!where(%s) = %s, expected %s' % (where,sorted(keys),sorted(expected)))
+            errors += 1
+
+    orders = [
+        ('name',        ['a','b','c']),
+        ('symbol',      ['a','b','c']),
+        ('category',    ['a','b','c']),
+        ('value',       ['c','a','b']),
+        ('magnitude',   ['a','b','c']),
+        ('reluncert',   ['a','c','b']),
+        ]
+    for by,expected in orders:
+        if columns.order(by) != expected or columns.order(by) is not columns.order(by):
+            print('!order(%s) = %s, expected %s' % (by,columns.order(by),expected))
+            errors += 1
+
+    try:
+        columns.order('colour')
+        print('!order(colour) accepted a bad sort key')
+        errors += 1
+    except QueryError:
+        pass
+
+    print('\t%d query errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_query()
+    sys.exit()
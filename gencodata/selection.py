@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+"""
+ selection.py -
+
+    parses selection expressions, set algebra over constant
+    keys, for codata.Select() and the --select flag:
+
+        universal | @five.txt
+        atomic units - glob:*electron*
+        (proton | neutron) & re:magnetic
+
+    Operators:
+
+        |  +        union
+        -           difference
+        &           intersection, binds tighter than | + -
+        ( )         grouping
+
+    Union and difference apply left to right, so
+    universal | @five.txt - sym:h drops h from both.
+
+    '-' and '+' are operators only when they stand alone,
+    so names like X-ray need no quoting.
+
+    Operands:
+
+        word(s)     category, constant name or symbol, in that
+                    order; adjacent words join, e.g. atomic units
+        'quoted'    the same, taken literally
+        all         every constant
+        @file       constant names listed in a file
+        cat:NAME    category
+        name:NAME   constant name
+        sym:SYMBOL  symbol
+        glob:PAT    constant names matching a shell pattern
+        re:PAT      constant names matching a regular expression
+
+    Values with spaces are quoted: name:'Planck constant'
+
+ creation: 10/19/2026
+"""
+
+import re
+import sys
+
+_prefixes_ = ['cat','name','sym','glob','re']
+
+_token_re_ = re.compile(r'''
+    \s*(?:
+        (?P<op>[()|&])                                      |
+        (?P<prefixed>[a-z]+:(?:'[^']*'|"[^"]*"|[^\s()|&]+)) |
+        (?P<quoted>'[^']*'|"[^"]*")                         |
+        (?P<word>[^\s()|&'"]+)
+    )''', re.VERBOSE)
+
+#______________________________________________________
+
+class SelectionError(ValueError):
+    ''' malformed selection expression or unknown operand '''
+    pass
+
+#______________________________________________________
+
+def _unquote (s=''):
+    if len(s) > 1 and s[0] in '\'"' and s[-1] == s[0]:
+        return s[1:-1]
+    return s
+
+#______________________________________________________
+
+def tokenize (expr=''):
+    '''
+    Split an expression into (kind, text) tokens, where kind
+    is 'op' or an operand kind: 'auto', 'file', or a prefix.
+    '''
+
+    tokens = []
+    pos = 0
+    expr = expr.rstrip()
+
+    while pos < len(expr):
+        match = _token_re_.match(expr,pos)
+        if match is None or match.end() == pos:
+            raise SelectionError('can\'t parse selection at \'%s\'' % expr[pos:])
+        pos = match.end()
+
+        if match.group('op') is not None:
+            tokens.append(('op',match.group('op')))
+
+        elif match.group('prefixed') is not None:
+            prefix,value = match.group('prefixed').split(':',1)
+            if prefix not in _prefixes_:
+                raise SelectionError('unknown selection prefix \'%s:\'' % prefix)
+            tokens.append((prefix,_unquote(value)))
+
+        elif match.group('quoted') is not None:
+            tokens.append(('literal',_unquote(match.group('quoted'))))
+
+        else:
+            word = match.group('word')
+            if word in ['-','+']:
+                tokens.append(('op',word))
+            elif word[0] == '@' and len(word) > 1:
+                tokens.append(('file',word[1:]))
+            else:
+                tokens.append(('auto',word))
+
+    return tokens
+
+#______________________________________________________
+
+def parse (expr=''):
+    '''
+    Parse an expression into a tree of tuples:
+
+        ('|', left, right)  ('-', left, right)  ('&', left, right)
+        (kind, value)       for an operand
+    '''
+
+    tokens = tokenize(expr)
+    if len(tokens) == 0:
+        raise SelectionError('empty selection')
+
+    pos = [0]
+
+    def peek ():
+        if pos[0] < len(tokens):
+            return tokens[pos[0]]
+        return (None,None)
+
+    def take ():
+        token = peek()
+        pos[0] += 1
+        return token
+
+    def union ():
+        tree = intersection()
+        while peek() in [('op','|'),('op','+'),('op','-')]:
+            op = take()[1]
+            if op == '+':
+                op = '|'
+            tree = (op,tree,intersection())
+        return tree
+
+    def intersection ():
+        tree = operand()
+        while peek() == ('op','&'):
+            take()
+            tree = ('&',tree,operand())
+        return tree
+
+    def operand ():
+        kind,value = take()
+
+        if (kind,value) == ('op','('):
+            tree = union()
+            if take() != ('op',')'):
+                raise SelectionError('missing \')\' in selection')
+            return tree
+
+        if kind is None or kind == 'op':
+            raise SelectionError('expected a category, name or pattern, not \'%s\'' % \
+                    (value or 'end of selection'))
+
+        # adjacent bare words form one name: atomic units
+        if kind == 'auto':
+            while peek()[0] == 'auto':
+                value += ' ' + take()[1]
+
+        if kind == 'literal':
+            kind = 'auto'
+
+        return (kind,value)
+
+    tree = union()
+    if pos[0] != len(tokens):
+        raise SelectionError('unexpected \'%s\' in selection' % peek()[1])
+
+    return tree
+
+#______________________________________________________
+
+def evaluate (tree=(), resolve=None):
+    '''
+    Evaluate a parsed tree to a set of keys.
+    resolve(kind, value) returns the key set of an operand.
+    '''
+
+    kind = tree[0]
+
+    if kind == '|':
+        return evaluate(tree[1],resolve) | evaluate(tree[2],resolve)
+
+    if kind == '&':
+        return evaluate(tree[1],resolve) & evaluate(tree[2],resolve)
+
+    if kind == '-':
+        return evaluate(tree[1],resolve) - evaluate(tree[2],resolve)
+
+    return resolve(kind,tree[1])
+
+#______________________________________________________
+
+def _test_selection ():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    cases = [
+        ('universal',                   ('auto','universal')),
+        ('atomic units - glob:*electron*',
+                        ('-',('auto','atomic units'),('glob','*electron*'))),
+        ('X-ray | @five.txt',           ('|',('auto','X-ray'),('file','five.txt'))),
+        ("(proton + neutron) & name:'neutron mass'",
+                        ('&',('|',('auto','proton'),('auto','neutron')),
+                             ('name','neutron mass'))),
+        ('a | b - c & d',               ('-',('|',('auto','a'),('auto','b')),
+                                             ('&',('auto','c'),('auto','d')))),
+        ]
+
+    for expr,expected in cases:
+        tree = parse(expr)
+        if tree != expected:
+            print('!parse(%s) = %s, expected %s' % (expr,tree,expected))
+            errors += 1
+
+    for expr in ['', 'a |', '(a', 'a )', 'bogus:x', '| a']:
+        try:
+            parse(expr)
+            print('!parse(%s) accepted a bad expression' % expr)
+            errors += 1
+        except SelectionError:
+            pass
+
+    sets = {'a':set([1,2,3]), 'b':set([3,4]), 'c':set([2,3])}
+    result = evaluate(parse('a | b - c'),lambda kind,value: sets[value])
+    if result != set([1,4]):
+        print('!evaluate precedence failed: %s' % result)
+        errors += 1
+
+    print('\t%d selection errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_selection()
+    sys.exit()
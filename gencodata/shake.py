@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+"""
+ shake.py -
+
+    find the constants a code base refers to, for
+    gencodata shake:
+
+        gencodata shake src -s C99 -o codata.h
+
+    Every C, Fortran and Python source under a directory
+    is cut into comments, string literals, numbers and
+    identifiers by one compiled pattern per language, in a
+    single pass over the text.  Each identifier is looked
+    up in a table of the symbols gencodata emits, so the
+    cost of a file doesn't grow with the number of symbols.
+    Comments and strings are dropped, and a number swallows
+    its exponent, so the 'e' of 1.5e-3 is not the charge.
+
+    Fortran is case-insensitive, so its identifiers are
+    matched in lowercase.  Files are read by a pool of
+    threads.  A file gencodata wrote is skipped: a project
+    including the full header doesn't use every constant.
+
+ creation: 10/19/2026
+"""
+
+import os
+import re
+import sys
+
+from multiprocessing.pool import ThreadPool
+
+_number_ = r'\.?\d[\w.]*'
+_identifier_ = r'([A-Za-z_]\w*)'
+_c_string_ = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+
+# one alternation per language: only identifiers are captured
+_patterns_ = {
+    'c':        re.compile(r'//[^\n]*|/\*.*?\*/|' + _c_string_ + '|' +
+                           _number_ + '|' + _identifier_, re.S),
+    'fortran':  re.compile(r'![^\n]*|"[^"\n]*"|\'[^\'\n]*\'|' +
+                           _number_ + '|' + _identifier_),
+    'fixed':    re.compile(r'^[cC*][^\n]*|![^\n]*|"[^"\n]*"|\'[^\'\n]*\'|' +
+                           _number_ + '|' + _identifier_, re.M),
+    'python':   re.compile(r'#[^\n]*|"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|' +
+                           _c_string_ + '|' + _number_ + '|' + _identifier_),
+    }
+
+# file name suffix --> language; .f and .for are fixed-form Fortran
+_languages_ = {
+    '.c':'c', '.h':'c', '.cc':'c', '.cpp':'c', '.cxx':'c',
+    '.hh':'c', '.hpp':'c', '.hxx':'c',
+    '.f':'fixed', '.for':'fixed', '.f77':'fixed',
+    '.f90':'fortran', '.f95':'fortran', '.f03':'fortran', '.f08':'fortran',
+    '.py':'python', '.pyx':'python',
+    }
+
+# the title line of every file gencodata writes
+_generated_ = 'CONSTANTS FROM NIST SRD121'
+
+#______________________________________________________
+
+def language (fname=''):
+    ''' source language by file name suffix, None if not a source '''
+    return _languages_.get(os.path.splitext(fname)[1].lower())
+
+#______________________________________________________
+
+def sourceFiles (srcdir=''):
+    ''' sorted (path, language) of every source under srcdir '''
+
+    found = []
+    for dirpath,dirnames,filenames in os.walk(srcdir):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for fname in filenames:
+            lang = language(fname)
+            if lang is not None:
+                found.append((os.path.join(dirpath,fname),lang))
+
+    return sorted(found)
+
+#______________________________________________________
+
+class SymbolScanner(object):
+    '''
+    Symbol table of emitted identifiers: symbol --> set of
+    constant keys, and its lowercase twin for Fortran.
+    scan() returns the keys a source text refers to.
+    '''
+
+    def __init__(self,symbols={}):
+        ''' symbols maps each emitted identifier to a constant key '''
+
+        self.symbols = {}
+        self.folded = {}
+
+        for sym,key in symbols.items():
+            self.symbols.setdefault(sym,set()).add(key)
+            self.folded.setdefault(sym.lower(),set()).add(key)
+
+    #________________________________________________
+
+    def scan (self,text='',lang='c'):
+        ''' keys of the constants whose symbols text uses '''
+
+        table = self.symbols
+        tokens = set(_patterns_[lang].findall(text))
+        if lang in ['fortran','fixed']:
+            table = self.folded
+            tokens = set([token.lower() for token in tokens])
+
+        used = set()
+        for token in tokens:
+            if token in table:
+                used.update(table[token])
+
+        return used
+
+    #________________________________________________
+
+    def scanFile (self,fname='',lang='c'):
+        '''
+        Return (keys used, error) for one file; keys is None
+        for a file gencodata wrote.
+        '''
+
+        try:
+            with open(fname,'rb') as ifp:
+                text = ifp.read().decode('latin-1')
+        except (IOError,OSError) as e:
+            return (set(),e)
+
+        if _generated_ in text[:1024]:
+            return (None,None)
+
+        return (self.scan(text,lang),None)
+
+    #________________________________________________
+
+    def scanTree (self,srcdir='',threads=4):
+        '''
+        Scan every source under srcdir.  Return a dictionary
+        of constant key --> list of files using it, and the
+        lists of files scanned and skipped as generated.
+        Unreadable files are reported and skipped.
+        '''
+
+        sources = sourceFiles(srcdir)
+        if len(sources) == 0:
+            return ({},[],[])
+
+        pool = ThreadPool(max(min(len(sources),threads),1))
+        try:
+            results = pool.map(lambda source: self.scanFile(*source),sources)
+        finally:
+            pool.close()
+            pool.join()
+
+        users = {}
+        scanned = []
+        generated = []
+        for (fname,lang),(keys,err) in zip(sources,results):
+            if err is not None:
+                print("Error: can\'t read %s, %s" % (fname,err))
+            elif keys is None:
+                generated.append(fname)
+            else:
+                scanned.append(fname)
+                for key in keys:
+                    users.setdefault(key,[]).append(fname)
+
+        return (users,scanned,generated)
+
+#______________________________________________________
+
+def _test_shake ():
+
+    import shutil
+    import tempfile
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    scanner = SymbolScanner({'h':'planck constant', 'k':'boltzmann constant',
+                             'e':'elementary charge', 'N_A':'avogadro constant',
+                             'c':'speed of light in vacuum',
+                             'hbar':'reduced planck constant'})
+
+    cases = [
+        ('double E = h*f; /* k */ // N_A\n',       'c',        ['planck constant']),
+        ('x = 1.5e-3*k; s = "hbar";\n',             'c',        ['boltzmann constant']),
+        ('      X = N_a*H\n',                      'fortran',  ['avogadro constant','planck constant']),
+        ('c     uses k\n      y = 2*HBAR ! e\n',   'fixed',    ['reduced planck constant']),
+        ('call f(c)\n',                            'fortran',  ['speed of light in vacuum']),
+        ('"""h"""\nq = e  # k\nn = \'N_A\'\n',     'python',   ['elementary charge']),
+        ]
+    for text,lang,expected in cases:
+        found = sorted(scanner.scan(text,lang))
+        if found != expected:
+            print('!scan(%r,%s) = %s, expected %s' % (text,lang,found,expected))
+            errors += 1
+
+    if language('Model.F90') != 'fortran' or language('consts.f') != 'fixed' or \
+        language('README') is not None:
+        print('!language() suffix mapping failed')
+        errors += 1
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(tmpdir,'src'))
+        for fname,text in [('src/a.c','return h*k;\n'),
+                           ('src/b.py','from consts import e\n'),
+                           ('codata.h','/* CODATA 2014 CONSTANTS FROM NIST SRD121 */\n'
+                                       '#define c 299792458.0\n'),
+                           ('notes.txt','N_A')]:
+            with open(os.path.join(tmpdir,fname),'w') as ofp:
+                ofp.write(text)
+
+        users,scanned,generated = scanner.scanTree(tmpdir)
+        if sorted(users.keys()) != ['boltzmann constant','elementary charge',
+                                    'planck constant'] or \
+            len(scanned) != 2 or [os.path.basename(f) for f in generated] != ['codata.h']:
+            print('!scanTree() = %s %s %s' % (sorted(users.keys()),scanned,generated))
+            errors += 1
+    finally:
+        shutil.rmtree(tmpdir)
+
+    print('\t%d shake errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_shake()
+    sys.exit()
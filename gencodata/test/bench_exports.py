@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+ bench_exports.py -
+
+    times the CSV, JSON and JSON-lines exporters on a large
+    synthetic dataset built by replicating the CODATA records.
+
+    usage: python bench_exports.py [rows]
+
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+from gencodata import *
+
+#______________________________________________________
+
+def _generate (rows=50000):
+    ''' yield synthetic site constants, one record at a time '''
+
+    base = [codata.Dictionary()[k] for k in sorted(codata.Names())]
+
+    for i in range(rows):
+        record = dict(base[i % len(base)])
+        record['Quantity '] = '%s %d' % (record['Quantity '],i)
+        yield record
+
+#______________________________________________________
+
+def _legacy (rows, outfile):
+    ''' whole-dictionary json.dump as WriteJSON used to do '''
+
+    cdict = {}
+    for record in _generate(rows):
+        cdict[codata._strip_name(record['Quantity '])] = record
+
+    with open(outfile,'w') as ofp:
+        json.dump(cdict,ofp,indent=2)
+
+    return len(cdict)
+
+#______________________________________________________
+
+def main (rows=50000):
+
+    tmpdir = tempfile.mkdtemp()
+
+    benches = [
+        ('json.dump indent=2', 'legacy.json',
+            lambda f: _legacy(rows,f)),
+        ('ExportCSV',          'codata.csv',
+            lambda f: codata.ExportCSV(_generate(rows),f)),
+        ('ExportCSV gzip',     'codata.csv.gz',
+            lambda f: codata.ExportCSV(_generate(rows),f)),
+        ('ExportJSON',         'codata.json',
+            lambda f: codata.ExportJSON(_generate(rows),f)),
+        ('ExportJSON gzip',    'codata.json.gz',
+            lambda f: codata.ExportJSON(_generate(rows),f)),
+        ('ExportJSONLines',    'codata.jsonl',
+            lambda f: codata.ExportJSONLines(_generate(rows),f)),
+        ('ExportJSONLines gzip','codata.jsonl.gz',
+            lambda f: codata.ExportJSONLines(_generate(rows),f)),
+        ]
+
+    print('%-22s %8s %10s %12s %10s' % ('exporter','rows','seconds','rows/s','bytes'))
+
+    for label,fname,bench in benches:
+        fname = os.path.join(tmpdir,fname)
+
+        start = time.time()
+        count = bench(fname)
+        elapsed = time.time() - start
+
+        size = os.path.getsize(fname)
+        os.remove(fname)
+
+        print('%-22s %8d %10.3f %12.0f %10d' % \
+                (label,count,elapsed,count/elapsed,size))
+
+    os.rmdir(tmpdir)
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
+    sys.exit()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+ bench_fuzzy.py -
+
+    times resolution of a long input list of misspelled
+    constant names, one random edit per name.
+
+    usage: python bench_fuzzy.py [lines]
+
+"""
+
+import sys
+import time
+import random
+
+from gencodata import *
+
+#______________________________________________________
+
+def _misspell (name=''):
+    ''' drop, insert or replace one character '''
+
+    i = random.randrange(len(name))
+    edit = random.randrange(3)
+    letter = random.choice('abcdefghijklmnopqrstuvwxyz')
+
+    if edit == 0:
+        return name[:i] + name[i+1:]
+    if edit == 1:
+        return name[:i] + letter + name[i:]
+    return name[:i] + letter + name[i+1:]
+
+#______________________________________________________
+
+def main (lines=10000):
+
+    random.seed(1)
+
+    cdict = codata.Dictionary()
+    names = [cdict[k]['Quantity '] for k in sorted(codata.Names())]
+    entries = [_misspell(random.choice(names)) for i in range(lines)]
+
+    start = time.time()
+    codata.Suggest('')
+    built = time.time() - start
+
+    start = time.time()
+    resolved = len([name for name in entries if codata.Resolve(name) != ''])
+    elapsed = time.time() - start
+
+    print('index built in %.3f s' % built)
+    print('%d of %d names resolved in %.3f s, %.1f us/name' % \
+            (resolved,lines,elapsed,elapsed*1e6/lines))
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
+    sys.exit()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+ bench_imports.py -
+
+    times the CSV, JSON and JSON-lines importers against the
+    NIST JSON path (_build_CODATA_dict with symbol merge) on
+    a large synthetic dataset.
+
+    usage: python bench_imports.py [rows]
+
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+
+from gencodata import *
+
+# the exporters' synthetic records, so both benches time the same data
+from bench_exports import _generate
+
+#______________________________________________________
+
+def _writeNIST (rows, codata_file, symbol_file):
+    ''' write the synthetic records as NIST and symbol JSON files '''
+
+    constants = []
+    symbols = []
+    for record in _generate(rows):
+        constants.append({'Quantity ':record['Quantity '],
+                          'Value':record['Value'],
+                          'Uncertainty':record['Uncertainty'],
+                          'Unit':record['Unit']})
+        symbols.append({'Quantity ':record['Quantity '],
+                        'Category':record['Category'],
+                        'Symbol':record['Symbol']})
+
+    with open(codata_file,'w') as ofp:
+        json.dump({'constant':constants},ofp,indent=2)
+
+    with open(symbol_file,'w') as ofp:
+        json.dump({'symbols':symbols},ofp,indent=2)
+
+#______________________________________________________
+
+def _nistPath (codata_file, symbol_file):
+    ''' time the NIST parse and symbol merge '''
+
+    codata._symbol_tables_.clear()
+    phys_const,categories = codata._build_CODATA_dict(codata_file,symbol_file)
+
+    return len(phys_const)
+
+#______________________________________________________
+
+def main (rows=20000):
+
+    tmpdir = tempfile.mkdtemp()
+    path = lambda fname: os.path.join(tmpdir,fname)
+
+    _writeNIST(rows,path('nist.json'),path('symbols.json'))
+
+    for fname in ['codata.csv','codata.csv.gz']:
+        codata.ExportCSV(_generate(rows),path(fname))
+    for fname in ['codata.json','codata.json.gz']:
+        codata.ExportJSON(_generate(rows),path(fname))
+    for fname in ['codata.jsonl','codata.jsonl.gz']:
+        codata.ExportJSONLines(_generate(rows),path(fname))
+
+    benches = [
+        ('NIST JSON + symbols', lambda: _nistPath(path('nist.json'),
+                                                  path('symbols.json'))),
+        ('ImportCSV',           lambda: len(codata.Import(path('codata.csv')))),
+        ('ImportCSV gzip',      lambda: len(codata.Import(path('codata.csv.gz')))),
+        ('ImportJSON',          lambda: len(codata.Import(path('codata.json')))),
+        ('ImportJSON gzip',     lambda: len(codata.Import(path('codata.json.gz')))),
+        ('ImportJSONLines',     lambda: len(codata.Import(path('codata.jsonl')))),
+        ('ImportJSONLines gzip',lambda: len(codata.Import(path('codata.jsonl.gz')))),
+        ]
+
+    print('%-22s %8s %10s %12s' % ('importer','rows','seconds','rows/s'))
+
+    for label,bench in benches:
+        start = time.time()
+        count = bench()
+        elapsed = time.time() - start
+
+        print('%-22s %8d %10.3f %12.0f' % (label,count,elapsed,count/elapsed))
+
+    for fname in os.listdir(tmpdir):
+        os.remove(path(fname))
+    os.rmdir(tmpdir)
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
+    sys.exit()
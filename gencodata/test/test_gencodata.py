@@ -6,6 +6,20 @@ from gencodata import *
 
 def main():
 
+    selection._test_selection()
+
+    query._test_query()
+
+    textindex._test_textindex()
+
+    fuzzy._test_fuzzy()
+
+    perfecthash._test_perfecthash()
+
+    float32._test_float32()
+
+    shake._test_shake()
+
     codata._test_codata()
 
     formats._test_formats()
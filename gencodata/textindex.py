@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+ textindex.py -
+
+    inverted token index over constant names, symbols and
+    units, for codata.Search() and gencodata search:
+
+        gencodata search proton magnetic
+        gencodata search --any muon tau
+
+    Names are split into lowercase words; NIST abbreviations
+    (mag., mom., gyromag.) are indexed under both spellings.
+    A search word also matches indexed words it begins, so
+    "magn" finds "magnetic".
+
+    Results are ranked by the rarity of the matched words,
+    weighted by where they matched: symbol above name above
+    unit.  Ties go to the shorter name.
+
+ creation: 10/19/2026
+"""
+
+import re
+import sys
+import math
+import heapq
+
+from bisect import bisect_left
+
+_word_re_ = re.compile(r'[a-z0-9_]+')
+
+# NIST SRD121 abbreviations, indexed under both spellings
+_abbreviations_ = {'mag':'magnetic', 'mom':'moment', 'gyromag':'gyromagnetic'}
+
+# weight of a match by field, and of a prefix rather than whole-word match
+_weights_ = {'symbol':3.0, 'name':1.0, 'unit':0.5}
+_prefix_weight_ = 0.5
+
+#______________________________________________________
+
+def words (text=''):
+    ''' lowercase words of a name or search string '''
+    return _word_re_.findall(text.lower())
+
+#______________________________________________________
+
+class TokenIndex(object):
+    '''
+    Postings of every name word, symbol and unit token:
+    token --> {key: weight}.  Tokens are also kept sorted
+    so a search word finds the tokens it prefixes by
+    bisection.
+    '''
+
+    def __init__(self,constants={}):
+
+        self.constants = constants
+        self.postings = {}
+
+        for k in constants.keys():
+            record = constants[k]
+
+            for word in words(record['Quantity ']):
+                self._post(word,k,'name')
+                if word in _abbreviations_:
+                    self._post(_abbreviations_[word],k,'name')
+
+            if record['Symbol'] != '':
+                self._post(record['Symbol'].lower(),k,'symbol')
+
+            for unit in record['Unit'].lower().split():
+                self._post(unit,k,'unit')
+                base = re.sub(r'\^.*$','',unit)
+                if base != unit:
+                    self._post(base,k,'unit')
+
+        self.tokens = sorted(self.postings.keys())
+
+        # fold each token's rarity into its weights once
+        size = float(max(len(constants),1))
+        for posting in self.postings.values():
+            scale = math.log(1.0 + size/len(posting))
+            for k in posting:
+                posting[k] *= scale
+
+    #________________________________________________
+
+    def _post (self,token,key,field):
+        posting = self.postings.setdefault(token,{})
+        posting[key] = max(posting.get(key,0.0),_weights_[field])
+
+    #________________________________________________
+
+    def lookup (self,term=''):
+        '''
+        Return {key: score} for one search term: whole-token
+        matches plus prefix matches at reduced weight, each
+        scaled by the rarity of the token.  A term matching
+        one token returns its posting itself; don't modify it.
+        '''
+
+        tokens = self.tokens
+
+        first = i = bisect_left(tokens,term)
+        while i < len(tokens) and tokens[i].startswith(term):
+            i += 1
+
+        if i - first == 1 and tokens[first] == term:
+            return self.postings[term]
+
+        scores = {}
+        for token in tokens[first:i]:
+            scale = 1.0 if token == term else _prefix_weight_
+            for k,weight in self.postings[token].items():
+                score = weight*scale
+                if score > scores.get(k,0.0):
+                    scores[k] = score
+
+        return scores
+
+    #________________________________________________
+
+    def search (self,terms=[],mode='and',top=None):
+        '''
+        Return keys matching all (mode 'and') or any (mode 'or')
+        of the terms, best first, as a list of (score, key).
+        '''
+
+        hits = [self.lookup(term) for term in terms]
+        if len(hits) == 0:
+            return []
+
+        if mode == 'and':
+            hits.sort(key=len)
+            keys = hits[0]
+            for scores in hits[1:]:
+                keys = [k for k in keys if k in scores]
+        else:
+            keys = set()
+            for scores in hits:
+                keys.update(scores.keys())
+
+        constants = self.constants
+        ranked = [(-sum([scores.get(k,0.0) for scores in hits]),
+                   len(constants[k]['Quantity ']),k) for k in keys]
+
+        if top:
+            ranked = heapq.nsmallest(top,ranked)
+        else:
+            ranked.sort()
+
+        return [(-score,k) for score,length,k in ranked]
+
+#______________________________________________________
+
+def _test_textindex ():
+
+    print('\n#### BEGIN %s test\n' % __file__.upper())
+
+    errors = 0
+
+    constants = {
+        'proton mag mom':   {'Quantity ':'proton mag. mom.', 'Symbol':'mu_p',
+                             'Unit':'J T^{-1}'},
+        'proton mass':      {'Quantity ':'proton mass', 'Symbol':'m_p',
+                             'Unit':'kg'},
+        'neutron mag mom':  {'Quantity ':'neutron mag. mom.', 'Symbol':'mu_n',
+                             'Unit':'J T^{-1}'},
+        'magnetic constant':{'Quantity ':'mag. constant', 'Symbol':'mu0',
+                             'Unit':'N A^{-2}'},
+        }
+    index = TokenIndex(constants)
+
+    cases = [
+        (['proton','magnetic'],'and',   ['proton mag mom']),
+        (['proton','mag'],'and',        ['proton mag mom']),
+        (['proton','neutron'],'and',    []),
+        (['m_p'],'and',                 ['proton mass']),
+        (['t'],'and',                   ['neutron mag mom','proton mag mom']),
+        (['magn','constant'],'and',     ['magnetic constant']),
+        ]
+    for terms,mode,expected in cases:
+        found = [k for score,k in index.search(terms,mode)]
+        if sorted(found) != expected:
+            print('!search(%s,%s) = %s, expected %s' % (terms,mode,found,expected))
+            errors += 1
+
+    # proton hits on both terms outrank single-term hits
+    found = [k for score,k in index.search(['proton','mass'],'or')]
+    if found[0] != 'proton mass' or len(found) != 2:
+        print('!search(proton mass, or) ranked %s' % found)
+        errors += 1
+
+    if words('Proton-electron mag. mom. ratio') != \
+            ['proton','electron','mag','mom','ratio']:
+        print('!words() split failed')
+        errors += 1
+
+    print('\t%d text index errors' % errors)
+
+    print('\n#### END %s test\n' % __file__.upper())
+
+#______________________________________________________
+
+if __name__ == '__main__':
+
+    _test_textindex()
+    sys.exit()